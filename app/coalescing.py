@@ -0,0 +1,70 @@
+"""
+동일 요청 합치기 (single-flight)
+같은 키로 동시에 들어온 호출은 진행 중인 호출 하나의 결과를 함께 받고,
+결과는 짧은 시간(ttl) 동안 재사용해 여러 탭/사용자가 폴링해도 업스트림 호출 수가 늘지 않게 한다
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+class SingleFlight:
+	"""
+	키별로 진행 중인 호출과 최근 결과 공유 (이벤트 루프 한 개에서만 사용)
+	max_entries를 주면 캐시가 그 수를 넘을 때 가장 오래된 결과부터 버림
+	"""
+	def __init__(self, ttl: float = 0.5, cacheable: Optional[Callable[[Any], bool]] = None, max_entries: int = 0):
+		self.ttl = ttl
+		self.cacheable = cacheable or (lambda value: True)
+		self.max_entries = max_entries
+		self._inflight: Dict[Hashable, asyncio.Task] = {}
+		self._cache: Dict[Hashable, Tuple[float, Any]] = {}
+
+	async def do(self, key: Hashable, function: Callable[[], Awaitable[Any]]) -> Tuple[Any, Optional[str]]:
+		"""
+		결과와 공유 방식 반환
+		공유 방식: None(직접 호출), "inflight"(진행 중인 호출 대기), "cached"(최근 결과 재사용)
+		"""
+		cached = self._cache.get(key)
+		if cached is not None:
+			if cached[0] > time.monotonic():
+				return cached[1], "cached"
+			del self._cache[key]
+
+		task = self._inflight.get(key)
+		if task is not None:
+			# shield: 기다리던 요청이 취소돼도 공유 호출은 계속 진행
+			return await asyncio.shield(task), "inflight"
+
+		task = asyncio.ensure_future(self._run(key, function))
+		self._inflight[key] = task
+		return await asyncio.shield(task), None
+
+	async def _run(self, key: Hashable, function: Callable[[], Awaitable[Any]]) -> Any:
+		try:
+			value = await function()
+			if self.ttl > 0 and self.cacheable(value):
+				self._prune()
+				if self.max_entries:
+					while len(self._cache) >= self.max_entries:
+						del self._cache[next(iter(self._cache))]
+				self._cache[key] = (time.monotonic() + self.ttl, value)
+			return value
+		finally:
+			self._inflight.pop(key, None)
+
+	def _prune(self):
+		# ttl이 모두 같고 키는 없을 때만 삽입되므로 삽입 순서가 곧 만료 순서 (앞에서부터 만료된 것만 제거)
+		now = time.monotonic()
+		while self._cache:
+			key = next(iter(self._cache))
+			if self._cache[key][0] > now:
+				break
+			del self._cache[key]
+
+	def invalidate(self, key: Optional[Hashable] = None):
+		"""키(없으면 전체)의 캐시된 결과 삭제 (진행 중인 호출은 그대로)"""
+		if key is None:
+			self._cache.clear()
+		else:
+			self._cache.pop(key, None)
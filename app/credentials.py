@@ -0,0 +1,162 @@
+"""
+로그인 비밀번호 검증
+bcrypt 검증은 CPU를 많이 쓰므로 이벤트 루프가 아닌 전용 스레드 풀에서 실행하고,
+사용자/IP별 동시 검증 수를 제한해 로그인 폭주가 다른 요청을 막지 않게 한다
+기존 SHA-256 해시는 로그인에 성공하면 bcrypt 해시로 바꿔 저장한다
+
+환경 변수:
+	CREDENTIALS_FILE           변환된 해시를 저장할 파일 (기본: credentials.json)
+	CREDENTIAL_WORKERS         검증 스레드 수 (기본: 2)
+	CREDENTIAL_MAX_PENDING     대기 중인 검증 최대 수 (기본: 32)
+	CREDENTIAL_MAX_PER_USER    사용자별 동시 검증 수 (기본: 2)
+	CREDENTIAL_MAX_PER_IP      IP별 동시 검증 수 (기본: 4)
+	CREDENTIAL_BCRYPT_ROUNDS   bcrypt cost (기본: 12)
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import re
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+
+import bcrypt
+
+logger = logging.getLogger(__name__)
+
+_LEGACY_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+# bcrypt는 앞 72바이트만 사용 (bcrypt 5는 더 긴 입력을 거부하므로 직접 자름)
+_BCRYPT_MAX_BYTES = 72
+
+class CredentialBusy(Exception):
+	"""동시 검증 한도를 넘은 로그인 시도"""
+
+def _secret(password: str) -> bytes:
+	return password.encode("utf-8")[:_BCRYPT_MAX_BYTES]
+
+def hash_password_bcrypt(password: str, rounds: int = 12) -> str:
+	return bcrypt.hashpw(_secret(password), bcrypt.gensalt(rounds)).decode("ascii")
+
+def check_password(password: str, stored_hash: str) -> bool:
+	"""저장된 해시 형식(bcrypt 또는 기존 SHA-256)에 맞춰 비밀번호 확인"""
+	if stored_hash.startswith("$2"):
+		try:
+			return bcrypt.checkpw(_secret(password), stored_hash.encode("ascii"))
+		except ValueError:
+			return False
+	if _LEGACY_SHA256.match(stored_hash):
+		computed = hashlib.sha256(password.encode()).hexdigest()
+		return hmac.compare_digest(computed, stored_hash)
+	return False
+
+def is_legacy_hash(stored_hash: str) -> bool:
+	return not stored_hash.startswith("$2")
+
+class CredentialVerifier:
+	"""사용자 해시 보관과 비동기 비밀번호 검증"""
+	def __init__(
+		self,
+		users: Dict[str, str],
+		path: Optional[Path] = None,
+		workers: int = 2,
+		max_pending: int = 32,
+		max_per_user: int = 2,
+		max_per_ip: int = 4,
+		rounds: int = 12
+	):
+		self.users = dict(users)
+		self.path = path
+		self.rounds = rounds
+		self.max_pending = max_pending
+		self.max_per_user = max_per_user
+		self.max_per_ip = max_per_ip
+		self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="credential")
+		self._pending = 0
+		self._per_user: Counter = Counter()
+		self._per_ip: Counter = Counter()
+		self._save_lock = threading.Lock()
+		# 없는 사용자도 같은 시간이 걸리도록 비교할 더미 해시 (시작이 느려지지 않게 처음 사용할 때 생성)
+		self._dummy_hash: Optional[str] = None
+		self._load()
+
+	@classmethod
+	def from_env(cls, users: Dict[str, str]) -> "CredentialVerifier":
+		return cls(
+			users,
+			path=Path(os.environ.get("CREDENTIALS_FILE", "credentials.json")),
+			workers=int(os.environ.get("CREDENTIAL_WORKERS", "2")),
+			max_pending=int(os.environ.get("CREDENTIAL_MAX_PENDING", "32")),
+			max_per_user=int(os.environ.get("CREDENTIAL_MAX_PER_USER", "2")),
+			max_per_ip=int(os.environ.get("CREDENTIAL_MAX_PER_IP", "4")),
+			rounds=int(os.environ.get("CREDENTIAL_BCRYPT_ROUNDS", "12"))
+		)
+
+	def _load(self):
+		"""파일에 저장된 (변환된) 해시로 기본 해시 덮어쓰기"""
+		if self.path is None or not self.path.exists():
+			return
+		try:
+			with open(self.path, "r", encoding="utf-8") as f:
+				self.users.update(json.load(f).get("users", {}))
+		except Exception as e:
+			logger.error(f"비밀번호 해시 파일 로드 오류: {str(e)}")
+
+	def _save(self):
+		if self.path is None:
+			return
+		with self._save_lock:
+			tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+			with open(tmp_path, "w", encoding="utf-8") as f:
+				json.dump({"users": self.users}, f, indent=2)
+			os.chmod(tmp_path, 0o600)
+			os.replace(tmp_path, self.path)
+
+	def _verify_and_upgrade(self, username: str, password: str) -> bool:
+		"""검증 스레드에서 실행 (기존 해시로 성공하면 bcrypt로 변환)"""
+		stored_hash = self.users.get(username)
+		if stored_hash is None:
+			if self._dummy_hash is None:
+				self._dummy_hash = hash_password_bcrypt("dummy-password", self.rounds)
+			check_password(password, self._dummy_hash)
+			return False
+		if not check_password(password, stored_hash):
+			return False
+		if is_legacy_hash(stored_hash):
+			self.users[username] = hash_password_bcrypt(password, self.rounds)
+			try:
+				self._save()
+				logger.info(f"사용자 '{username}' 비밀번호 해시를 bcrypt로 변환")
+			except OSError as e:
+				logger.error(f"비밀번호 해시 저장 오류: {str(e)}")
+		return True
+
+	async def verify(self, username: str, password: str, client_ip: str = "") -> bool:
+		"""비밀번호 확인 (한도를 넘으면 CredentialBusy)"""
+		if (
+			self._pending >= self.max_pending
+			or self._per_user[username] >= self.max_per_user
+			or self._per_ip[client_ip] >= self.max_per_ip
+		):
+			raise CredentialBusy(username)
+		# 카운터는 이벤트 루프 스레드에서만 변경
+		self._pending += 1
+		self._per_user[username] += 1
+		self._per_ip[client_ip] += 1
+		try:
+			loop = asyncio.get_running_loop()
+			return await loop.run_in_executor(self._pool, self._verify_and_upgrade, username, password)
+		finally:
+			self._pending -= 1
+			for counter, key in ((self._per_user, username), (self._per_ip, client_ip)):
+				counter[key] -= 1
+				if counter[key] <= 0:
+					del counter[key]
+
+	def close(self):
+		self._pool.shutdown(wait=False)
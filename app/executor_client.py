@@ -0,0 +1,417 @@
+"""
+SSH Executor 프록시용 비동기 HTTP 클라이언트
+앱 수명 주기 동안 연결 풀(HTTP/1.1 keep-alive)을 하나만 유지해 요청마다 TLS 핸드셰이크를 하지 않는다
+같은 서버에 설치하는 경우 EXECUTOR_MODE=local로 executor 앱을 같은 프로세스에서 직접 호출한다
+
+executor를 여러 대 지정하면 주기적으로 상태를 확인하고,
+새 세션은 부하가 가장 적은 노드에 만들고 이후 세션 요청은 그 세션을 가진 노드로 보낸다
+
+환경 변수:
+	EXECUTOR_MODE              remote | local (기본: remote)
+	EXECUTOR_BASE_URL          SSH Executor 주소, 여러 대면 콤마로 구분 (기본: https://runmcp.hankyeul.com)
+	EXECUTOR_TIMEOUTS          라우트별 타임아웃 덮어쓰기 "execute_in_session=120,ssh_status=5"
+	EXECUTOR_CONNECT_TIMEOUT   연결 타임아웃 초 (기본: 5)
+	EXECUTOR_RETRIES           멱등 요청 재시도 횟수 (기본: 2)
+	EXECUTOR_MAX_CONNECTIONS   최대 동시 연결 수 (기본: 100)
+	EXECUTOR_MAX_KEEPALIVE     유지할 유휴 연결 수 (기본: 20)
+	EXECUTOR_HEALTH_INTERVAL   상태 확인 주기 초 (기본: 5)
+	EXECUTOR_HEALTH_TIMEOUT    상태 확인 타임아웃 초 (기본: 2)
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import httpx
+
+from logging_setup import request_id_var
+from metrics import REGISTRY
+from profiling import phase
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://runmcp.hankyeul.com"
+LOCAL_BASE_URL = "http://executor.local"
+
+# 라우트별 읽기 타임아웃 (초) - 쉘 시작/키 설치처럼 오래 걸리는 작업은 길게
+ROUTE_TIMEOUTS: Dict[str, float] = {
+	"ssh_host_stats": 10,
+	"ssh_status": 30,
+	"ssh_sessions": 30,
+	"ssh_session_info": 30,
+	"ssh_session_history": 30,
+	"create_ssh_session": 10,
+	"execute_in_session": 30,
+	"execute_many_in_session": 60,
+	"run_session_script": 60,
+	"delete_ssh_session": 10,
+	"start_interactive_shell": 60,
+	"send_shell_command": 30,
+	"stop_interactive_shell": 10,
+	"cancel_session_commands": 10,
+	"ssh_key_setup": 60,
+}
+DEFAULT_TIMEOUT = 30.0
+
+# 재시도해도 안전한 메서드 (요청이 두 번 처리돼도 결과가 같음)
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+# 요청이 서버에 도달하지 않았거나 게이트웨이가 거절한 경우에만 재시도
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError, httpx.PoolTimeout)
+RETRYABLE_STATUS = {502, 503, 504}
+RETRY_BACKOFF = 0.1
+# 요청을 보내기 전에 실패한 오류 (메서드와 관계없이 다른 노드로 넘겨도 안전)
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+EXECUTOR_NODE_UP = REGISTRY.gauge("runmcp_web_executor_node_up", "executor 노드 상태 (1: 정상, 0: 장애)", ("node",))
+EXECUTOR_FAILOVERS = REGISTRY.counter("runmcp_web_executor_failovers_total", "연결 실패로 다른 노드에 다시 보낸 요청 수", ("route",))
+
+def _fail_fast(response: httpx.Response) -> bool:
+	"""
+	executor가 호스트 회로가 열려(또는 negative cache로) 바로 거절한 503인지 여부
+	Retry-After까지는 다시 보내도 같은 응답이므로 재시도하지 않고 그대로 돌려준다
+	"""
+	return response.status_code == 503 and "retry-after" in response.headers
+
+class ExecutorUnavailable(httpx.TransportError):
+	"""요청을 보낼 수 있는 정상 노드가 없음 (타임아웃을 기다리지 않고 바로 실패)"""
+
+class ExecutorNode:
+	"""업스트림 executor 한 대의 상태"""
+	def __init__(self, base_url: str):
+		self.base_url = base_url.rstrip("/")
+		self.healthy = True
+		self.inflight = 0
+		self.active_sessions = 0
+		self.last_error: Optional[str] = None
+		self.checked_at: Optional[str] = None
+
+	@property
+	def load(self) -> int:
+		return self.active_sessions + self.inflight
+
+	def mark_down(self, error: str):
+		if self.healthy:
+			logger.warning(f"SSH Executor 노드 장애 감지: {self.base_url} ({error})")
+		self.healthy = False
+		self.last_error = error
+		EXECUTOR_NODE_UP.set(0, self.base_url)
+
+	def mark_up(self):
+		if not self.healthy:
+			logger.info(f"SSH Executor 노드 복구: {self.base_url}")
+		self.healthy = True
+		self.last_error = None
+		EXECUTOR_NODE_UP.set(1, self.base_url)
+
+	def as_dict(self) -> Dict[str, Any]:
+		return {
+			"base_url": self.base_url,
+			"healthy": self.healthy,
+			"active_sessions": self.active_sessions,
+			"inflight": self.inflight,
+			"last_error": self.last_error,
+			"checked_at": self.checked_at
+		}
+
+def _parse_timeouts(spec: str) -> Dict[str, float]:
+	timeouts = {}
+	for item in spec.split(","):
+		name, _, value = item.strip().partition("=")
+		if name and value:
+			timeouts[name.strip()] = float(value)
+	return timeouts
+
+class ExecutorClient:
+	"""SSH Executor 호출 클라이언트 (start()/close()는 앱 lifespan에서 호출)"""
+	def __init__(
+		self,
+		base_url: Union[str, Sequence[str]] = DEFAULT_BASE_URL,
+		timeouts: Optional[Dict[str, float]] = None,
+		connect_timeout: float = 5.0,
+		retries: int = 2,
+		max_connections: int = 100,
+		max_keepalive: int = 20,
+		local_app=None,
+		health_interval: float = 5.0,
+		health_timeout: float = 2.0
+	):
+		base_urls = [base_url] if isinstance(base_url, str) else list(base_url)
+		self.nodes = [ExecutorNode(url) for url in base_urls]
+		self.base_url = self.nodes[0].base_url
+		# 같은 프로세스에서 호출할 executor ASGI 앱 (없으면 원격 호출)
+		self.local_app = local_app
+		self._local_lifespan = None
+		self.timeouts = {**ROUTE_TIMEOUTS, **(timeouts or {})}
+		self.connect_timeout = connect_timeout
+		self.retries = retries
+		self.limits = httpx.Limits(
+			max_connections=max_connections,
+			max_keepalive_connections=max_keepalive,
+			keepalive_expiry=60.0
+		)
+		self.health_interval = health_interval
+		self.health_timeout = health_timeout
+		self._health_task: Optional[asyncio.Task] = None
+		# 세션 ID -> 세션을 가진 노드
+		self._affinity: Dict[str, ExecutorNode] = {}
+		self._client: Optional[httpx.AsyncClient] = None
+		for node in self.nodes:
+			EXECUTOR_NODE_UP.set(1, node.base_url)
+
+	@classmethod
+	def from_env(cls) -> "ExecutorClient":
+		mode = os.environ.get("EXECUTOR_MODE", "remote")
+		if mode == "local":
+			from runmcp_ssh_executor import app_ssh
+			return cls.local(app_ssh)
+		if mode != "remote":
+			raise ValueError(f"알 수 없는 EXECUTOR_MODE: {mode}")
+		base_urls = [url.strip() for url in os.environ.get("EXECUTOR_BASE_URL", DEFAULT_BASE_URL).split(",") if url.strip()]
+		return cls(
+			base_url=base_urls,
+			timeouts=_parse_timeouts(os.environ.get("EXECUTOR_TIMEOUTS", "")),
+			connect_timeout=float(os.environ.get("EXECUTOR_CONNECT_TIMEOUT", "5")),
+			retries=int(os.environ.get("EXECUTOR_RETRIES", "2")),
+			max_connections=int(os.environ.get("EXECUTOR_MAX_CONNECTIONS", "100")),
+			max_keepalive=int(os.environ.get("EXECUTOR_MAX_KEEPALIVE", "20")),
+			health_interval=float(os.environ.get("EXECUTOR_HEALTH_INTERVAL", "5")),
+			health_timeout=float(os.environ.get("EXECUTOR_HEALTH_TIMEOUT", "2"))
+		)
+
+	@classmethod
+	def local(cls, app) -> "ExecutorClient":
+		"""executor 앱을 네트워크 없이 ASGI로 직접 호출 (재시도/상태 확인 불필요)"""
+		return cls(base_url=LOCAL_BASE_URL, retries=0, local_app=app, health_interval=0)
+
+	@property
+	def mode(self) -> str:
+		return "local" if self.local_app is not None else "remote"
+
+	async def start(self):
+		if self._client is not None:
+			return
+		if self.local_app is not None:
+			# 마운트된 하위 앱의 lifespan은 자동으로 실행되지 않으므로 직접 실행
+			self._local_lifespan = self.local_app.router.lifespan_context(self.local_app)
+			await self._local_lifespan.__aenter__()
+			transport = httpx.ASGITransport(app=self.local_app)
+			self._client = httpx.AsyncClient(transport=transport)
+		else:
+			self._client = httpx.AsyncClient(limits=self.limits, http2=False)
+		if self.health_interval > 0:
+			self._health_task = asyncio.create_task(self._health_loop())
+		logger.info(f"SSH Executor 클라이언트 시작 ({self.mode}): {', '.join(node.base_url for node in self.nodes)}")
+
+	async def close(self):
+		if self._health_task is not None:
+			self._health_task.cancel()
+			self._health_task = None
+		if self._client is not None:
+			await self._client.aclose()
+			self._client = None
+		if self._local_lifespan is not None:
+			await self._local_lifespan.__aexit__(None, None, None)
+			self._local_lifespan = None
+
+	@property
+	def client(self) -> httpx.AsyncClient:
+		if self._client is None:
+			raise RuntimeError("ExecutorClient.start()가 호출되지 않았습니다")
+		return self._client
+
+	def timeout_for(self, route: str, extra: float = 0.0) -> httpx.Timeout:
+		"""라우트 타임아웃 (long-poll처럼 서버가 일부러 기다리는 시간은 extra로 더함)"""
+		return httpx.Timeout(self.timeouts.get(route, DEFAULT_TIMEOUT) + extra, connect=self.connect_timeout)
+
+	# ------------------------------------------------------------------
+	# 노드 상태 확인과 선택
+	# ------------------------------------------------------------------
+
+	async def check_node(self, node: ExecutorNode):
+		"""executor 루트(/)로 상태와 활성 세션 수 확인"""
+		node.checked_at = datetime.now().isoformat()
+		try:
+			response = await self.client.get(node.base_url + "/", timeout=self.health_timeout)
+			response.raise_for_status()
+			node.active_sessions = int(response.json().get("active_sessions", 0))
+			node.mark_up()
+		except Exception as e:
+			node.mark_down(repr(e))
+
+	async def _health_loop(self):
+		while True:
+			await asyncio.gather(*(self.check_node(node) for node in self.nodes))
+			await asyncio.sleep(self.health_interval)
+
+	def pick_node(self, exclude: Sequence[ExecutorNode] = ()) -> ExecutorNode:
+		"""부하(활성 세션 + 진행 중 요청)가 가장 적은 정상 노드"""
+		candidates = [node for node in self.nodes if node.healthy and node not in exclude]
+		if not candidates:
+			# 모두 장애로 표시됐으면 제외하지 않은 노드로 시도 (노드가 한 대일 때 기존 동작 유지)
+			candidates = [node for node in self.nodes if node not in exclude]
+		if not candidates:
+			raise ExecutorUnavailable("요청을 보낼 수 있는 SSH Executor 노드가 없습니다")
+		return min(candidates, key=lambda node: node.load)
+
+	def node_of(self, response: httpx.Response) -> Optional[ExecutorNode]:
+		url = str(response.request.url)
+		for node in self.nodes:
+			if url.startswith(node.base_url + "/"):
+				return node
+		return None
+
+	def record_session(self, session_id: str, node: ExecutorNode):
+		self._affinity[session_id] = node
+		node.active_sessions += 1
+
+	def forget_session(self, session_id: str):
+		node = self._affinity.pop(session_id, None)
+		if node is not None and node.active_sessions > 0:
+			node.active_sessions -= 1
+
+	async def node_for_session(self, session_id: str) -> ExecutorNode:
+		"""세션을 가진 노드 (기록이 없으면 각 노드에 물어서 찾음)"""
+		node = self._affinity.get(session_id)
+		if node is None:
+			if len(self.nodes) == 1:
+				return self.nodes[0]
+			node = await self._locate_session(session_id)
+			if node is None:
+				# 어느 노드에도 없으면 executor가 404를 돌려주도록 아무 노드로 보냄
+				return self.pick_node()
+			self._affinity[session_id] = node
+		if not node.healthy and len(self.nodes) > 1:
+			raise ExecutorUnavailable(f"세션을 가진 SSH Executor 노드에 연결할 수 없습니다: {node.base_url}")
+		return node
+
+	async def _locate_session(self, session_id: str) -> Optional[ExecutorNode]:
+		async def probe(node: ExecutorNode) -> Optional[ExecutorNode]:
+			try:
+				response = await self.client.get(f"{node.base_url}/session/{session_id}", timeout=self.health_timeout)
+			except httpx.HTTPError:
+				return None
+			return node if response.status_code == 200 else None
+		found = await asyncio.gather(*(probe(node) for node in self.nodes if node.healthy))
+		return next((node for node in found if node is not None), None)
+
+	def record_sessions(self, node: ExecutorNode, session_ids: Sequence[str]):
+		"""노드의 세션 목록으로 위치 기록 갱신"""
+		for session_id in session_ids:
+			self._affinity[session_id] = node
+		node.active_sessions = len(session_ids)
+
+	def nodes_status(self) -> List[Dict[str, Any]]:
+		return [node.as_dict() for node in self.nodes]
+
+	# ------------------------------------------------------------------
+	# 요청
+	# ------------------------------------------------------------------
+
+	async def request(
+		self,
+		method: str,
+		path: str,
+		route: str,
+		json: Any = None,
+		session_id: Optional[str] = None,
+		headers: Optional[Dict[str, str]] = None,
+		extra_timeout: float = 0.0
+	) -> httpx.Response:
+		"""업스트림 호출 후 본문까지 모두 읽은 응답 반환 (session_id를 주면 세션을 가진 노드로)"""
+		return await self._send(method, path, route, json, stream=False, session_id=session_id, headers=headers, extra_timeout=extra_timeout)
+
+	async def stream(
+		self,
+		method: str,
+		path: str,
+		route: str,
+		json: Any = None,
+		session_id: Optional[str] = None,
+		headers: Optional[Dict[str, str]] = None,
+		extra_timeout: float = 0.0
+	) -> httpx.Response:
+		"""헤더까지만 받은 응답 반환 (본문은 aiter_raw()로 읽고 호출한 쪽에서 aclose() 해야 함)"""
+		return await self._send(method, path, route, json, stream=True, session_id=session_id, headers=headers, extra_timeout=extra_timeout)
+
+	async def gather(self, method: str, path: str, route: str) -> List[Tuple[ExecutorNode, Union[httpx.Response, Exception]]]:
+		"""모든 정상 노드에 같은 요청을 보내고 노드별 응답(또는 예외) 반환"""
+		nodes = [node for node in self.nodes if node.healthy] or list(self.nodes)
+		async def call(node: ExecutorNode):
+			try:
+				return node, await self._send(method, path, route, None, stream=False, node=node)
+			except Exception as e:
+				return node, e
+		return await asyncio.gather(*(call(node) for node in nodes))
+
+	async def _send(
+		self,
+		method: str,
+		path: str,
+		route: str,
+		json: Any,
+		stream: bool,
+		session_id: Optional[str] = None,
+		node: Optional[ExecutorNode] = None,
+		headers: Optional[Dict[str, str]] = None,
+		extra_timeout: float = 0.0
+	) -> httpx.Response:
+		"""
+		멱등 메서드와 Idempotency-Key가 있는 요청만 연결 오류/게이트웨이 오류 시 지수 백오프로 재시도
+		노드를 고정하지 않은 요청은 연결 자체가 실패하면 메서드와 관계없이 다른 노드로 바로 넘긴다
+		"""
+		method = method.upper()
+		pinned = node is not None or session_id is not None
+		if node is None:
+			node = await self.node_for_session(session_id) if session_id else self.pick_node()
+		retryable = method in IDEMPOTENT_METHODS or bool(headers and headers.get("Idempotency-Key"))
+		attempts = 1 + (self.retries if retryable else 0)
+		timeout = self.timeout_for(route, extra_timeout)
+		# 웹 서버와 executor 로그를 같은 요청 ID로 묶을 수 있도록 전달
+		request_id = request_id_var.get()
+		headers = dict(headers or {})
+		if request_id:
+			headers["X-Request-ID"] = request_id
+		failed: List[ExecutorNode] = []
+		attempt = 0
+		while True:
+			request = self.client.build_request(method, node.base_url + path, json=json, headers=headers, timeout=timeout)
+			# 다른 노드로 넘길 때 node를 바꾸므로 이번에 시도한 노드를 따로 기억해 그 노드의 카운트를 되돌림
+			current = node
+			current.inflight += 1
+			try:
+				with phase("upstream"):
+					response = await self.client.send(request, stream=stream)
+			except NOT_SENT_ERRORS as e:
+				node.mark_down(repr(e))
+				alternative = None
+				if not pinned:
+					failed.append(node)
+					try:
+						alternative = self.pick_node(exclude=failed)
+					except ExecutorUnavailable:
+						pass
+				if alternative is not None:
+					EXECUTOR_FAILOVERS.inc(route)
+					logger.warning(f"SSH Executor 다른 노드로 재전송 ({route}): {node.base_url} -> {alternative.base_url}")
+					node = alternative
+					continue
+				if attempt >= attempts - 1:
+					raise
+				logger.warning(f"SSH Executor 요청 재시도 ({route}, {attempt + 1}/{attempts - 1}): {e!r}")
+			except RETRYABLE_ERRORS as e:
+				if attempt >= attempts - 1:
+					raise
+				logger.warning(f"SSH Executor 요청 재시도 ({route}, {attempt + 1}/{attempts - 1}): {e!r}")
+			else:
+				if not node.healthy:
+					node.mark_up()
+				if attempt >= attempts - 1 or response.status_code not in RETRYABLE_STATUS or _fail_fast(response):
+					return response
+				await response.aclose()
+				logger.warning(f"SSH Executor 요청 재시도 ({route}, {attempt + 1}/{attempts - 1}): HTTP {response.status_code}")
+			finally:
+				current.inflight -= 1
+			await asyncio.sleep(RETRY_BACKOFF * (2 ** attempt))
+			attempt += 1
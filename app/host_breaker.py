@@ -0,0 +1,221 @@
+"""
+호스트별 서킷 브레이커
+연결/인증 실패가 연속되면 회로를 열어 연결 타임아웃을 기다리지 않고 바로 실패시키고,
+열린 시간이 지나면 요청 하나만 시험으로 통과시켜(half_open) 성공하면 닫는다 (다시 실패하면 열린 시간 2배)
+DNS 조회/TCP 연결 실패는 한 번만 실패해도 짧은 시간 동안 같은 오류로 바로 실패시킨다 (negative cache)
+연결 타임아웃은 일시적인 지연일 수 있으므로 연속 실패 수에만 반영하고 negative cache에는 넣지 않는다
+인증 실패는 호출하는 쪽에서 사용자별 키("host:port:username")로 기록한다 (한 사용자의 잘못된 인증 정보로 다른 사용자까지 막지 않음)
+
+환경 변수:
+	BREAKER_FAILURES      회로를 여는 연속 실패 수 (기본: 3)
+	BREAKER_BASE_DELAY    처음 열린 시간 초 (기본: 5)
+	BREAKER_MAX_DELAY     최대 열린 시간 초 (기본: 300)
+	NEGATIVE_CACHE_TTL    DNS/TCP 실패를 기억하는 시간 초 (기본: 10, 0이면 사용 안 함)
+"""
+
+import os
+import re
+import socket
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+import paramiko
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# 실패 종류 (dns/tcp만 negative cache 대상, timeout은 연속 실패 수에만 반영)
+NETWORK_FAILURES = ("dns", "tcp")
+AUTH_FAILURE = "auth"
+
+# ssh 프로세스(종료 코드 255) stderr로 실패 종류 구분
+_SSH_STDERR_KINDS = (
+	(re.compile(r"Could not resolve hostname|Name or service not known|Temporary failure in name resolution", re.I), "dns"),
+	(re.compile(r"Connection timed out|Operation timed out", re.I), "timeout"),
+	(re.compile(r"Connection refused|No route to host|Network is unreachable|Connection reset", re.I), "tcp"),
+	(re.compile(r"Permission denied|Too many authentication failures|Host key verification failed", re.I), AUTH_FAILURE),
+)
+
+def classify_exception(error: BaseException) -> Optional[str]:
+	"""paramiko 연결 예외의 실패 종류 (브레이커에 반영하지 않을 오류면 None)"""
+	if isinstance(error, socket.gaierror):
+		return "dns"
+	if isinstance(error, paramiko.AuthenticationException):
+		return AUTH_FAILURE
+	if isinstance(error, socket.timeout):
+		return "timeout"
+	if isinstance(error, (paramiko.ssh_exception.NoValidConnectionsError, ConnectionError)):
+		return "tcp"
+	if isinstance(error, paramiko.SSHException):
+		return "ssh"
+	if isinstance(error, OSError):
+		return "tcp"
+	return None
+
+def classify_ssh_stderr(stderr: Optional[str]) -> Optional[str]:
+	"""
+	ssh 프로세스가 255로 끝났을 때 stderr로 실패 종류 구분
+	원격 명령 자체가 255로 끝난 경우일 수 있으므로 ssh 오류 메시지가 없으면 None
+	"""
+	if not stderr:
+		return None
+	for pattern, kind in _SSH_STDERR_KINDS:
+		if pattern.search(stderr):
+			return kind
+	if "ssh:" in stderr or "kex_exchange_identification" in stderr:
+		return "ssh"
+	return None
+
+class HostUnavailable(Exception):
+	"""회로가 열려 있거나 최근 DNS/TCP 실패가 기억된 호스트"""
+	def __init__(self, host: str, reason: str, retry_after: float, last_error: Optional[str]):
+		super().__init__(f"{host}: {reason}")
+		self.host = host
+		self.reason = reason
+		self.retry_after = retry_after
+		self.last_error = last_error
+
+	def as_dict(self) -> Dict[str, Any]:
+		return {
+			"message": "호스트에 연결할 수 없어 요청을 바로 실패 처리했습니다",
+			"host": self.host,
+			"reason": self.reason,
+			"retry_after": round(self.retry_after, 1),
+			"last_error": self.last_error
+		}
+
+class _HostState:
+	def __init__(self):
+		self.state = CLOSED
+		self.failures = 0
+		self.open_count = 0
+		self.open_until = 0.0
+		self.negative_until = 0.0
+		self.probe_started = 0.0
+		self.last_error: Optional[str] = None
+		self.last_kind: Optional[str] = None
+		self.last_failure_at: Optional[datetime] = None
+
+def _wall_time(monotonic_at: float, now: float) -> Optional[str]:
+	if monotonic_at <= now:
+		return None
+	return datetime.fromtimestamp(time.time() + monotonic_at - now).isoformat(timespec="seconds")
+
+class HostBreaker:
+	"""호스트 키("host:port", 인증 실패는 "host:port:username")별 회로 상태 (여러 스레드에서 사용)"""
+	def __init__(
+		self,
+		failure_threshold: int = 3,
+		base_delay: float = 5.0,
+		max_delay: float = 300.0,
+		negative_ttl: float = 10.0,
+		probe_timeout: float = 60.0,
+		on_change: Optional[Callable[[str, str], None]] = None
+	):
+		self.failure_threshold = failure_threshold
+		self.base_delay = base_delay
+		self.max_delay = max_delay
+		self.negative_ttl = negative_ttl
+		# 시험 요청이 결과를 남기지 않으면(보안 차단 등) 이 시간 후 다른 요청을 시험으로 통과
+		self.probe_timeout = probe_timeout
+		self.on_change = on_change
+		# 상태가 바뀔 때마다 증가 (상태를 포함한 응답 캐시 무효화용)
+		self.version = 0
+		self._hosts: Dict[str, _HostState] = {}
+		self._lock = threading.Lock()
+
+	@classmethod
+	def from_env(cls, on_change: Optional[Callable[[str, str], None]] = None) -> "HostBreaker":
+		return cls(
+			failure_threshold=int(os.environ.get("BREAKER_FAILURES", "3")),
+			base_delay=float(os.environ.get("BREAKER_BASE_DELAY", "5")),
+			max_delay=float(os.environ.get("BREAKER_MAX_DELAY", "300")),
+			negative_ttl=float(os.environ.get("NEGATIVE_CACHE_TTL", "10")),
+			on_change=on_change
+		)
+
+	def _notify(self, key: str, state: str):
+		if self.on_change is not None:
+			self.on_change(key, state)
+
+	def check(self, key: str):
+		"""요청을 보내도 되는지 확인 (안 되면 HostUnavailable)"""
+		if key not in self._hosts:
+			return
+		now = time.monotonic()
+		changed = None
+		with self._lock:
+			host = self._hosts.get(key)
+			if host is None:
+				return
+			if host.state == OPEN:
+				if now < host.open_until:
+					raise HostUnavailable(key, OPEN, host.open_until - now, host.last_error)
+				host.state = HALF_OPEN
+				host.probe_started = now
+				self.version += 1
+				changed = HALF_OPEN
+			elif host.state == HALF_OPEN:
+				if now - host.probe_started < self.probe_timeout:
+					raise HostUnavailable(key, HALF_OPEN, self.probe_timeout - (now - host.probe_started), host.last_error)
+				host.probe_started = now
+			elif host.negative_until > now:
+				raise HostUnavailable(key, "negative_cache", host.negative_until - now, host.last_error)
+		if changed:
+			self._notify(key, changed)
+
+	def record_success(self, key: str):
+		if key not in self._hosts:
+			return
+		with self._lock:
+			host = self._hosts.pop(key, None)
+			self.version += 1
+		if host is not None and host.state != CLOSED:
+			self._notify(key, CLOSED)
+
+	def record_failure(self, key: str, kind: str, error: str):
+		now = time.monotonic()
+		changed = None
+		with self._lock:
+			host = self._hosts.setdefault(key, _HostState())
+			self.version += 1
+			host.failures += 1
+			host.last_error = error
+			host.last_kind = kind
+			host.last_failure_at = datetime.now()
+			if kind in NETWORK_FAILURES and self.negative_ttl > 0:
+				host.negative_until = now + self.negative_ttl
+			if host.state == HALF_OPEN or (host.state == CLOSED and host.failures >= self.failure_threshold):
+				delay = min(self.base_delay * (2 ** host.open_count), self.max_delay)
+				host.open_count += 1
+				host.state = OPEN
+				host.open_until = now + delay
+				changed = OPEN
+		if changed:
+			self._notify(key, changed)
+
+	def _describe(self, host: _HostState, now: float) -> Dict[str, Any]:
+		return {
+			"state": host.state,
+			"failures": host.failures,
+			"last_error": host.last_error,
+			"last_failure_kind": host.last_kind,
+			"last_failure_at": host.last_failure_at.isoformat(timespec="seconds") if host.last_failure_at else None,
+			"open_until": _wall_time(host.open_until, now) if host.state == OPEN else None,
+			"negative_until": _wall_time(host.negative_until, now)
+		}
+
+	def state(self, key: str) -> Dict[str, Any]:
+		with self._lock:
+			host = self._hosts.get(key)
+			if host is None:
+				return {"state": CLOSED, "failures": 0}
+			return self._describe(host, time.monotonic())
+
+	def states(self) -> Dict[str, Dict[str, Any]]:
+		now = time.monotonic()
+		with self._lock:
+			return {key: self._describe(host, now) for key, host in self._hosts.items()}
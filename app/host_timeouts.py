@@ -0,0 +1,135 @@
+"""
+호스트별 적응형 타임아웃
+호스트("host:port")마다 연결 시간, 대화형 쉘 첫 바이트 시간, 출력 조각 사이 대기 시간을 기록하고
+최근 값의 p99에 배수를 곱해 연결/출력 대기 타임아웃을 정한다 (설정한 최소/최대 범위 안에서)
+LAN 호스트는 고정 기본값보다 빨리 끝나고, 느린 WAN 호스트는 기본값보다 길게 기다린다
+
+타임아웃에 걸린 대기는 그 대기 시간을 값으로 기록해 (실제 시간은 그보다 길다)
+계속 시간을 넘기는 호스트의 타임아웃이 점점 늘어나게 한다
+
+환경 변수:
+	ADAPTIVE_TIMEOUTS          사용 여부 (기본: 1, 0이면 고정 기본값 사용)
+	ADAPTIVE_WINDOW            호스트/항목별 보관할 최근 값 수 (기본: 200)
+	ADAPTIVE_MIN_SAMPLES       값이 이 수보다 적으면 고정 기본값 사용 (기본: 5)
+	ADAPTIVE_FACTOR            p99에 곱할 배수 (기본: 3)
+	CONNECT_TIMEOUT_MIN        연결 타임아웃 최소 초 (기본: 2, 최대는 요청/서버 설정의 timeout)
+	SHELL_FIRST_BYTE_MIN       쉘 출력 첫 바이트 대기 최소 초 (기본: 0.5)
+	SHELL_FIRST_BYTE_MAX       쉘 출력 첫 바이트 대기 최대 초 (기본: 15)
+	SHELL_IDLE_MIN             쉘 출력 조각 사이 대기 최소 초 (기본: 1)
+	SHELL_IDLE_MAX             쉘 출력 조각 사이 대기 최대 초 (기본: 10)
+"""
+
+import os
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+# 기록 항목
+CONNECT = "connect"
+FIRST_BYTE = "first_byte"
+IDLE_GAP = "idle_gap"
+
+def _clamp(value: float, low: float, high: float) -> float:
+	return max(low, min(value, high))
+
+class AdaptiveTimeouts:
+	"""호스트/항목별 최근 지연 시간(초)과 그로부터 계산한 타임아웃 (여러 스레드에서 사용)"""
+	def __init__(
+		self,
+		enabled: bool = True,
+		window: int = 200,
+		min_samples: int = 5,
+		factor: float = 3.0,
+		connect_min: float = 2.0,
+		first_byte_min: float = 0.5,
+		first_byte_max: float = 15.0,
+		idle_min: float = 1.0,
+		idle_max: float = 10.0
+	):
+		self.enabled = enabled
+		self.window = window
+		self.min_samples = min_samples
+		self.factor = factor
+		self.connect_min = connect_min
+		self.first_byte_min = first_byte_min
+		self.first_byte_max = first_byte_max
+		self.idle_min = idle_min
+		self.idle_max = idle_max
+		self._samples: Dict[str, Dict[str, Deque[float]]] = {}
+		self._lock = threading.Lock()
+
+	@classmethod
+	def from_env(cls) -> "AdaptiveTimeouts":
+		return cls(
+			enabled=os.environ.get("ADAPTIVE_TIMEOUTS", "1") != "0",
+			window=int(os.environ.get("ADAPTIVE_WINDOW", "200")),
+			min_samples=int(os.environ.get("ADAPTIVE_MIN_SAMPLES", "5")),
+			factor=float(os.environ.get("ADAPTIVE_FACTOR", "3")),
+			connect_min=float(os.environ.get("CONNECT_TIMEOUT_MIN", "2")),
+			first_byte_min=float(os.environ.get("SHELL_FIRST_BYTE_MIN", "0.5")),
+			first_byte_max=float(os.environ.get("SHELL_FIRST_BYTE_MAX", "15")),
+			idle_min=float(os.environ.get("SHELL_IDLE_MIN", "1")),
+			idle_max=float(os.environ.get("SHELL_IDLE_MAX", "10"))
+		)
+
+	def record(self, key: str, kind: str, seconds: float):
+		with self._lock:
+			kinds = self._samples.setdefault(key, {})
+			samples = kinds.get(kind)
+			if samples is None:
+				samples = deque(maxlen=self.window)
+				kinds[kind] = samples
+			samples.append(seconds)
+
+	def _learned(self, key: str, kind: str) -> Optional[float]:
+		"""p99 × 배수 (값이 부족하거나 사용하지 않으면 None)"""
+		if not self.enabled:
+			return None
+		with self._lock:
+			samples = self._samples.get(key, {}).get(kind)
+			if samples is None or len(samples) < self.min_samples:
+				return None
+			ordered = sorted(samples)
+		return ordered[min(len(ordered) - 1, int(round(0.99 * (len(ordered) - 1))))] * self.factor
+
+	def connect_timeout(self, key: str, configured: float) -> float:
+		"""연결 타임아웃 (설정값보다 길어지지 않음)"""
+		learned = self._learned(key, CONNECT)
+		if learned is None:
+			return configured
+		return _clamp(learned, min(self.connect_min, configured), configured)
+
+	def shell_waits(self, key: str, default: float) -> Tuple[float, float]:
+		"""대화형 쉘 출력 읽기의 (첫 바이트 대기, 출력 조각 사이 대기) 초"""
+		first_byte = self._learned(key, FIRST_BYTE)
+		idle = self._learned(key, IDLE_GAP)
+		return (
+			default if first_byte is None else _clamp(first_byte, self.first_byte_min, self.first_byte_max),
+			default if idle is None else _clamp(idle, self.idle_min, self.idle_max)
+		)
+
+	def summary(self, connect_default: float = 30.0, shell_default: float = 2.0) -> Dict[str, Dict[str, Any]]:
+		"""호스트별 값 개수/p50/p99(밀리초)와 현재 적용되는 타임아웃(초)"""
+		with self._lock:
+			snapshot = {key: {kind: sorted(values) for kind, values in kinds.items()} for key, kinds in self._samples.items()}
+		result = {}
+		for key, kinds in snapshot.items():
+			stats = {}
+			for kind, ordered in kinds.items():
+				if not ordered:
+					continue
+				stats[kind] = {
+					"count": len(ordered),
+					"p50": round(ordered[int(round(0.50 * (len(ordered) - 1)))] * 1000.0, 2),
+					"p99": round(ordered[int(round(0.99 * (len(ordered) - 1)))] * 1000.0, 2)
+				}
+			first_byte, idle = self.shell_waits(key, shell_default)
+			result[key] = {
+				"samples": stats,
+				"timeouts": {
+					"connect": round(self.connect_timeout(key, connect_default), 3),
+					"shell_first_byte": round(first_byte, 3),
+					"shell_idle": round(idle, 3)
+				}
+			}
+		return result
@@ -0,0 +1,106 @@
+"""
+서버 목록(인벤토리) 캐시
+DB와 servers.json을 매 요청마다 다시 읽지 않도록 직렬화된 스냅샷을 보관하고 ETag로 변경 여부를 알린다
+"""
+
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import Request, Response
+
+# 저장소 루트의 servers.json (웹 서버와 SSH Executor가 함께 사용)
+SERVERS_FILE = Path(__file__).parent.parent / "servers.json"
+
+class Snapshot:
+	"""한 시점의 응답 본문과 ETag"""
+	def __init__(self, payload: Dict[str, Any], built_at: float):
+		self.payload = payload
+		self.body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+		self.etag = '"' + hashlib.sha256(self.body).hexdigest()[:32] + '"'
+		self.built_at = built_at
+
+def _file_signature(path: Path) -> Optional[Tuple[int, int]]:
+	try:
+		stat = path.stat()
+	except OSError:
+		return None
+	return (stat.st_mtime_ns, stat.st_size)
+
+class CachedSnapshot:
+	"""
+	build()의 결과를 캐시 (invalidate 호출, TTL 만료, 감시 파일의 mtime/크기 변경 시 다시 생성)
+	build 결과에 "error"가 있으면 (DB 조회 실패 등) error_ttl 동안만 보관
+	"""
+	def __init__(
+		self,
+		build: Callable[[], Dict[str, Any]],
+		ttl: float = 30.0,
+		watch: Sequence[Path] = (),
+		error_ttl: float = 2.0
+	):
+		self._build = build
+		self.ttl = ttl
+		self.error_ttl = error_ttl
+		self.watch = list(watch)
+		self._snapshot: Optional[Snapshot] = None
+		self._snapshot_ttl = ttl
+		self._signatures: List[Optional[Tuple[int, int]]] = []
+		# invalidate마다 바뀜 (생성 중에 invalidate되면 그 결과는 변경 전 데이터일 수 있으므로 저장하지 않음)
+		self._generation = 0
+		self._lock = threading.Lock()
+
+	def invalidate(self):
+		# 동시에 호출돼 증가가 하나 빠져도 값은 바뀌므로 생성 중인 결과는 버려진다
+		self._generation += 1
+		self._snapshot = None
+
+	def fresh(self) -> Optional[Snapshot]:
+		"""다시 만들 필요가 없는 스냅샷 (없으면 None) - 파일 stat만 하므로 이벤트 루프에서 호출 가능"""
+		snapshot = self._snapshot
+		if snapshot is None:
+			return None
+		if self._snapshot_ttl and time.monotonic() - snapshot.built_at > self._snapshot_ttl:
+			return None
+		if [_file_signature(path) for path in self.watch] != self._signatures:
+			return None
+		return snapshot
+
+	def get(self) -> Snapshot:
+		"""최신 스냅샷 반환 (동시에 여러 요청이 와도 한 번만 다시 생성)"""
+		snapshot = self.fresh()
+		if snapshot is not None:
+			return snapshot
+		with self._lock:
+			snapshot = self.fresh()
+			if snapshot is not None:
+				return snapshot
+			# 파일 서명과 세대는 읽기 전에 기록 (읽는 도중 바뀌면 다음 요청에서 다시 생성)
+			signatures = [_file_signature(path) for path in self.watch]
+			generation = self._generation
+			snapshot = Snapshot(self._build(), time.monotonic())
+			if generation == self._generation:
+				self._signatures = signatures
+				self._snapshot_ttl = self.error_ttl if snapshot.payload.get("error") else self.ttl
+				self._snapshot = snapshot
+			return snapshot
+
+def load_servers_file(path: Path = SERVERS_FILE) -> Optional[Dict[str, Any]]:
+	"""servers.json 읽기 (파일이 없으면 None)"""
+	if not path.exists():
+		return None
+	with open(path, "r", encoding="utf-8") as f:
+		data = json.load(f)
+	return {"servers": data.get("servers", []), "default_settings": data.get("default_settings", {})}
+
+def etag_response(request: Request, snapshot: Snapshot) -> Response:
+	"""If-None-Match가 현재 ETag와 같으면 본문 없이 304 응답"""
+	headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+	if_none_match = request.headers.get("if-none-match", "")
+	tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+	if snapshot.etag in tags or "*" in tags:
+		return Response(status_code=304, headers=headers)
+	return Response(content=snapshot.body, media_type="application/json", headers=headers)
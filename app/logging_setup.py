@@ -0,0 +1,190 @@
+"""
+공통 로깅 설정 (웹 서버와 SSH Executor가 함께 사용)
+요청 경로에서는 큐에 레코드만 넣고, 파일/콘솔 쓰기는 백그라운드 리스너 스레드가 처리한다
+
+환경 변수:
+	LOG_DIR              로그 디렉터리 (기본: 현재 디렉터리)
+	LOG_LEVEL            기본 레벨 (기본: INFO)
+	LOG_LEVELS           모듈별 레벨 "paramiko=WARNING,runmcp_ssh_executor=DEBUG"
+	LOG_ROTATE           size | time (기본: size)
+	LOG_MAX_BYTES        size 회전 기준 바이트 (기본: 20MB)
+	LOG_ROTATE_WHEN      time 회전 주기 (기본: midnight)
+	LOG_BACKUP_COUNT     보관할 회전 파일 수 (기본: 10)
+	LOG_PER_PID          1이면 프로세스별 파일 사용 (워커 여러 개로 실행할 때)
+	LOG_CONSOLE          0이면 콘솔 출력 끔
+	LOG_QUEUE_SIZE       큐 최대 길이, 가득 차면 레코드를 버림 (기본: 10000)
+	LOG_DEBUG_SAMPLE     요청별 DEBUG 로그를 남길 비율 0.0~1.0 (기본: 0)
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from metrics import REGISTRY
+
+LOG_DROPPED = REGISTRY.counter("runmcp_log_dropped_total", "로그 큐가 가득 차서 버린 레코드 수")
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# 기본 모듈별 레벨 (라이브러리의 연결/패킷 단위 로그는 요청 경로에서 불필요)
+DEFAULT_LEVELS = {
+	"paramiko": "WARNING",
+	"httpx": "WARNING",
+	"httpcore": "WARNING",
+}
+
+# 요청 컨텍스트 (요청 ID, DEBUG 샘플링 여부)
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+debug_sampled_var: contextvars.ContextVar[bool] = contextvars.ContextVar("debug_sampled", default=False)
+
+# LogRecord 기본 속성 (이외의 속성은 extra 필드로 JSON에 포함)
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_debug_sample_rate = 0.0
+_base_levelno = logging.INFO
+# LOG_LEVELS로 기본 레벨보다 낮게 지정한 로거 (샘플링과 무관하게 통과)
+_verbose_loggers: tuple = ()
+
+class JsonFormatter(logging.Formatter):
+	"""한 줄에 JSON 객체 하나씩 출력"""
+	def format(self, record: logging.LogRecord) -> str:
+		entry = {
+			"ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+			"level": record.levelname,
+			"logger": record.name,
+			"msg": record.getMessage(),
+			"pid": record.process,
+		}
+		request_id = getattr(record, "request_id", None)
+		if request_id:
+			entry["request_id"] = request_id
+		for key, value in vars(record).items():
+			if key not in _RECORD_ATTRS and not key.startswith("_"):
+				entry[key] = value
+		if record.exc_info and not record.exc_text:
+			record.exc_text = self.formatException(record.exc_info)
+		if record.exc_text:
+			entry["exc"] = record.exc_text
+		return json.dumps(entry, ensure_ascii=False, default=str)
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+	"""요청 스레드에서는 메시지 포맷과 큐 삽입만 수행 (큐가 가득 차면 기다리지 않고 버림)"""
+	def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+		record.request_id = request_id_var.get()
+		record.message = record.getMessage()
+		record.msg = record.message
+		record.args = None
+		if record.exc_info:
+			# 예외 객체는 스레드를 넘기지 않고 문자열로 변환
+			record.exc_text = logging.Formatter().formatException(record.exc_info)
+			record.exc_info = None
+		return record
+
+	def enqueue(self, record: logging.LogRecord):
+		try:
+			self.queue.put_nowait(record)
+		except queue.Full:
+			LOG_DROPPED.inc()
+
+class _DebugSampleFilter(logging.Filter):
+	"""기본 레벨 미만의 레코드는 샘플링된 요청 안에서만 통과"""
+	def filter(self, record: logging.LogRecord) -> bool:
+		if record.levelno >= _base_levelno:
+			return True
+		if record.name.startswith(_verbose_loggers):
+			return True
+		return debug_sampled_var.get()
+
+def _parse_levels(spec: str) -> Dict[str, str]:
+	levels = {}
+	for item in spec.split(","):
+		name, _, level = item.strip().partition("=")
+		if name and level:
+			levels[name.strip()] = level.strip().upper()
+	return levels
+
+def _file_handler(path: Path) -> logging.Handler:
+	backup_count = int(os.environ.get("LOG_BACKUP_COUNT", "10"))
+	if os.environ.get("LOG_ROTATE", "size") == "time":
+		return logging.handlers.TimedRotatingFileHandler(
+			path, when=os.environ.get("LOG_ROTATE_WHEN", "midnight"), backupCount=backup_count, encoding="utf-8"
+		)
+	return logging.handlers.RotatingFileHandler(
+		path, maxBytes=int(os.environ.get("LOG_MAX_BYTES", str(20 * 1024 * 1024))), backupCount=backup_count, encoding="utf-8"
+	)
+
+def setup_logging(service: str) -> logging.handlers.QueueListener:
+	"""루트 로거를 큐 핸들러로 교체하고 백그라운드 리스너 시작 (여러 번 호출해도 한 번만 설정)"""
+	global _listener, _debug_sample_rate, _base_levelno, _verbose_loggers
+	if _listener is not None:
+		return _listener
+
+	log_dir = Path(os.environ.get("LOG_DIR", "."))
+	log_dir.mkdir(parents=True, exist_ok=True)
+	filename = f"{service}.{os.getpid()}.log" if os.environ.get("LOG_PER_PID") == "1" else f"{service}.log"
+
+	file_handler = _file_handler(log_dir / filename)
+	file_handler.setFormatter(JsonFormatter())
+	handlers = [file_handler]
+	if os.environ.get("LOG_CONSOLE", "1") != "0":
+		console = logging.StreamHandler(sys.stdout)
+		console.setFormatter(logging.Formatter(TEXT_FORMAT))
+		handlers.append(console)
+
+	_debug_sample_rate = float(os.environ.get("LOG_DEBUG_SAMPLE", "0"))
+	base_level = os.environ.get("LOG_LEVEL", "INFO").upper()
+	_base_levelno = logging.getLevelName(base_level)
+	# 샘플링을 켜면 DEBUG 레코드를 만들되 필터에서 샘플링된 요청만 통과시킨다
+	root_level = "DEBUG" if _debug_sample_rate > 0 else base_level
+	levels = {**DEFAULT_LEVELS, **_parse_levels(os.environ.get("LOG_LEVELS", ""))}
+	_verbose_loggers = tuple(
+		name for name, level in levels.items() if logging.getLevelName(level) < _base_levelno
+	)
+
+	log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=int(os.environ.get("LOG_QUEUE_SIZE", "10000")))
+	queue_handler = _NonBlockingQueueHandler(log_queue)
+	queue_handler.addFilter(_DebugSampleFilter())
+
+	root = logging.getLogger()
+	for handler in list(root.handlers):
+		root.removeHandler(handler)
+	root.addHandler(queue_handler)
+	root.setLevel(root_level)
+	for name, level in levels.items():
+		logging.getLogger(name).setLevel(level)
+
+	_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+	_listener.start()
+	atexit.register(shutdown_logging)
+	return _listener
+
+def shutdown_logging():
+	"""큐에 남은 레코드를 모두 쓰고 리스너 종료"""
+	global _listener
+	if _listener is not None:
+		_listener.stop()
+		_listener = None
+
+async def request_log_context(request, call_next):
+	"""요청 ID를 지정하고 DEBUG 로그 샘플링 여부를 결정하는 HTTP 미들웨어"""
+	request_id = request.headers.get("x-request-id") or uuid.uuid4().hex[:12]
+	id_token = request_id_var.set(request_id)
+	sampled_token = debug_sampled_var.set(_debug_sample_rate > 0 and random.random() < _debug_sample_rate)
+	try:
+		response = await call_next(request)
+	finally:
+		request_id_var.reset(id_token)
+		debug_sampled_var.reset(sampled_token)
+	response.headers["X-Request-ID"] = request_id
+	return response
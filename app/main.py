@@ -1,8 +1,10 @@
 from fastapi import Request, FastAPI, HTTPException, Depends, Response
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
+import asyncio
 import logging
 import os
 import sys
@@ -11,93 +13,225 @@ import hashlib
 import hmac
 import base64
 import json
+import time
 import uuid
-import pymysql
 from datetime import datetime, timedelta
-from typing import Optional, Dict, List
+from typing import Any, Optional, Dict, List
 from pathlib import Path
 import re
+from contextlib import asynccontextmanager
+import httpx
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+
+from metrics import REGISTRY, CONTENT_TYPE_LATEST, threadpool_queue_depth
+from logging_setup import setup_logging, request_log_context
+from executor_client import ExecutorClient
+from models import create_db_engine, MYSQL_CONFIG
+from session_store import create_session_store
+from credentials import CredentialVerifier, CredentialBusy
+from profiling import phase, request_timing, slowest_requests, recent_profiles, profiling_config, ROUTE_LATENCY
+from coalescing import SingleFlight
+from inventory import CachedSnapshot, SERVERS_FILE, etag_response, load_servers_file
+
+# 로깅 설정 (큐 기반 비동기 기록, runmcp_web.log에 JSON 라인으로 저장)
+# 로컬 모드에서 executor 모듈을 불러오기 전에 설정해야 같은 파일에 기록된다
+setup_logging("runmcp_web")
+logger = logging.getLogger(__name__)
+
+# SSH Executor 프록시 클라이언트 (연결 풀은 lifespan에서 열고 닫음)
+executor = ExecutorClient.from_env()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+	"""앱 수명 주기 관리"""
+	await executor.start()
+	# DB 확인은 백그라운드로 (DB가 없어도 워커가 바로 요청을 받음, 연결은 첫 쿼리 때 생성)
+	db_check = asyncio.create_task(wait_for_database())
+	yield
+	db_check.cancel()
+	# 진행 중인 DB 확인이 끝난 뒤에 엔진을 정리 (스레드 풀의 확인 쿼리는 끝날 때까지 기다림)
+	await asyncio.gather(db_check, return_exceptions=True)
+	await executor.close()
+	db_engine.dispose()
+	session_store.close()
+	credential_verifier.close()
+
+app = FastAPI(lifespan=lifespan)
+
+# 로컬 모드에서는 executor API를 /executor 아래에 마운트 (웹 서버의 인증 미들웨어를 거침)
+if executor.local_app is not None:
+	app.mount("/executor", executor.local_app)
 
-app = FastAPI()
 templates = Jinja2Templates(directory="templates")
 
 # 세션 관리를 위한 시크릿 키 설정
 SECRET_KEY = os.environ.get("SECRET_KEY", "your-secret-key-change-this-in-production")
 
-# 로깅 설정
-logging.basicConfig(
-	level=logging.INFO,
-	format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-	handlers=[
-		logging.FileHandler('runmcp_ssh.log'),
-		logging.StreamHandler(sys.stdout)
-	]
+# 메트릭 정의
+PROXY_SECONDS = REGISTRY.histogram("runmcp_web_proxy_seconds", "SSH Executor 프록시 호출 소요 시간", ("route",))
+PROXY_TIMEOUTS = REGISTRY.counter("runmcp_web_proxy_timeouts_total", "SSH Executor 프록시 타임아웃 횟수", ("route",))
+PROXY_COALESCED = REGISTRY.counter("runmcp_web_proxy_coalesced_total", "다른 요청과 합쳐져 업스트림을 호출하지 않은 요청 수 (inflight: 진행 중 호출 대기, cached: 최근 결과 재사용)", ("route", "kind"))
+SECURITY_CHECK_SECONDS = REGISTRY.histogram("runmcp_web_security_check_seconds", "명령어 보안 검사 소요 시간")
+SECURITY_BLOCKS = REGISTRY.counter("runmcp_web_security_blocks_total", "보안 규칙 분류별 차단 횟수", ("category",))
+THREADPOOL_QUEUE = REGISTRY.gauge("runmcp_web_threadpool_queue_depth", "스레드 풀 대기 작업 수")
+THREADPOOL_QUEUE.set_function(threadpool_queue_depth)
+
+def apply_server_timing(response: Response, upstream_headers, started: float):
+	"""업스트림 Server-Timing 헤더를 전달하고 프록시 구간 시간을 덧붙임"""
+	proxy_timing = f"proxy;dur={(time.perf_counter() - started) * 1000.0:.2f}"
+	upstream_timing = upstream_headers.get("Server-Timing")
+	response.headers["Server-Timing"] = f"{upstream_timing}, {proxy_timing}" if upstream_timing else proxy_timing
+
+# 프록시가 그대로 전달하면 안 되는 연결 단위(hop-by-hop) 헤더와 웹 서버가 직접 붙이는 헤더
+HOP_BY_HOP_HEADERS = {
+	"connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+	"te", "trailer", "trailers", "transfer-encoding", "upgrade",
+	"date", "server", "x-request-id"
+}
+
+async def proxy_stream(
+	method: str,
+	path: str,
+	route: str,
+	json=None,
+	started: Optional[float] = None,
+	session_id: Optional[str] = None,
+	headers: Optional[Dict[str, str]] = None
+) -> StreamingResponse:
+	"""업스트림 응답을 JSON 디코딩 없이 상태 코드/헤더와 함께 받은 바이트 그대로 전달"""
+	if method != "GET":
+		# 세션 상태를 바꾸는 요청이면 폴링용 캐시 결과를 버림
+		upstream_flight.invalidate()
+	with PROXY_SECONDS.time(route):
+		upstream = await executor.stream(method, path, route, json=json, session_id=session_id, headers=headers)
+	# Connection 헤더에 나열된 헤더도 hop-by-hop으로 취급
+	dropped = HOP_BY_HOP_HEADERS | {
+		token.strip().lower() for token in upstream.headers.get("connection", "").split(",") if token.strip()
+	}
+	response = StreamingResponse(
+		upstream.aiter_raw(),
+		status_code=upstream.status_code,
+		background=BackgroundTask(upstream.aclose)
+	)
+	response.raw_headers.extend(
+		(name.lower().encode("latin-1"), value.encode("latin-1"))
+		for name, value in upstream.headers.multi_items()
+		if name.lower() not in dropped
+	)
+	if started is not None:
+		apply_server_timing(response, upstream.headers, started)
+	return response
+
+class UpstreamSnapshot:
+	"""본문까지 읽은 업스트림 GET 응답 (합쳐진 요청들이 함께 사용)"""
+	def __init__(self, response: httpx.Response):
+		self.status_code = response.status_code
+		# 본문은 이미 디코딩되어 있으므로 길이/인코딩 헤더는 다시 계산
+		self.headers = {
+			name: value for name, value in response.headers.items()
+			if name.lower() not in HOP_BY_HOP_HEADERS | {"content-length", "content-encoding"}
+		}
+		self.body = response.content
+
+	@property
+	def etag(self) -> Optional[str]:
+		return self.headers.get("etag")
+
+	def json(self):
+		return json.loads(self.body)
+
+	def to_response(self, request: Optional[Request] = None) -> Response:
+		"""요청의 If-None-Match가 업스트림 ETag와 같으면 본문 없이 304"""
+		if request is not None and self.status_code == 200 and etag_matches(request.headers.get("if-none-match"), self.etag):
+			return Response(status_code=304, headers={"ETag": self.etag, "Cache-Control": "no-cache"})
+		return Response(content=self.body, status_code=self.status_code, headers=self.headers)
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+	if not if_none_match or not etag:
+		return False
+	return etag in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+
+# 폴링 GET 합치기 (같은 경로의 동시 요청은 업스트림 호출 하나를 공유하고 COALESCE_TTL초 동안 결과 재사용)
+upstream_flight = SingleFlight(
+	ttl=float(os.environ.get("COALESCE_TTL", "0.5")),
+	cacheable=lambda snapshot: snapshot.status_code < 500
 )
-logger = logging.getLogger(__name__)
+
+async def fetch_shared(path: str, route: str, session_id: Optional[str] = None) -> UpstreamSnapshot:
+	"""업스트림 GET 호출 (동일 경로 요청과 합쳐짐)"""
+	async def fetch() -> UpstreamSnapshot:
+		with PROXY_SECONDS.time(route):
+			return UpstreamSnapshot(await executor.request("GET", path, route, session_id=session_id))
+	snapshot, shared = await upstream_flight.do(path, fetch)
+	if shared:
+		PROXY_COALESCED.inc(route, shared)
+	return snapshot
+
+async def fetch_all_sessions() -> UpstreamSnapshot:
+	"""모든 executor 노드의 세션 목록을 합쳐서 반환 (노드가 한 대면 그대로 전달)"""
+	if len(executor.nodes) == 1:
+		return await fetch_shared("/sessions", "ssh_sessions")
+	async def fetch() -> UpstreamSnapshot:
+		sessions, errors = [], []
+		with PROXY_SECONDS.time("ssh_sessions"):
+			results = await executor.gather("GET", "/sessions", "ssh_sessions")
+		for node, result in results:
+			if isinstance(result, Exception) or result.status_code != 200:
+				errors.append({"executor": node.base_url, "error": str(result) if isinstance(result, Exception) else f"HTTP {result.status_code}"})
+				continue
+			node_sessions = result.json().get("sessions", [])
+			executor.record_sessions(node, [session["session_id"] for session in node_sessions])
+			sessions.extend(node_sessions)
+		body = {"sessions": sessions}
+		if errors:
+			body["errors"] = errors
+		content = json.dumps(body).encode()
+		# 합친 목록은 노드별 ETag가 없으므로 본문 해시로 ETag 생성
+		etag = '"' + hashlib.sha256(content).hexdigest()[:32] + '"'
+		return UpstreamSnapshot(httpx.Response(200, content=content, headers={"Content-Type": "application/json", "ETag": etag}))
+	snapshot, shared = await upstream_flight.do("/sessions", fetch)
+	if shared:
+		PROXY_COALESCED.inc("ssh_sessions", shared)
+	return snapshot
+
+def idempotency_headers(request: Request) -> Optional[Dict[str, str]]:
+	"""명령 실행 요청의 Idempotency-Key를 executor로 전달 (재시도해도 한 번만 실행)"""
+	key = request.headers.get("idempotency-key")
+	return {"Idempotency-Key": key} if key else None
+
+# long-poll 최대 대기 시간 (초, executor와 같음)
+MAX_POLL_WAIT = 60.0
+
+async def fetch_long_poll(
+	request: Request,
+	path: str,
+	route: str,
+	wait: float,
+	session_id: Optional[str] = None
+) -> UpstreamSnapshot:
+	"""
+	?wait= long-poll 요청은 합치지 않고 If-None-Match와 함께 그대로 전달
+	(응답 시점이 클라이언트가 가진 ETag마다 다르므로 공유할 수 없음)
+	"""
+	wait = min(wait, MAX_POLL_WAIT)
+	headers = {}
+	if request.headers.get("if-none-match"):
+		headers["If-None-Match"] = request.headers["if-none-match"]
+	with PROXY_SECONDS.time(route):
+		response = await executor.request(
+			"GET", f"{path}?wait={wait:g}", route,
+			session_id=session_id, headers=headers, extra_timeout=wait
+		)
+	return UpstreamSnapshot(response)
+
 # =============================================================================
 # 자체 세션 관리 시스템 (외부 의존성 없음)
 # =============================================================================
 
-class SimpleSessionStore:
-	"""메모리 기반 간단한 세션 저장소"""
-	def __init__(self):
-		self.sessions: Dict[str, Dict] = {}
-		self.session_timeout = timedelta(hours=24)  # 24시간
-	
-	def create_session(self, user_data: Dict) -> str:
-		"""새 세션 생성"""
-		session_id = str(uuid.uuid4())
-		self.sessions[session_id] = {
-			**user_data,
-			'created_at': datetime.now(),
-			'last_accessed': datetime.now()
-		}
-		return session_id
-	
-	def get_session(self, session_id: str) -> Optional[Dict]:
-		"""세션 데이터 조회"""
-		if not session_id or session_id not in self.sessions:
-			return None
-			
-		session_data = self.sessions[session_id]
-		
-		# 세션 만료 확인
-		if datetime.now() - session_data['last_accessed'] > self.session_timeout:
-			del self.sessions[session_id]
-			return None
-		
-		# 마지막 접근 시간 업데이트
-		session_data['last_accessed'] = datetime.now()
-		return session_data
-	
-	def update_session(self, session_id: str, data: Dict) -> bool:
-		"""세션 데이터 업데이트"""
-		if session_id in self.sessions:
-			self.sessions[session_id].update(data)
-			self.sessions[session_id]['last_accessed'] = datetime.now()
-			return True
-		return False
-	
-	def delete_session(self, session_id: str) -> bool:
-		"""세션 삭제"""
-		if session_id in self.sessions:
-			del self.sessions[session_id]
-			return True
-		return False
-	
-	def cleanup_expired_sessions(self):
-		"""만료된 세션들 정리"""
-		current_time = datetime.now()
-		expired_sessions = [
-			session_id for session_id, data in self.sessions.items()
-			if current_time - data['last_accessed'] > self.session_timeout
-		]
-		for session_id in expired_sessions:
-			del self.sessions[session_id]
-		return len(expired_sessions)
-
-# 글로벌 세션 저장소
-session_store = SimpleSessionStore()
+# 글로벌 세션 저장소 (SESSION_STORE=sqlite면 여러 워커가 공유)
+session_store = create_session_store()
+SESSION_MAX_AGE = int(session_store.session_timeout.total_seconds())
 
 def sign_session_id(session_id: str) -> str:
 	"""세션 ID에 HMAC 서명 추가"""
@@ -143,26 +277,29 @@ class SessionHelper:
 			return
 			
 		cookie_value = self.request.cookies.get("session_id")
-		print(f"🍪 세션 로드 시도:")
-		print(f"   쿠키 값: {cookie_value[:20] if cookie_value else 'None'}...")
 		
 		if cookie_value:
-			session_id = verify_session_id(cookie_value)
-			print(f"   검증된 세션 ID: {session_id[:8] if session_id else 'None'}...")
+			with phase("session_load"):
+				session_id = verify_session_id(cookie_value)
+				session_data = session_store.get_session(session_id) if session_id else None
 			
 			if session_id:
 				self._session_id = session_id
-				self._session_data = session_store.get_session(session_id) or {}
-				print(f"   세션 데이터: {self._session_data}")
+				self._session_data = session_data or {}
+				logger.debug("세션 로드: %s... 키: %s", session_id[:8], list(self._session_data))
 			else:
 				self._session_data = {}
-				print("   ⚠️  세션 검증 실패!")
+				logger.debug("세션 쿠키 검증 실패")
 		else:
 			self._session_data = {}
-			print("   🆕 새 세션 생성 필요")
 		
 		self._loaded = True
 	
+	async def load(self):
+		"""이벤트 루프에서 세션 데이터 로드 (이후 get은 저장소를 조회하지 않음)"""
+		if not self._loaded:
+			await session_io(self._load_session)
+	
 	def get(self, key: str, default=None):
 		"""세션에서 값 조회"""
 		self._load_session()
@@ -175,10 +312,10 @@ class SessionHelper:
 		
 		if not self._session_id:
 			self._session_id = session_store.create_session(self._session_data)
-			print(f"🆕 새 세션 생성: {self._session_id[:8]}...")
+			logger.debug("새 세션 생성: %s...", self._session_id[:8])
 		else:
 			session_store.update_session(self._session_id, {key: value})
-			print(f"♻️  세션 업데이트: {self._session_id[:8]}... | {key}={value}")
+			logger.debug("세션 업데이트: %s... | %s", self._session_id[:8], key)
 	
 	def clear(self):
 		"""세션 초기화"""
@@ -193,6 +330,12 @@ class SessionHelper:
 			return sign_session_id(self._session_id)
 		return None
 
+async def session_io(function, *args):
+	"""세션 저장소를 거치는 호출 (sqlite 저장소는 이벤트 루프를 막지 않도록 스레드 풀에서 실행)"""
+	if session_store.blocking_io:
+		return await run_in_threadpool(function, *args)
+	return function(*args)
+
 # 요청에 세션 헬퍼 추가
 def get_session(request: Request) -> SessionHelper:
 	"""요청에서 세션 헬퍼 가져오기"""
@@ -201,7 +344,10 @@ def get_session(request: Request) -> SessionHelper:
 	return request.state.session_helper
 
 SESSION_ENABLED = True
-print("✅ 자체 세션 관리 시스템이 활성화되었습니다.")
+logger.info("자체 세션 관리 시스템이 활성화되었습니다.")
+
+# /metrics를 로그인 없이 노출할지 여부 (기본: 인증 필요, Prometheus가 인증 없이 수집해야 하면 1)
+METRICS_PUBLIC = os.environ.get("METRICS_PUBLIC", "0") == "1"
 
 # 사용자 인증 모델
 class LoginRequest(BaseModel):
@@ -224,16 +370,6 @@ def hash_password(password: str) -> str:
 # 데이터베이스 설정 및 서버 관리
 # =============================================================================
 
-# MySQL 데이터베이스 설정
-MYSQL_CONFIG = {
-    'host': '192.168.0.10',
-    'user': 'runmcp',
-    'password': 'rcpGsy2*dmQ',
-    'database': 'runmcp',
-    'charset': 'utf8mb4',
-    'autocommit': True
-}
-
 class ServerModel(BaseModel):
 	"""서버 정보 모델"""
 	id: Optional[int] = None
@@ -254,63 +390,71 @@ class ServerCreateRequest(BaseModel):
 	password: str
 	description: Optional[str] = None
 
-def init_database():
-	"""데이터베이스 초기화"""
+# 공유 연결 풀 (요청마다 MySQL TCP 연결/인증을 하지 않도록 재사용)
+db_engine = create_db_engine(
+	pool_size=int(os.environ.get("DB_POOL_SIZE", "5")),
+	max_overflow=int(os.environ.get("DB_MAX_OVERFLOW", "10")),
+	pool_timeout=float(os.environ.get("DB_POOL_TIMEOUT", "10")),
+	connect_timeout=int(os.environ.get("DB_CONNECT_TIMEOUT", "5"))
+)
+
+DB_QUERY_SECONDS = REGISTRY.histogram("runmcp_web_db_query_seconds", "DB 작업 소요 시간 (연결 대기 포함)", ("operation",))
+DB_POOL_CHECKED_OUT = REGISTRY.gauge("runmcp_web_db_pool_checked_out", "사용 중인 DB 연결 수")
+DB_POOL_CHECKED_OUT.set_function(lambda: db_engine.pool.checkedout())
+DB_POOL_CHECKED_IN = REGISTRY.gauge("runmcp_web_db_pool_checked_in", "풀에서 대기 중인 DB 연결 수")
+DB_POOL_CHECKED_IN.set_function(lambda: db_engine.pool.checkedin())
+DB_POOL_OVERFLOW = REGISTRY.gauge("runmcp_web_db_pool_overflow", "pool_size를 넘어 추가로 연 DB 연결 수 (음수면 여유)")
+DB_POOL_OVERFLOW.set_function(lambda: db_engine.pool.overflow())
+
+# DB 준비 상태 (/ready에서 사용, 백그라운드 확인과 실제 쿼리 결과로 갱신)
+db_status = {"ready": False, "error": "확인 전", "checked_at": None}
+DB_CHECK_MAX_INTERVAL = float(os.environ.get("DB_CHECK_MAX_INTERVAL", "30"))
+
+def _set_db_status(ready: bool, error: Optional[str] = None):
+	db_status.update(ready=ready, error=error, checked_at=datetime.now().isoformat())
+
+def check_database() -> bool:
+	"""DB 연결과 servers 테이블 확인 (테이블 생성은 alembic upgrade head로 수행)"""
 	try:
-		conn = pymysql.connect(**MYSQL_CONFIG)
-		cursor = conn.cursor()
-		
-		# servers 테이블 생성
-		cursor.execute("""
-			CREATE TABLE IF NOT EXISTS servers (
-				id INT PRIMARY KEY AUTO_INCREMENT,
-				title VARCHAR(255) NOT NULL,
-				host VARCHAR(255) NOT NULL,
-				port INT DEFAULT 22,
-				username VARCHAR(100) DEFAULT 'root',
-				description TEXT,
-				created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-				updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-				UNIQUE KEY unique_server (host, port, username)
-			) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-		""")
-		
-		conn.close()
-		logger.info("MySQL 데이터베이스 초기화 완료")
-		return True
+		with DB_QUERY_SECONDS.time("check_database"), db_engine.connect() as conn:
+			conn.execute(text("SELECT 1 FROM servers LIMIT 1"))
 	except Exception as e:
-		logger.error(f"MySQL 데이터베이스 초기화 오류: {str(e)}")
+		_set_db_status(False, str(e))
 		return False
-
-def get_db_connection():
-	"""데이터베이스 연결 반환"""
-	conn = pymysql.connect(**MYSQL_CONFIG)
-	return conn
+	_set_db_status(True)
+	return True
+
+async def wait_for_database():
+	"""DB가 준비될 때까지 백그라운드에서 지수 백오프로 확인 (앱 시작은 기다리지 않음)"""
+	delay = 1.0
+	while not await run_in_threadpool(check_database):
+		logger.warning(f"MySQL 데이터베이스 확인 실패, {delay:.0f}초 후 재시도: {db_status['error']}")
+		logger.warning(f"   연결 정보: {MYSQL_CONFIG['user']}@{MYSQL_CONFIG['host']}:{MYSQL_CONFIG.get('port', 3306)}/{MYSQL_CONFIG['database']} (테이블이 없으면 alembic upgrade head 실행)")
+		await asyncio.sleep(delay)
+		delay = min(delay * 2, DB_CHECK_MAX_INTERVAL)
+	logger.info("✅ MySQL 데이터베이스 연결 확인 완료")
 
 def create_server(server_data: ServerCreateRequest) -> Optional[int]:
 	"""서버 정보를 데이터베이스에 저장"""
 	try:
-		conn = get_db_connection()
-		cursor = conn.cursor()
-		
-		cursor.execute("""
-			INSERT INTO servers (title, host, port, username, description, updated_at)
-			VALUES (%s, %s, %s, %s, %s, NOW())
-			ON DUPLICATE KEY UPDATE 
-			title = VALUES(title),
-			description = VALUES(description),
-			updated_at = NOW()
-		""", (
-			server_data.title,
-			server_data.host,
-			server_data.port,
-			server_data.username,
-			server_data.description
-		))
-		
-		server_id = cursor.lastrowid
-		conn.close()
+		with DB_QUERY_SECONDS.time("create_server"), db_engine.begin() as conn:
+			result = conn.execute(text("""
+				INSERT INTO servers (title, host, port, username, description, updated_at)
+				VALUES (:title, :host, :port, :username, :description, NOW())
+				ON DUPLICATE KEY UPDATE 
+				title = VALUES(title),
+				description = VALUES(description),
+				updated_at = NOW()
+			"""), {
+				"title": server_data.title,
+				"host": server_data.host,
+				"port": server_data.port,
+				"username": server_data.username,
+				"description": server_data.description
+			})
+			server_id = result.lastrowid
 		
+		inventory_cache.invalidate()
 		logger.info(f"서버 정보 저장 완료: {server_data.title} ({server_data.host})")
 		return server_id
 	except Exception as e:
@@ -318,66 +462,89 @@ def create_server(server_data: ServerCreateRequest) -> Optional[int]:
 		return None
 
 def get_all_servers() -> List[Dict]:
-	"""모든 서버 정보 조회"""
-	try:
-		conn = get_db_connection()
-		cursor = conn.cursor(pymysql.cursors.DictCursor)  # Dictionary cursor 사용
-		
-		cursor.execute("""
+	"""모든 서버 정보 조회 (오류는 호출한 쪽에서 처리)"""
+	with DB_QUERY_SECONDS.time("get_all_servers"), db_engine.connect() as conn:
+		rows = conn.execute(text("""
 			SELECT id, title, host, port, username, description, created_at, updated_at
 			FROM servers
 			ORDER BY created_at DESC
-		""")
-		
-		servers = []
-		for row in cursor.fetchall():
-			servers.append({
-				"id": row["id"],
-				"title": row["title"],
-				"host": row["host"],
-				"port": row["port"],
-				"username": row["username"],
-				"description": row["description"],
-				"created_at": row["created_at"].isoformat() if row["created_at"] else None,
-				"updated_at": row["updated_at"].isoformat() if row["updated_at"] else None,
-				"name": f"{row['username']}@{row['host']}"  # 호환성을 위해 name 필드 추가
-			})
-		
-		conn.close()
-		return servers
+		""")).mappings().all()
+	
+	return [
+		{
+			"id": row["id"],
+			"title": row["title"],
+			"host": row["host"],
+			"port": row["port"],
+			"username": row["username"],
+			"description": row["description"],
+			"created_at": row["created_at"].isoformat() if row["created_at"] else None,
+			"updated_at": row["updated_at"].isoformat() if row["updated_at"] else None,
+			"name": f"{row['username']}@{row['host']}"  # 호환성을 위해 name 필드 추가
+		}
+		for row in rows
+	]
+
+# 마지막으로 성공한 DB 조회 결과 (DB 오류 시 빈 목록 대신 사용)
+_last_db_servers: List[Dict] = []
+
+def build_inventory() -> Dict:
+	"""DB 서버와 servers.json 서버를 하나의 목록으로 병합 (같은 host/port/username은 DB 항목 우선)"""
+	global _last_db_servers
+	inventory_error = None
+	try:
+		db_servers = get_all_servers()
+		_last_db_servers = db_servers
+		_set_db_status(True)
 	except Exception as e:
 		logger.error(f"서버 목록 조회 오류: {str(e)}")
-		return []
+		_set_db_status(False, str(e))
+		db_servers = _last_db_servers
+		inventory_error = f"데이터베이스 오류: {str(e)}"
+	
+	try:
+		file_data = load_servers_file() or {}
+	except Exception as e:
+		logger.error(f"servers.json 로드 오류: {str(e)}")
+		file_data = {}
+	
+	servers = [{**server, "source": "database"} for server in db_servers]
+	seen = {(server["host"], server["port"], server["username"]) for server in db_servers}
+	for server in file_data.get("servers", []):
+		key = (server.get("host"), server.get("port", 22), server.get("username", "root"))
+		if key in seen:
+			continue
+		seen.add(key)
+		servers.append({**server, "source": "file"})
+	
+	inventory = {"servers": servers, "source": "database+file"}
+	if inventory_error:
+		inventory["error"] = inventory_error
+	return inventory
+
+# /ssh/servers 응답 캐시 (서버 추가/삭제, servers.json 변경, TTL 만료 시 다시 생성)
+inventory_cache = CachedSnapshot(
+	build_inventory,
+	ttl=float(os.environ.get("INVENTORY_TTL", "30")),
+	watch=[SERVERS_FILE],
+	error_ttl=float(os.environ.get("INVENTORY_ERROR_TTL", "2"))
+)
 
 def delete_server(server_id: int) -> bool:
 	"""서버 정보 삭제"""
 	try:
-		conn = get_db_connection()
-		cursor = conn.cursor()
-		
-		cursor.execute("DELETE FROM servers WHERE id = %s", (server_id,))
-		
-		deleted = cursor.rowcount > 0
-		conn.close()
+		with DB_QUERY_SECONDS.time("delete_server"), db_engine.begin() as conn:
+			result = conn.execute(text("DELETE FROM servers WHERE id = :id"), {"id": server_id})
+			deleted = result.rowcount > 0
 		
 		if deleted:
+			inventory_cache.invalidate()
 			logger.info(f"서버 정보 삭제 완료: ID {server_id}")
 		return deleted
 	except Exception as e:
 		logger.error(f"서버 정보 삭제 오류: {str(e)}")
 		return False
 
-# 앱 시작 시 데이터베이스 초기화
-try:
-    if init_database():
-        logger.info("✅ MySQL 데이터베이스가 성공적으로 초기화되었습니다.")
-    else:
-        logger.warning("⚠️  데이터베이스 초기화에 실패했습니다. 일부 기능이 제한될 수 있습니다.")
-except Exception as e:
-    logger.error(f"💥 데이터베이스 초기화 중 심각한 오류: {str(e)}")
-    logger.error("   MySQL 서버가 실행 중이고 연결 정보가 올바른지 확인해주세요.")
-    logger.error(f"   연결 정보: {MYSQL_CONFIG['user']}@{MYSQL_CONFIG['host']}:{MYSQL_CONFIG.get('port', 3306)}/{MYSQL_CONFIG['database']}")
-
 # 간단한 사용자 데이터 (실제 환경에서는 데이터베이스를 사용해야 함)
 USERS = {
 	"admin": hash_password("kqwer718@K@@"),  # kqwer718@K@@ (동적으로 계산)
@@ -385,6 +552,9 @@ USERS = {
 	"ssh": "8c6976e5b5410415bde908bd4dee15dfb167a9c873fc4bb8a81f6f2ab448a918",    # admin123
 }
 
+# 비밀번호 검증기 (SHA-256 해시는 로그인 성공 시 bcrypt로 변환되어 CREDENTIALS_FILE에 저장됨)
+credential_verifier = CredentialVerifier.from_env(USERS)
+
 # =============================================================================
 # 보안 명령어 차단 시스템
 # =============================================================================
@@ -404,6 +574,7 @@ def log_security_event(command: str, reason: str, category: str, session_id: str
 		"blocked": True
 	}
 	SECURITY_EVENTS.append(event)
+	SECURITY_BLOCKS.inc(category)
 	
 	# 메모리 사용량 관리 (최대 1000개 이벤트 유지)
 	if len(SECURITY_EVENTS) > 1000:
@@ -563,14 +734,6 @@ def is_dangerous_command(command: str) -> dict:
 	
 	return {"is_dangerous": False, "reason": "", "category": ""}
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-	"""비밀번호 검증"""
-	computed_hash = hash_password(plain_password)
-	print(f"🔑 비밀번호 검증: '{plain_password}' -> 계산된 해시: {computed_hash}")
-	print(f"   저장된 해시: {hashed_password}")
-	print(f"   검증 결과: {computed_hash == hashed_password}")
-	return computed_hash == hashed_password
-
 def get_current_user(request: Request) -> Optional[str]:
 	"""현재 로그인된 사용자 정보 가져오기"""
 	if not SESSION_ENABLED:
@@ -600,8 +763,11 @@ async def auth_middleware(request: Request, call_next):
 		"/auth/logout", 
 		"/auth/debug",
 		"/static",
-		"/favicon.ico"
+		"/favicon.ico",
+		"/ready"
 	]
+	if METRICS_PUBLIC:
+		public_paths.append("/metrics")
 	
 	# 현재 경로가 공개 경로인지 확인 (정확한 매칭 + startswith for static)
 	is_public = (
@@ -612,33 +778,17 @@ async def auth_middleware(request: Request, call_next):
 	)
 	
 
-	# 중요한 요청만 로깅 (static 파일 제외)
-	if not request.url.path.startswith("/static/") and not request.url.path.startswith("/favicon"):
-		print(f"🔍 [{request.method}] {request.url.path}")
-		print(f"   📋 Public paths: {public_paths}")
-		print(f"   ✅ 공개 경로 여부: {is_public}")
-		
-		# 상세한 매칭 정보
-		exact_match = request.url.path in public_paths
-		static_match = request.url.path.startswith("/static/")
-		favicon_match = request.url.path.startswith("/favicon")
-		debug_match = request.url.path.startswith("/auth/debug")
-		
-		print(f"   🔍 매칭 상세:")
-		print(f"      정확한 매칭: {exact_match}")
-		print(f"      Static 매칭: {static_match}")
-		print(f"      Favicon 매칭: {favicon_match}")
-		print(f"      Debug 매칭: {debug_match}")
+	# 요청별 상세 로그는 DEBUG로 남김 (LOG_DEBUG_SAMPLE 비율만큼만 기록됨)
+	logger.debug("[%s] %s 공개 경로 여부: %s", request.method, request.url.path, is_public)
 	
 	# 인증이 필요한 경로이고 로그인하지 않은 경우 (세션이 활성화된 경우만)
 	if SESSION_ENABLED and not is_public:
-		session = get_session(request)
-		current_user = session.get("user")
+		with phase("auth"):
+			session = get_session(request)
+			await session.load()
+			current_user = session.get("user")
 		
 		if not current_user:
-			if not request.url.path.startswith("/static/") and not request.url.path.startswith("/favicon"):
-				print(f"   🚫 인증되지 않은 접근 시도")
-			
 		# API 요청인 경우 401 에러 반환
 			content_type = request.headers.get("content-type", "")
 			accept_header = request.headers.get("accept", "")
@@ -652,16 +802,13 @@ async def auth_middleware(request: Request, call_next):
 				request.method in ["POST", "PUT", "DELETE", "PATCH"]
 			)
 			
-			print(f"   📊 요청 분석:")
-			print(f"      Content-Type: {content_type}")
-			print(f"      Accept: {accept_header}")
-			print(f"      Method: {request.method}")
-			print(f"      Path: {request.url.path}")
-			print(f"      API 요청 여부: {is_api_request}")
+			logger.debug(
+				"인증되지 않은 접근: [%s] %s Content-Type=%s Accept=%s API 요청=%s",
+				request.method, request.url.path, content_type, accept_header, is_api_request
+			)
 			
 			# API 요청인 경우 JSON으로 401 응답
 			if is_api_request:
-				print("   🚫 API 요청 - JSON 401 응답")
 				from fastapi.responses import JSONResponse
 				return JSONResponse(
 					status_code=401,
@@ -673,7 +820,6 @@ async def auth_middleware(request: Request, call_next):
 				)
 			
 			# HTML 요청인 경우 로그인 페이지로 리다이렉트
-			print("   🌐 HTML 요청 - 로그인 페이지로 리다이렉트")
 			import urllib.parse
 			
 			# 원본 URL 구성 (쿼리 파라미터 포함)
@@ -685,37 +831,39 @@ async def auth_middleware(request: Request, call_next):
 			encoded_url = urllib.parse.quote(original_url, safe='')
 			redirect_url = f"/login?redirect={encoded_url}"
 			
-			print(f"   🔄 리다이렉트: {redirect_url}")
+			logger.debug("로그인 페이지로 리다이렉트: %s", redirect_url)
 			return RedirectResponse(url=redirect_url, status_code=302)
 	
 	# 다음 미들웨어나 라우트 핸들러로 요청 전달
-	response = await call_next(request)
+	with phase("handler"):
+		response = await call_next(request)
 	
 	# 세션 쿠키 설정 (세션이 변경된 경우)
 	if SESSION_ENABLED and hasattr(request.state, 'session_helper'):
 		session_helper = request.state.session_helper
-		cookie_value = session_helper.get_cookie_value()
-		
-		print(f"🍪 쿠키 설정 처리:")
-		print(f"   경로: {request.url.path}")
-		print(f"   쿠키 값: {cookie_value[:20] if cookie_value else 'None'}...")
+		with phase("cookie"):
+			cookie_value = session_helper.get_cookie_value()
 		
 		if cookie_value:
 			response.set_cookie(
 				"session_id",
 				cookie_value,
-				max_age=86400,  # 24시간
+				max_age=SESSION_MAX_AGE,
 				httponly=True,
 				samesite="lax"
 			)
-			print(f"   ✅ 쿠키 설정 완료!")
+			logger.debug("세션 쿠키 설정: %s", request.url.path)
 		elif session_helper.get("user") is None:
 			# 로그아웃된 경우 쿠키 삭제
 			response.delete_cookie("session_id")
-			print(f"   🗑️  쿠키 삭제 완료!")
+			logger.debug("세션 쿠키 삭제: %s", request.url.path)
 	
 	return response
 
+# 요청 단계별 시간 계측, 요청 ID/DEBUG 샘플링 컨텍스트 (나중에 등록한 미들웨어가 바깥쪽에서 먼저 실행됨)
+app.middleware("http")(request_timing)
+app.middleware("http")(request_log_context)
+
 @app.get("/open_weather_mcp")
 async def open_weather_mcp(request: Request):
 	from langchain_mcp_adapters.client import MultiServerMCPClient
@@ -736,7 +884,7 @@ async def open_weather_mcp(request: Request):
 			}
 		}
 	) as client:
-		print(client.get_tools())
+		logger.debug("MCP 도구 목록: %s", client.get_tools())
 		agent = create_react_agent(model, client.get_tools())
 		answer = await astream_graph(agent, {"messages": "서울의 날씨는 어떠니?"})
 
@@ -760,10 +908,25 @@ async def framelink_figma_mcp(request: Request):
 
 		}
 	) as client:
-		print(client.get_tools())
+		logger.debug("MCP 도구 목록: %s", client.get_tools())
 		agent = create_react_agent(model, client.get_tools())
 		answer = await astream_graph(agent, {"messages": "전달받은 링크에 관한 하이라이트된 디자인을 HTML, CSS, JS 코드로 변환해줘, 링크는 https://www.figma.com/design/jplrpLmarsbIp1dtdt0h4E/%ED%94%BD%EC%85%80%EC%97%90%EC%9D%B4%EB%B8%94?node-id=1-2&t=qrTCKj1Dw4KGQrZ6-4"})
 
+@app.get('/metrics')
+async def metrics():
+	"""Prometheus 메트릭 노출"""
+	return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE_LATEST)
+
+@app.get('/ready')
+async def ready():
+	"""준비 상태 확인 (DB 연결 전이면 503)"""
+	body = {
+		"status": "ready" if db_status["ready"] else "starting",
+		"database": db_status,
+		"executor_mode": executor.mode
+	}
+	return JSONResponse(body, status_code=200 if db_status["ready"] else 503)
+
 @app.get('/show')
 async def show(request: Request):
 	return templates.TemplateResponse('show2.html', {'request': request})
@@ -773,70 +936,97 @@ async def ssh_interface(request: Request):
 	"""SSH 명령어 실행 웹 인터페이스"""
 	return templates.TemplateResponse('show2.html', {'request': request})
 
+@app.get('/ssh/stats/hosts')
+async def ssh_host_stats():
+	"""호스트별 지연 시간 백분위수 조회"""
+	try:
+		return await proxy_stream("GET", "/stats/hosts", "ssh_host_stats")
+	except httpx.TimeoutException:
+		PROXY_TIMEOUTS.inc("ssh_host_stats")
+		return {"hosts": {}, "error": "SSH Executor 서버 응답 시간 초과"}
+	except httpx.TransportError:
+		return {"hosts": {}, "error": "SSH Executor 서버에 연결할 수 없습니다"}
+	except Exception as e:
+		return {"hosts": {}, "error": str(e)}
+
 @app.get('/ssh/status')
 async def ssh_status():
 	"""SSH Executor 서버 상태 확인"""
-	import requests
 	try:
-		response = requests.get('https://runmcp.hankyeul.com/', timeout=30)  # 5초에서 30초로 늘림
-		return {"status": "running", "response": response.json()}
-	except requests.exceptions.Timeout:
+		with PROXY_SECONDS.time("ssh_status"):
+			response = await executor.request("GET", "/", "ssh_status")
+		return {"status": "running", "mode": executor.mode, "response": response.json(), "executors": executor.nodes_status()}
+	except httpx.TimeoutException:
+		PROXY_TIMEOUTS.inc("ssh_status")
 		return {"status": "timeout", "message": "SSH Executor 서버 응답 시간 초과"}
-	except requests.exceptions.ConnectionError:
+	except httpx.TransportError:
 		return {"status": "connection_error", "message": "SSH Executor 서버에 연결할 수 없습니다"}
 	except Exception as e:
 		return {"status": "error", "message": str(e)}
 
 @app.get('/ssh/sessions')
-async def ssh_sessions():
-	"""활성 SSH 세션 목록 조회"""
-	import requests
+async def ssh_sessions(request: Request, wait: float = 0):
+	"""
+	활성 SSH 세션 목록 조회 (If-None-Match가 같으면 304)
+	wait(초)를 주면 목록이 바뀔 때까지 기다림 (executor가 여러 대면 바로 응답)
+	"""
 	try:
-		response = requests.get('https://runmcp.hankyeul.com/sessions', timeout=30)  # 5초에서 30초로 늘림
-		return response.json()
-	except requests.exceptions.Timeout:
+		if wait > 0 and len(executor.nodes) == 1:
+			return (await fetch_long_poll(request, "/sessions", "ssh_sessions", wait)).to_response()
+		return (await fetch_all_sessions()).to_response(request)
+	except httpx.TimeoutException:
+		PROXY_TIMEOUTS.inc("ssh_sessions")
 		return {"sessions": [], "error": "SSH Executor 서버 응답 시간 초과"}
-	except requests.exceptions.ConnectionError:
+	except httpx.TransportError:
 		return {"sessions": [], "error": "SSH Executor 서버에 연결할 수 없습니다"}
 	except Exception as e:
 		return {"sessions": [], "error": str(e)}
 
 @app.get('/ssh/session/{session_id}')
-async def ssh_session_info(session_id: str):
-	"""특정 SSH 세션 정보 조회"""
-	import requests
+async def ssh_session_info(session_id: str, request: Request, wait: float = 0):
+	"""특정 SSH 세션 정보 조회 (If-None-Match가 같으면 304, wait(초)를 주면 세션이 바뀔 때까지 대기)"""
 	try:
-		response = requests.get(f'https://runmcp.hankyeul.com/session/{session_id}', timeout=30)  # 5초에서 30초로 늘림
-		logging.info(response.json())
-		return response.json()
-	except requests.exceptions.Timeout:
+		if wait > 0:
+			return (await fetch_long_poll(request, f"/session/{session_id}", "ssh_session_info", wait, session_id)).to_response()
+		return (await fetch_shared(f"/session/{session_id}", "ssh_session_info", session_id)).to_response(request)
+	except httpx.TimeoutException:
+		PROXY_TIMEOUTS.inc("ssh_session_info")
 		return {"error": "SSH Executor 서버 응답 시간 초과"}
-	except requests.exceptions.ConnectionError:
+	except httpx.TransportError:
 		return {"error": "SSH Executor 서버에 연결할 수 없습니다"}
 	except Exception as e:
 		return {"error": str(e)}
 
 @app.get('/ssh/session/{session_id}/history')
-async def ssh_session_history(session_id: str):
-	"""특정 SSH 세션의 명령어 히스토리 조회"""
-	import requests
+async def ssh_session_history(session_id: str, request: Request, wait: float = 0):
+	"""특정 SSH 세션의 명령어 히스토리 조회 (ETag는 세션 정보와 같음)"""
 	try:
-		response = requests.get(f'https://runmcp.hankyeul.com/session/{session_id}', timeout=30)  # 5초에서 30초로 늘림
-		session_info = response.json()
-		return {"command_history": session_info.get("command_history", [])}
-	except requests.exceptions.Timeout:
+		if wait > 0:
+			snapshot = await fetch_long_poll(request, f"/session/{session_id}", "ssh_session_history", wait, session_id)
+		else:
+			# 세션 정보 조회와 같은 업스트림 경로이므로 함께 합쳐짐
+			snapshot = await fetch_shared(f"/session/{session_id}", "ssh_session_history", session_id)
+		conditional = snapshot.to_response(request)
+		if snapshot.status_code == 304 or conditional.status_code == 304:
+			return conditional
+		session_info = snapshot.json()
+		headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"} if snapshot.etag else None
+		return JSONResponse({"command_history": session_info.get("command_history", [])}, headers=headers)
+	except httpx.TimeoutException:
+		PROXY_TIMEOUTS.inc("ssh_session_history")
 		return {"command_history": [], "error": "SSH Executor 서버 응답 시간 초과"}
-	except requests.exceptions.ConnectionError:
+	except httpx.TransportError:
 		return {"command_history": [], "error": "SSH Executor 서버에 연결할 수 없습니다"}
 	except Exception as e:
 		return {"command_history": [], "error": str(e)}
 
 @app.get('/ssh/servers')
-async def get_servers():
-	"""서버 목록 조회 (데이터베이스에서)"""
+async def get_servers(request: Request):
+	"""서버 목록 조회 (DB + servers.json, 변경이 없으면 304)"""
 	try:
-		servers = get_all_servers()
-		return {"servers": servers, "source": "database"}
+		# 캐시가 유효하면 스레드풀을 거치지 않고 바로 응답
+		snapshot = inventory_cache.fresh() or await run_in_threadpool(inventory_cache.get)
+		return etag_response(request, snapshot)
 	except Exception as e:
 		logger.error(f"서버 목록 조회 오류: {str(e)}")
 		return {"servers": [], "error": f"데이터베이스 오류: {str(e)}"}
@@ -845,7 +1035,7 @@ async def get_servers():
 async def create_server_endpoint(server_data: ServerCreateRequest):
 	"""서버 정보 생성"""
 	try:
-		server_id = create_server(server_data)
+		server_id = await run_in_threadpool(create_server, server_data)
 		if server_id:
 			return {
 				"success": True,
@@ -868,7 +1058,7 @@ async def create_server_endpoint(server_data: ServerCreateRequest):
 async def delete_server_endpoint(server_id: int):
 	"""서버 정보 삭제"""
 	try:
-		success = delete_server(server_id)
+		success = await run_in_threadpool(delete_server, server_id)
 		if success:
 			return {
 				"success": True,
@@ -890,14 +1080,26 @@ async def delete_server_endpoint(server_id: int):
 @app.post('/ssh/session/create')
 async def create_ssh_session(request: Request):
 	"""SSH 세션 생성"""
-	import requests
 	try:
 		body = await request.json()
-		response = requests.post('https://runmcp.hankyeul.com/session/create', json=body, timeout=10)  # 10초에서 30초로 늘림
-		return response.json()
-	except requests.exceptions.Timeout:
+		upstream_flight.invalidate()
+		# 부하가 가장 적은 노드에 만들고 이후 요청을 그 노드로 보내도록 위치 기록
+		with PROXY_SECONDS.time("create_ssh_session"):
+			response = await executor.request("POST", "/session/create", "create_ssh_session", json=body)
+		result = response.json()
+		if response.status_code == 503 and isinstance(result.get("detail"), dict):
+			# 연결 실패가 반복된 호스트 (executor 서킷 브레이커가 열림)
+			detail = result["detail"]
+			headers = {"Retry-After": response.headers["retry-after"]} if "retry-after" in response.headers else None
+			return JSONResponse({"success": False, "message": detail.get("message"), **detail}, status_code=503, headers=headers)
+		node = executor.node_of(response)
+		if result.get("success") and result.get("session_id") and node is not None:
+			executor.record_session(result["session_id"], node)
+		return JSONResponse(result, status_code=response.status_code)
+	except httpx.TimeoutException:
+		PROXY_TIMEOUTS.inc("create_ssh_session")
 		return {"success": False, "error": "SSH Executor 서버 응답 시간 초과"}
-	except requests.exceptions.ConnectionError:
+	except httpx.TransportError:
 		return {"success": False, "error": "SSH Executor 서버에 연결할 수 없습니다"}
 	except Exception as e:
 		return {"success": False, "error": str(e)}
@@ -905,13 +1107,14 @@ async def create_ssh_session(request: Request):
 @app.post('/ssh/session/{session_id}/execute')
 async def execute_in_session(session_id: str, request: Request):
 	"""세션에서 명령어 실행"""
-	import requests
+	started = time.perf_counter()
 	try:
 		body = await request.json()
 		
 		# 보안 검사: 위험한 명령어 차단
 		if 'command' in body:
-			security_check = is_dangerous_command(body['command'])
+			with SECURITY_CHECK_SECONDS.time():
+				security_check = is_dangerous_command(body['command'])
 			if security_check['is_dangerous']:
 				# 보안 이벤트 로깅
 				client_ip = request.client.host if hasattr(request, 'client') and request.client else 'unknown'
@@ -931,11 +1134,80 @@ async def execute_in_session(session_id: str, request: Request):
 					"command": body['command']
 				}
 		
-		response = requests.post(f'https://runmcp.hankyeul.com/session/{session_id}/execute', json=body, timeout=30)  # 30초에서 60초로 늘림
-		return response.json()
-	except requests.exceptions.Timeout:
+		return await proxy_stream("POST", f"/session/{session_id}/execute", "execute_in_session", json=body, started=started, session_id=session_id, headers=idempotency_headers(request))
+	except httpx.TimeoutException:
+		PROXY_TIMEOUTS.inc("execute_in_session")
 		return {"success": False, "error": "SSH Executor 서버 응답 시간 초과 - 명령어 실행이 60초를 초과했습니다"}
-	except requests.exceptions.ConnectionError:
+	except httpx.TransportError:
+		return {"success": False, "error": "SSH Executor 서버에 연결할 수 없습니다"}
+	except Exception as e:
+		return {"success": False, "error": str(e)}
+
+def blocked_commands_response(request: Request, session_id: str, commands: List[Any], context: str) -> Optional[Dict[str, Any]]:
+	"""명령어 목록 보안 검사 (위험한 명령어가 하나라도 있으면 보안 이벤트를 남기고 차단 응답, 없으면 None)"""
+	for command in commands:
+		if not isinstance(command, str) or not command:
+			continue
+		with SECURITY_CHECK_SECONDS.time():
+			security_check = is_dangerous_command(command)
+		if security_check['is_dangerous']:
+			client_ip = request.client.host if hasattr(request, 'client') and request.client else 'unknown'
+			log_security_event(
+				command=command,
+				reason=security_check['reason'],
+				category=security_check['category'],
+				session_id=session_id,
+				client_ip=client_ip
+			)
+			logger.warning(f"위험한 명령어 차단 ({context}): {command} - {security_check['reason']}")
+			return {
+				"success": False,
+				"error": f"보안상 차단된 명령어입니다: {security_check['reason']}",
+				"blocked": True,
+				"category": security_check['category'],
+				"command": command
+			}
+	return None
+
+@app.post('/ssh/session/{session_id}/execute-many')
+async def execute_many_in_session(session_id: str, request: Request):
+	"""세션에서 서로 독립적인 명령어 여러 개를 동시에 실행 (결과는 요청 순서대로)"""
+	started = time.perf_counter()
+	try:
+		body = await request.json()
+		
+		# 보안 검사: 위험한 명령어가 하나라도 있으면 전체 차단
+		commands = [item.get('command') for item in body.get('commands') or [] if isinstance(item, dict)]
+		blocked = blocked_commands_response(request, session_id, commands, "세션 동시 실행")
+		if blocked:
+			return blocked
+		
+		return await proxy_stream("POST", f"/session/{session_id}/execute-many", "execute_many_in_session", json=body, started=started, session_id=session_id, headers=idempotency_headers(request))
+	except httpx.TimeoutException:
+		PROXY_TIMEOUTS.inc("execute_many_in_session")
+		return {"success": False, "error": "SSH Executor 서버 응답 시간 초과"}
+	except httpx.TransportError:
+		return {"success": False, "error": "SSH Executor 서버에 연결할 수 없습니다"}
+	except Exception as e:
+		return {"success": False, "error": str(e)}
+
+@app.post('/ssh/session/{session_id}/script')
+async def run_session_script(session_id: str, request: Request):
+	"""세션에서 여러 단계를 한 번에 차례로 실행 (단계별 결과 반환)"""
+	started = time.perf_counter()
+	try:
+		body = await request.json()
+		
+		# 보안 검사: 위험한 단계가 하나라도 있으면 전체 차단
+		blocked = blocked_commands_response(request, session_id, body.get('steps') or [], "세션 스크립트")
+		if blocked:
+			return blocked
+		
+		return await proxy_stream("POST", f"/session/{session_id}/script", "run_session_script", json=body, started=started, session_id=session_id, headers=idempotency_headers(request))
+	except httpx.TimeoutException:
+		PROXY_TIMEOUTS.inc("run_session_script")
+		return {"success": False, "error": "SSH Executor 서버 응답 시간 초과"}
+	except httpx.TransportError:
 		return {"success": False, "error": "SSH Executor 서버에 연결할 수 없습니다"}
 	except Exception as e:
 		return {"success": False, "error": str(e)}
@@ -943,13 +1215,15 @@ async def execute_in_session(session_id: str, request: Request):
 @app.delete('/ssh/session_delete/{session_id}')
 async def delete_ssh_session(session_id: str):
 	"""SSH 세션 삭제"""
-	import requests
 	try:
-		response = requests.delete(f'https://runmcp.hankyeul.com/session/{session_id}', timeout=10)  # 10초에서 30초로 늘림
-		return response.json()
-	except requests.exceptions.Timeout:
+		response = await proxy_stream("DELETE", f"/session_delete/{session_id}", "delete_ssh_session", session_id=session_id)
+		if response.status_code < 400:
+			executor.forget_session(session_id)
+		return response
+	except httpx.TimeoutException:
+		PROXY_TIMEOUTS.inc("delete_ssh_session")
 		return {"success": False, "error": "SSH Executor 서버 응답 시간 초과"}
-	except requests.exceptions.ConnectionError:
+	except httpx.TransportError:
 		return {"success": False, "error": "SSH Executor 서버에 연결할 수 없습니다"}
 	except Exception as e:
 		return {"success": False, "error": str(e)}
@@ -958,14 +1232,13 @@ async def delete_ssh_session(session_id: str):
 @app.post('/ssh/session/{session_id}/shell/start')
 async def start_interactive_shell(session_id: str, request: Request):
 	"""대화형 쉘 시작"""
-	import requests
 	try:
 		# 대화형 쉘 시작은 시간이 더 걸릴 수 있으므로 타임아웃을 60초로 늘림
-		response = requests.post(f'https://runmcp.hankyeul.com/session/{session_id}/shell/start', timeout=60)
-		return response.json()
-	except requests.exceptions.Timeout:
+		return await proxy_stream("POST", f"/session/{session_id}/shell/start", "start_interactive_shell", session_id=session_id)
+	except httpx.TimeoutException:
+		PROXY_TIMEOUTS.inc("start_interactive_shell")
 		return {"success": False, "error": "대화형 쉘 시작 시간 초과 (60초) - SSH 서버나 네트워크 연결을 확인해주세요"}
-	except requests.exceptions.ConnectionError:
+	except httpx.TransportError:
 		return {"success": False, "error": "SSH Executor 서버에 연결할 수 없습니다 - 서버가 실행 중인지 확인해주세요"}
 	except Exception as e:
 		return {"success": False, "error": f"대화형 쉘 시작 중 오류: {str(e)}"}
@@ -973,14 +1246,16 @@ async def start_interactive_shell(session_id: str, request: Request):
 @app.post('/ssh/session/{session_id}/shell/command')
 async def send_shell_command(session_id: str, request: Request):
 	"""대화형 쉘에서 명령어 실행"""
-	import requests
+	started = time.perf_counter()
 	try:
 		body = await request.json()
 		
 		# 보안 검사: 위험한 명령어 차단
 		if 'command' in body:
-			security_check = is_dangerous_command(body['command'])
+			with SECURITY_CHECK_SECONDS.time():
+				security_check = is_dangerous_command(body['command'])
 			if security_check['is_dangerous']:
+				SECURITY_BLOCKS.inc(security_check['category'])
 				logger.warning(f"위험한 명령어 차단: {body['command']} - {security_check['reason']}")
 				return {
 					"success": False,
@@ -990,11 +1265,11 @@ async def send_shell_command(session_id: str, request: Request):
 					"command": body['command']
 				}
 		
-		response = requests.post(f'https://runmcp.hankyeul.com/session/{session_id}/shell/command', json=body, timeout=30)  # 30초에서 60초로 늘림
-		return response.json()
-	except requests.exceptions.Timeout:
+		return await proxy_stream("POST", f"/session/{session_id}/shell/command", "send_shell_command", json=body, started=started, session_id=session_id, headers=idempotency_headers(request))
+	except httpx.TimeoutException:
+		PROXY_TIMEOUTS.inc("send_shell_command")
 		return {"success": False, "error": "SSH Executor 서버 응답 시간 초과 - 쉘 명령어 실행이 60초를 초과했습니다"}
-	except requests.exceptions.ConnectionError:
+	except httpx.TransportError:
 		return {"success": False, "error": "SSH Executor 서버에 연결할 수 없습니다"}
 	except Exception as e:
 		return {"success": False, "error": str(e)}
@@ -1002,13 +1277,25 @@ async def send_shell_command(session_id: str, request: Request):
 @app.post('/ssh/session/{session_id}/shell/stop')
 async def stop_interactive_shell(session_id: str):
 	"""대화형 쉘 종료"""
-	import requests
 	try:
-		response = requests.post(f'https://runmcp.hankyeul.com/session/{session_id}/shell/stop', json={}, timeout=10)  # 10초에서 30초로 늘림
-		return response.json()
-	except requests.exceptions.Timeout:
+		return await proxy_stream("POST", f"/session/{session_id}/shell/stop", "stop_interactive_shell", json={}, session_id=session_id)
+	except httpx.TimeoutException:
+		PROXY_TIMEOUTS.inc("stop_interactive_shell")
+		return {"success": False, "error": "SSH Executor 서버 응답 시간 초과"}
+	except httpx.TransportError:
+		return {"success": False, "error": "SSH Executor 서버에 연결할 수 없습니다"}
+	except Exception as e:
+		return {"success": False, "error": str(e)}
+
+@app.post('/ssh/session/{session_id}/cancel')
+async def cancel_session_commands(session_id: str):
+	"""세션에서 실행 중인 명령 취소 (실행 요청은 그때까지의 출력과 cancelled=true로 응답)"""
+	try:
+		return await proxy_stream("POST", f"/session/{session_id}/cancel", "cancel_session_commands", json={}, session_id=session_id)
+	except httpx.TimeoutException:
+		PROXY_TIMEOUTS.inc("cancel_session_commands")
 		return {"success": False, "error": "SSH Executor 서버 응답 시간 초과"}
-	except requests.exceptions.ConnectionError:
+	except httpx.TransportError:
 		return {"success": False, "error": "SSH Executor 서버에 연결할 수 없습니다"}
 	except Exception as e:
 		return {"success": False, "error": str(e)}
@@ -1116,12 +1403,12 @@ async def test_security_check_local():
 @app.post('/ssh/key-setup')
 async def ssh_key_setup(request: Request):
 	"""SSH 키 설정 (원격 서버에 공개키 설치) 및 데이터베이스 저장"""
-	import requests
 	try:
 		body = await request.json()
 		
 		# SSH Executor 서버에 키 설치 요청
-		response = requests.post('https://runmcp.hankyeul.com/ssh-key-setup', json=body, timeout=60)
+		with PROXY_SECONDS.time("ssh_key_setup"):
+			response = await executor.request("POST", "/ssh-key-setup", "ssh_key_setup", json=body)
 		result = response.json()
 		
 		# SSH 키 설치가 성공했을 경우 데이터베이스에 서버 정보 저장
@@ -1140,7 +1427,7 @@ async def ssh_key_setup(request: Request):
 					description=description
 				)
 				
-				server_id = create_server(server_data)
+				server_id = await run_in_threadpool(create_server, server_data)
 				if server_id:
 					result['server_saved'] = True
 					result['server_id'] = server_id
@@ -1158,9 +1445,10 @@ async def ssh_key_setup(request: Request):
 		
 		return result
 		
-	except requests.exceptions.Timeout:
+	except httpx.TimeoutException:
+		PROXY_TIMEOUTS.inc("ssh_key_setup")
 		return {"success": False, "message": "SSH 키 설정 시간 초과 (60초) - 네트워크나 서버 상태를 확인해주세요", "key_installed": False}
-	except requests.exceptions.ConnectionError:
+	except httpx.TransportError:
 		return {"success": False, "message": "SSH Executor 서버에 연결할 수 없습니다", "key_installed": False}
 	except Exception as e:
 		return {"success": False, "message": f"SSH 키 설정 중 오류: {str(e)}", "key_installed": False}
@@ -1188,16 +1476,30 @@ async def login(request: Request, response: Response, login_data: LoginRequest):
 		
 		username = login_data.username.strip()
 		password = login_data.password
+		client_ip = request.client.host if request.client else ""
 		
-		# 사용자 인증 확인
-		if username in USERS and verify_password(password, USERS[username]):
+		# 사용자 인증 확인 (전용 스레드 풀에서 bcrypt 검증)
+		try:
+			authenticated = await credential_verifier.verify(username, password, client_ip)
+		except CredentialBusy:
+			logger.warning(f"사용자 '{username}' 로그인 시도 한도 초과 ({client_ip})")
+			response.status_code = 429
+			return LoginResponse(
+				success=False,
+				message="로그인 시도가 너무 많습니다. 잠시 후 다시 시도해주세요."
+			)
+		
+		if authenticated:
 			# 세션에 사용자 정보 저장
 			session = get_session(request)
-			session.set("user", username)
-			session.set("login_time", datetime.now().isoformat())
 			
-			if login_data.remember_me:
-				session.set("remember_me", True)
+			def store_login():
+				session.set("user", username)
+				session.set("login_time", datetime.now().isoformat())
+				if login_data.remember_me:
+					session.set("remember_me", True)
+			
+			await session_io(store_login)
 			
 			# 쿠키 직접 설정 (미들웨어 대신)
 			cookie_value = session.get_cookie_value()
@@ -1205,19 +1507,13 @@ async def login(request: Request, response: Response, login_data: LoginRequest):
 				response.set_cookie(
 					"session_id",
 					cookie_value,
-					max_age=86400,  # 24시간
+					max_age=SESSION_MAX_AGE,
 					httponly=True,
 					samesite="lax"
 				)
-				print(f"🍪 로그인 시 쿠키 설정: {cookie_value[:20]}...")
 			
 			logger.info(f"사용자 '{username}' 로그인 성공")
 			
-			# 개발용: 로그인에 성공한 비밀번호의 해시값 출력
-			print(f"✅ 로그인 성공! '{username}' 계정")
-			print(f"   비밀번호 '{password}' 해시: {hash_password(password)}")
-			print(f"   세션 ID: {session._session_id[:8] if session._session_id else 'None'}...")
-			
 			return LoginResponse(
 				success=True, 
 				message="로그인에 성공했습니다.",
@@ -1245,12 +1541,13 @@ async def logout(request: Request, response: Response):
 			return {"success": True, "message": "로그아웃되었습니다. (세션 비활성화 모드)"}
 		
 		session = get_session(request)
+		await session.load()
 		username = session.get("user")
 		if username:
 			logger.info(f"사용자 '{username}' 로그아웃")
 		
 		# 세션 초기화
-		session.clear()
+		await session_io(session.clear)
 		
 		# 쿠키 삭제
 		response.delete_cookie("session_id")
@@ -1292,12 +1589,13 @@ async def get_session_info(request: Request):
 		raise HTTPException(status_code=401, detail="로그인이 필요합니다.")
 	
 	# 만료된 세션 정리
-	cleaned_count = session_store.cleanup_expired_sessions()
+	cleaned_count = await session_io(session_store.cleanup_expired_sessions)
+	sessions = await session_io(session_store.list_sessions)
 	
 	return {
-		"total_sessions": len(session_store.sessions),
+		"total_sessions": await session_io(session_store.count),
 		"cleaned_expired": cleaned_count,
-		"session_timeout_hours": 24,
+		"session_timeout_hours": session_store.session_timeout.total_seconds() / 3600,
 		"current_sessions": [
 			{
 				"session_id": sid[:8] + "...",  # 보안상 일부만 표시
@@ -1305,7 +1603,7 @@ async def get_session_info(request: Request):
 				"created_at": data.get("created_at", "").strftime("%Y-%m-%d %H:%M:%S") if data.get("created_at") else "",
 				"last_accessed": data.get("last_accessed", "").strftime("%Y-%m-%d %H:%M:%S") if data.get("last_accessed") else ""
 			}
-			for sid, data in session_store.sessions.items()
+			for sid, data in sessions
 		]
 	}
 
@@ -1316,13 +1614,35 @@ async def cleanup_expired_sessions(request: Request):
 	if not user:
 		raise HTTPException(status_code=401, detail="로그인이 필요합니다.")
 	
-	cleaned_count = session_store.cleanup_expired_sessions()
+	cleaned_count = await session_io(session_store.cleanup_expired_sessions)
 	return {
 		"success": True,
 		"message": f"만료된 세션 {cleaned_count}개가 정리되었습니다.",
-		"remaining_sessions": len(session_store.sessions)
+		"remaining_sessions": await session_io(session_store.count)
 	}
 
+@app.get("/admin/latency")
+async def get_latency_report(request: Request, limit: int = 20):
+	"""라우트별 단계 지연 시간 백분위수와 최근 느린 요청 (관리자용, 밀리초)"""
+	user = get_current_user(request)
+	if not user:
+		raise HTTPException(status_code=401, detail="로그인이 필요합니다.")
+	
+	return {
+		"routes": ROUTE_LATENCY.summary(),
+		"slowest": slowest_requests(limit),
+		"config": profiling_config()
+	}
+
+@app.get("/admin/profiles")
+async def get_profiles(request: Request):
+	"""샘플링된 요청의 cProfile 결과 (관리자용, PROFILE_ROUTES/PROFILE_SAMPLE 설정 시)"""
+	user = get_current_user(request)
+	if not user:
+		raise HTTPException(status_code=401, detail="로그인이 필요합니다.")
+	
+	return {"profiles": recent_profiles(), "config": profiling_config()}
+
 # 루트 경로를 SSH 관리 페이지로 리다이렉트
 @app.get("/")
 async def root():
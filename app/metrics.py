@@ -0,0 +1,288 @@
+"""
+Prometheus 텍스트 형식 메트릭 수집기
+외부 서비스나 라이브러리 없이 /metrics 엔드포인트에서 바로 노출할 수 있는 최소 구현
+"""
+
+import bisect
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+# 기본 히스토그램 버킷 (초 단위)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _escape_label_value(value: str) -> str:
+	"""라벨 값 이스케이프 (Prometheus 텍스트 형식)"""
+	return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(labelnames: Sequence[str], labelvalues: Sequence[str], extra: str = "") -> str:
+	"""라벨 문자열 생성"""
+	parts = [f'{name}="{_escape_label_value(str(value))}"' for name, value in zip(labelnames, labelvalues)]
+	if extra:
+		parts.append(extra)
+	return "{" + ",".join(parts) + "}" if parts else ""
+
+def _format_value(value: float) -> str:
+	"""숫자 값 포맷"""
+	if value == float('inf'):
+		return "+Inf"
+	if float(value).is_integer():
+		return str(int(value))
+	return repr(float(value))
+
+class _Metric:
+	"""메트릭 공통 베이스"""
+	metric_type = "untyped"
+
+	def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+		self.name = name
+		self.documentation = documentation
+		self.labelnames = tuple(labelnames)
+		self._lock = threading.Lock()
+
+	def _key(self, labelvalues: Sequence[str]) -> Tuple[str, ...]:
+		if len(labelvalues) != len(self.labelnames):
+			raise ValueError(f"{self.name}: 라벨 개수 불일치 ({self.labelnames})")
+		return tuple(str(v) for v in labelvalues)
+
+	def render(self) -> List[str]:
+		return [
+			f"# HELP {self.name} {self.documentation}",
+			f"# TYPE {self.name} {self.metric_type}"
+		]
+
+class Counter(_Metric):
+	"""단조 증가 카운터"""
+	metric_type = "counter"
+
+	def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+		super().__init__(name, documentation, labelnames)
+		self._values: Dict[Tuple[str, ...], float] = {}
+
+	def inc(self, *labelvalues: str, amount: float = 1.0):
+		key = self._key(labelvalues)
+		with self._lock:
+			self._values[key] = self._values.get(key, 0.0) + amount
+
+	def value(self, *labelvalues: str) -> float:
+		return self._values.get(self._key(labelvalues), 0.0)
+
+	def render(self) -> List[str]:
+		lines = super().render()
+		with self._lock:
+			items = list(self._values.items())
+		for key, value in items:
+			lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+		return lines
+
+class Gauge(_Metric):
+	"""현재 값 게이지 (직접 설정하거나 수집 시점에 함수로 계산)"""
+	metric_type = "gauge"
+
+	def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+		super().__init__(name, documentation, labelnames)
+		self._values: Dict[Tuple[str, ...], float] = {}
+		self._function: Optional[Callable[[], float]] = None
+
+	def set(self, value: float, *labelvalues: str):
+		key = self._key(labelvalues)
+		with self._lock:
+			self._values[key] = float(value)
+
+	def inc(self, *labelvalues: str, amount: float = 1.0):
+		key = self._key(labelvalues)
+		with self._lock:
+			self._values[key] = self._values.get(key, 0.0) + amount
+
+	def dec(self, *labelvalues: str, amount: float = 1.0):
+		self.inc(*labelvalues, amount=-amount)
+
+	def set_function(self, function: Callable[[], float]):
+		"""수집 시점에 호출될 함수 등록 (라벨 없는 게이지 전용)"""
+		self._function = function
+
+	def render(self) -> List[str]:
+		lines = super().render()
+		if self._function is not None:
+			try:
+				value = float(self._function())
+			except Exception:
+				value = 0.0
+			lines.append(f"{self.name} {_format_value(value)}")
+			return lines
+		with self._lock:
+			items = list(self._values.items())
+		for key, value in items:
+			lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+		return lines
+
+class Histogram(_Metric):
+	"""누적 버킷 히스토그램 (관측 시 리스트 내 카운트만 증가)"""
+	metric_type = "histogram"
+
+	def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+		super().__init__(name, documentation, labelnames)
+		self.buckets = tuple(sorted(float(b) for b in buckets))
+		# 라벨별 [버킷 카운트..., +Inf 카운트], 합계
+		self._counts: Dict[Tuple[str, ...], List[int]] = {}
+		self._sums: Dict[Tuple[str, ...], float] = {}
+
+	def observe(self, value: float, *labelvalues: str):
+		key = self._key(labelvalues)
+		index = bisect.bisect_left(self.buckets, value)
+		with self._lock:
+			counts = self._counts.get(key)
+			if counts is None:
+				counts = [0] * (len(self.buckets) + 1)
+				self._counts[key] = counts
+				self._sums[key] = 0.0
+			counts[index] += 1
+			self._sums[key] += value
+
+	@contextmanager
+	def time(self, *labelvalues: str):
+		"""with 블록의 소요 시간을 관측"""
+		start = time.perf_counter()
+		try:
+			yield
+		finally:
+			self.observe(time.perf_counter() - start, *labelvalues)
+
+	def render(self) -> List[str]:
+		lines = super().render()
+		with self._lock:
+			items = [(key, list(counts), self._sums[key]) for key, counts in self._counts.items()]
+		for key, counts, total in items:
+			cumulative = 0
+			for bound, count in zip(self.buckets + (float('inf'),), counts):
+				cumulative += count
+				le = 'le="' + _format_value(bound) + '"'
+				lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+			lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+			lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+		return lines
+
+class MetricsRegistry:
+	"""메트릭 저장소 - 같은 이름으로 다시 등록하면 기존 메트릭을 반환"""
+	def __init__(self):
+		self._metrics: Dict[str, _Metric] = {}
+		self._lock = threading.Lock()
+
+	def _register(self, cls, name: str, *args, **kwargs):
+		with self._lock:
+			metric = self._metrics.get(name)
+			if metric is None:
+				metric = cls(name, *args, **kwargs)
+				self._metrics[name] = metric
+			elif not isinstance(metric, cls):
+				raise ValueError(f"메트릭 이름 충돌: {name}")
+			return metric
+
+	def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+		return self._register(Counter, name, documentation, labelnames)
+
+	def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+		return self._register(Gauge, name, documentation, labelnames)
+
+	def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+		return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+	def render(self) -> str:
+		"""Prometheus 텍스트 노출 형식으로 변환"""
+		with self._lock:
+			metrics = list(self._metrics.values())
+		lines: List[str] = []
+		for metric in metrics:
+			lines.extend(metric.render())
+		return "\n".join(lines) + "\n"
+
+# 프로세스 전역 레지스트리
+REGISTRY = MetricsRegistry()
+
+# Prometheus 텍스트 형식 Content-Type
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+def threadpool_queue_depth() -> float:
+	"""anyio 기본 스레드 풀에서 대기 중인 작업 수 (이벤트 루프 안에서 호출)"""
+	try:
+		import anyio.to_thread
+		return anyio.to_thread.current_default_thread_limiter().statistics().tasks_waiting
+	except Exception:
+		return 0.0
+
+class PhaseTimer:
+	"""요청 하나의 단계별 소요 시간 기록 (밀리초)"""
+	def __init__(self):
+		self.started = time.perf_counter()
+		self.phases: Dict[str, float] = {}
+
+	def record(self, phase: str, seconds: float):
+		"""단계 시간 누적 (같은 단계가 여러 번 측정되면 합산)"""
+		self.phases[phase] = self.phases.get(phase, 0.0) + seconds * 1000.0
+
+	@contextmanager
+	def phase(self, name: str):
+		start = time.perf_counter()
+		try:
+			yield
+		finally:
+			self.record(name, time.perf_counter() - start)
+
+	def as_dict(self) -> Dict[str, float]:
+		"""측정된 단계와 전체 시간 반환"""
+		result = {name: round(value, 2) for name, value in self.phases.items()}
+		result["total"] = round((time.perf_counter() - self.started) * 1000.0, 2)
+		return result
+
+def format_server_timing(timings: Optional[Dict[str, float]], extra: Optional[Dict[str, float]] = None) -> str:
+	"""timings 딕셔너리를 Server-Timing 헤더 값으로 변환"""
+	entries = dict(timings or {})
+	if extra:
+		entries.update(extra)
+	return ", ".join(f"{name};dur={value:.2f}" for name, value in entries.items() if value is not None)
+
+class LatencyWindow:
+	"""키(호스트)별 최근 N개 지연 시간 보관 및 백분위수 계산"""
+	def __init__(self, size: int = 500):
+		self.size = size
+		self._samples: Dict[str, Dict[str, Deque[float]]] = {}
+		self._lock = threading.Lock()
+
+	def add(self, key: str, timings: Dict[str, float]):
+		with self._lock:
+			phases = self._samples.setdefault(key, {})
+			for phase, value in timings.items():
+				if value is None:
+					continue
+				samples = phases.get(phase)
+				if samples is None:
+					samples = deque(maxlen=self.size)
+					phases[phase] = samples
+				samples.append(value)
+
+	@staticmethod
+	def _percentile(ordered: List[float], q: float) -> float:
+		index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+		return ordered[index]
+
+	def summary(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+		"""키별/단계별 p50, p90, p99 요약"""
+		with self._lock:
+			snapshot = {key: {phase: list(values) for phase, values in phases.items()} for key, phases in self._samples.items()}
+		result = {}
+		for key, phases in snapshot.items():
+			result[key] = {}
+			for phase, values in phases.items():
+				if not values:
+					continue
+				ordered = sorted(values)
+				result[key][phase] = {
+					"count": len(ordered),
+					"p50": self._percentile(ordered, 0.50),
+					"p90": self._percentile(ordered, 0.90),
+					"p99": self._percentile(ordered, 0.99),
+					"max": ordered[-1]
+				}
+		return result
@@ -57,11 +57,15 @@ def get_database_url():
     """데이터베이스 URL 반환"""
     return f"mysql+pymysql://{MYSQL_CONFIG['user']}:{MYSQL_CONFIG['password']}@{MYSQL_CONFIG['host']}/{MYSQL_CONFIG['database']}?charset={MYSQL_CONFIG['charset']}"
 
-def create_db_engine():
-    """SQLAlchemy 엔진 생성"""
+def create_db_engine(pool_size=5, max_overflow=10, pool_timeout=10, connect_timeout=5):
+    """SQLAlchemy 엔진 생성 (연결 풀 공유, 첫 사용 시점에 연결)"""
     return create_engine(
         get_database_url(),
         echo=False,  # SQL 쿼리 로깅 (개발 시에는 True)
         pool_pre_ping=True,  # 연결 상태 확인
         pool_recycle=3600,   # 1시간마다 연결 재생성
-    ) 
+        pool_size=pool_size,            # 유지할 연결 수
+        max_overflow=max_overflow,      # 부하 시 추가로 허용할 연결 수
+        pool_timeout=pool_timeout,      # 풀이 가득 찼을 때 연결을 기다릴 최대 시간 (초)
+        connect_args={'connect_timeout': connect_timeout},
+    )
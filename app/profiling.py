@@ -0,0 +1,127 @@
+"""
+웹 서버 요청 지연 시간 계측
+요청마다 단계별 시간(인증, 세션 로드, 핸들러, 업스트림 호출, 쿠키 서명)을 기록하고
+지정한 라우트는 일정 비율로 cProfile 결과를 남긴다
+
+환경 변수:
+	PROFILE_SLOW_WINDOW   느린 요청 목록을 고를 최근 요청 수 (기본: 1000)
+	PROFILE_ROUTES        cProfile을 수집할 라우트 템플릿 "/ssh/servers,/ssh/session/{session_id}/execute"
+	PROFILE_SAMPLE        해당 라우트 요청 중 cProfile을 수집할 비율 0.0~1.0 (기본: 0)
+	PROFILE_KEEP          보관할 cProfile 결과 수 (기본: 20)
+
+단계는 서로 포함될 수 있다 (auth ⊃ session_load, handler ⊃ upstream)
+스트리밍 응답은 응답 헤더가 준비된 시점까지만 측정한다
+"""
+
+import contextvars
+import cProfile
+import io
+import os
+import pstats
+import random
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from metrics import REGISTRY, LatencyWindow, PhaseTimer
+from logging_setup import request_id_var
+
+REQUEST_PHASE_SECONDS = REGISTRY.histogram(
+	"runmcp_web_request_phase_seconds", "요청 단계별 소요 시간", ("route", "phase")
+)
+
+# 현재 요청의 단계 타이머 (계측 미들웨어 밖에서는 None)
+phase_timer_var: contextvars.ContextVar[Optional[PhaseTimer]] = contextvars.ContextVar("phase_timer", default=None)
+
+ROUTE_LATENCY = LatencyWindow(size=500)
+_recent: Deque[Dict[str, Any]] = deque(maxlen=int(os.environ.get("PROFILE_SLOW_WINDOW", "1000")))
+_profile_routes = {route.strip() for route in os.environ.get("PROFILE_ROUTES", "").split(",") if route.strip()}
+_profile_sample = float(os.environ.get("PROFILE_SAMPLE", "0"))
+_profiles: Deque[Dict[str, Any]] = deque(maxlen=int(os.environ.get("PROFILE_KEEP", "20")))
+# cProfile은 스레드 전체를 측정하므로 한 번에 한 요청만 수집
+_profiling = False
+
+@contextmanager
+def phase(name: str):
+	"""현재 요청의 단계 시간 측정 (계측 중이 아니면 아무것도 하지 않음)"""
+	timer = phase_timer_var.get()
+	if timer is None:
+		yield
+		return
+	with timer.phase(name):
+		yield
+
+def _route_template(request) -> str:
+	route = request.scope.get("route")
+	return getattr(route, "path", None) or "<unmatched>"
+
+def _matches_profile_route(path: str) -> bool:
+	# 라우트 템플릿은 처리 후에야 알 수 있으므로 경로 변수 앞부분(접두어)으로 비교
+	for route in _profile_routes:
+		prefix, brace, _ = route.partition("{")
+		if path == route or (brace and path.startswith(prefix)):
+			return True
+	return False
+
+def _should_profile(path: str) -> bool:
+	if _profiling or _profile_sample <= 0:
+		return False
+	return _matches_profile_route(path) and random.random() < _profile_sample
+
+def _profile_text(profiler: cProfile.Profile, limit: int = 30) -> str:
+	output = io.StringIO()
+	pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(limit)
+	return output.getvalue()
+
+async def request_timing(request, call_next):
+	"""요청 단계별 시간을 기록하는 HTTP 미들웨어 (인증 미들웨어보다 바깥에 등록)"""
+	global _profiling
+	timer = PhaseTimer()
+	token = phase_timer_var.set(timer)
+	profiler = None
+	if _should_profile(request.url.path):
+		_profiling = True
+		profiler = cProfile.Profile()
+		profiler.enable()
+	status = 500
+	try:
+		response = await call_next(request)
+		status = response.status_code
+		return response
+	finally:
+		if profiler is not None:
+			profiler.disable()
+			_profiling = False
+		phase_timer_var.reset(token)
+		route = _route_template(request)
+		timings = timer.as_dict()
+		for name, value in timings.items():
+			REQUEST_PHASE_SECONDS.observe(value / 1000.0, route, name)
+		ROUTE_LATENCY.add(f"{request.method} {route}", timings)
+		entry = {
+			"time": datetime.now().isoformat(timespec="milliseconds"),
+			"method": request.method,
+			"route": route,
+			"path": request.url.path,
+			"status": status,
+			"request_id": request_id_var.get(),
+			"timings": timings
+		}
+		_recent.append(entry)
+		if profiler is not None:
+			_profiles.append({**entry, "profile": _profile_text(profiler)})
+
+def slowest_requests(limit: int = 20) -> List[Dict[str, Any]]:
+	"""최근 요청 중 전체 시간이 긴 순서로 반환"""
+	return sorted(list(_recent), key=lambda entry: entry["timings"]["total"], reverse=True)[:limit]
+
+def recent_profiles() -> List[Dict[str, Any]]:
+	return list(_profiles)
+
+def profiling_config() -> Dict[str, Any]:
+	return {
+		"slow_window": _recent.maxlen,
+		"profile_routes": sorted(_profile_routes),
+		"profile_sample": _profile_sample
+	}
@@ -0,0 +1,298 @@
+"""
+원격 도우미 프로세스 (세션 도우미 모드)
+세션마다 원격 서버에 오래 실행되는 Python 프로세스 하나를 exec 채널로 띄우고,
+명령마다 채널을 열고 로그인 쉘을 띄우는 대신 그 채널 하나로 길이가 앞에 붙은 요청/응답 프레임을 주고받아
+여러 명령을 연달아(동시에 보낸 명령은 원격에서도 동시에) 실행한다
+
+프레임: 4바이트 빅엔디언 길이 + UTF-8 JSON
+	요청: {"id", "op": "run", "command"} / {"id", "op": "signal", "signal": "TERM", "grace": 2.0}
+	응답: {"type": "ready", "pid"} (시작 시 한 번)
+	      {"id", "type": "stdout"|"stderr", "data": base64} (출력이 나올 때마다)
+	      {"id", "type": "exit", "exit_code", "error"} (명령 종료)
+명령은 원격에서 /bin/sh -c로 실행하며 stdin은 /dev/null이다
+signal을 받으면 명령의 프로세스 그룹에 시그널을 보내고 grace초 후에도 끝나지 않으면 SIGKILL을 보낸다
+(명령 시작 전에 도착한 signal은 기억했다가 시작하자마자 보냄)
+채널이 닫히면 도우미는 실행 중인 명령의 프로세스 그룹을 종료하고 끝난다
+"""
+
+import base64
+import itertools
+import json
+import queue
+import shlex
+import struct
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import paramiko
+
+# 원격에서 실행할 도우미 (Python 3.6 이상, 표준 라이브러리만 사용)
+HELPER_SOURCE = r'''
+import base64, json, os, signal, struct, subprocess, sys, threading
+stdin = sys.stdin.buffer
+stdout = sys.stdout.buffer
+write_lock = threading.Lock()
+process_lock = threading.Lock()
+# 요청 id -> 프로세스 (시작 전이면 None, 그 사이 받은 시그널은 early에 보관)
+processes = {}
+early = {}
+
+def send(message):
+    data = json.dumps(message).encode()
+    with write_lock:
+        stdout.write(struct.pack(">I", len(data)) + data)
+        stdout.flush()
+
+def read_exact(size):
+    data = b""
+    while len(data) < size:
+        chunk = stdin.read(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+def pump(request_id, stream, name):
+    while True:
+        chunk = os.read(stream.fileno(), 32768)
+        if not chunk:
+            break
+        send({"id": request_id, "type": name, "data": base64.b64encode(chunk).decode()})
+
+def run(request_id, command):
+    try:
+        process = subprocess.Popen(
+            ["/bin/sh", "-c", command], stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, start_new_session=True
+        )
+    except Exception as e:
+        with process_lock:
+            processes.pop(request_id, None)
+            early.pop(request_id, None)
+        send({"id": request_id, "type": "exit", "exit_code": -1, "error": str(e)})
+        return
+    with process_lock:
+        processes[request_id] = process
+        pending = early.pop(request_id, None)
+    if pending is not None:
+        stop(process, *pending)
+    readers = [threading.Thread(target=pump, args=(request_id, process.stdout, "stdout")),
+               threading.Thread(target=pump, args=(request_id, process.stderr, "stderr"))]
+    for reader in readers:
+        reader.start()
+    for reader in readers:
+        reader.join()
+    exit_code = process.wait()
+    with process_lock:
+        processes.pop(request_id, None)
+    send({"id": request_id, "type": "exit", "exit_code": exit_code, "error": None})
+
+def kill(process, signal_number):
+    try:
+        os.killpg(process.pid, signal_number)
+    except Exception:
+        pass
+
+def stop(process, signal_number, grace):
+    kill(process, signal_number)
+    if signal_number != signal.SIGKILL:
+        timer = threading.Timer(grace, lambda: process.poll() is None and kill(process, signal.SIGKILL))
+        timer.daemon = True
+        timer.start()
+
+send({"type": "ready", "pid": os.getpid()})
+while True:
+    header = read_exact(4)
+    if header is None:
+        break
+    body = read_exact(struct.unpack(">I", header)[0])
+    if body is None:
+        break
+    request = json.loads(body.decode())
+    if request.get("op") == "signal":
+        pending = (getattr(signal, "SIG" + request.get("signal", "TERM"), signal.SIGTERM), request.get("grace", 2.0))
+        with process_lock:
+            if request["id"] not in processes:
+                continue
+            process = processes[request["id"]]
+            if process is None:
+                early[request["id"]] = pending
+                continue
+        stop(process, *pending)
+        continue
+    # 스레드가 프로세스를 만들기 전에 온 signal을 놓치지 않도록 먼저 등록
+    with process_lock:
+        processes[request["id"]] = None
+    threading.Thread(target=run, args=(request["id"], request["command"]), daemon=True).start()
+with process_lock:
+    running = [process for process in processes.values() if process is not None]
+for process in running:
+    kill(process, signal.SIGKILL)
+'''
+
+_HEADER = struct.Struct(">I")
+# 출력 대기 중 취소/기한을 확인하는 주기 (초)
+_POLL_INTERVAL = 0.2
+# 중단 시그널 후 명령이 끝나지 않으면 SIGKILL을 보내기까지 기다리는 시간 (초)
+_KILL_GRACE = 2.0
+
+class RemoteHelperError(Exception):
+	"""도우미를 시작하지 못했거나 연결이 끊김"""
+
+class RemoteHelper:
+	"""세션 트랜스포트 위의 원격 도우미 프로세스 하나 (여러 스레드에서 동시에 명령 실행)"""
+	def __init__(self, transport: paramiko.Transport, python: str = "python3"):
+		self.transport = transport
+		self.python = python
+		self.channel: Optional[paramiko.Channel] = None
+		self.pid: Optional[int] = None
+		self.closed = False
+		self._ids = itertools.count(1)
+		self._calls: Dict[str, "queue.Queue[Dict[str, Any]]"] = {}
+		self._calls_lock = threading.Lock()
+		self._send_lock = threading.Lock()
+		self._ready = threading.Event()
+		self._reader: Optional[threading.Thread] = None
+
+	@property
+	def alive(self) -> bool:
+		return not self.closed and self.channel is not None and not self.channel.closed
+
+	def start(self, timeout: float):
+		"""도우미 실행 후 준비 프레임을 기다림 (실패하면 RemoteHelperError)"""
+		self.channel = self.transport.open_session(timeout=timeout)
+		self.channel.exec_command(f"{self.python} -u -c {shlex.quote(HELPER_SOURCE)}")
+		self._reader = threading.Thread(target=self._read_frames, name="remote-helper", daemon=True)
+		self._reader.start()
+		if not self._ready.wait(timeout) or self.closed:
+			error = self._stderr_tail()
+			self.close()
+			raise RemoteHelperError(f"원격 도우미 시작 실패 ({self.python}){': ' + error if error else ''}")
+
+	def _stderr_tail(self) -> str:
+		try:
+			if self.channel is not None and self.channel.recv_stderr_ready():
+				return self.channel.recv_stderr(4096).decode("utf-8", errors="replace").strip()[-300:]
+		except Exception:
+			pass
+		return ""
+
+	def _read_frames(self):
+		"""채널에서 응답 프레임을 읽어 요청별 큐로 전달 (채널이 닫히면 대기 중인 요청에 closed 전달)"""
+		buffer = b""
+		try:
+			while True:
+				chunk = self.channel.recv(65536)
+				if not chunk:
+					break
+				buffer += chunk
+				while len(buffer) >= _HEADER.size:
+					(size,) = _HEADER.unpack_from(buffer)
+					if len(buffer) < _HEADER.size + size:
+						break
+					message = json.loads(buffer[_HEADER.size:_HEADER.size + size].decode())
+					buffer = buffer[_HEADER.size + size:]
+					self._dispatch(message)
+		except Exception:
+			pass
+		finally:
+			self.closed = True
+			with self._calls_lock:
+				calls = list(self._calls.values())
+			for call in calls:
+				call.put({"type": "closed"})
+			self._ready.set()
+
+	def _dispatch(self, message: Dict[str, Any]):
+		if message.get("type") == "ready":
+			self.pid = message.get("pid")
+			self._ready.set()
+			return
+		with self._calls_lock:
+			call = self._calls.get(message.get("id"))
+		# 중단 후 버린 요청의 출력은 무시
+		if call is not None:
+			call.put(message)
+
+	def _send(self, message: Dict[str, Any]):
+		data = json.dumps(message).encode()
+		with self._send_lock:
+			self.channel.sendall(_HEADER.pack(len(data)) + data)
+
+	def run(
+		self,
+		command: str,
+		timeout: float,
+		stop_reason: Optional[Callable[[], Optional[str]]] = None,
+		kill_signal: Optional[str] = None
+	) -> Tuple[bytes, bytes, Optional[int], Optional[str], Optional[float]]:
+		"""
+		명령 실행 후 (stdout, stderr, 종료 코드, 중단 사유, 첫 바이트까지 걸린 초) 반환
+		timeout초 동안 출력이 없거나 stop_reason()이 값을 돌려주면 kill_signal(빈 값이면 TERM)을 보내고 그때까지의 출력 반환
+		(공유 채널로 출력이 계속 오지 않도록 항상 시그널을 보내며, 도우미가 _KILL_GRACE초 후 SIGKILL로 마무리)
+		도우미 연결이 끊기면 RemoteHelperError
+		"""
+		request_id = str(next(self._ids))
+		call: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+		with self._calls_lock:
+			self._calls[request_id] = call
+		# 등록 후에 확인해야 그 사이에 연결이 끊겨도 closed를 놓치지 않음
+		if not self.alive:
+			with self._calls_lock:
+				self._calls.pop(request_id, None)
+			raise RemoteHelperError("원격 도우미 연결이 끊어졌습니다")
+		stdout_chunks = []
+		stderr_chunks = []
+		exit_code = None
+		reason = None
+		first_byte = None
+		try:
+			started = time.perf_counter()
+			self._send({"id": request_id, "op": "run", "command": command})
+			idle_since = started
+			while True:
+				reason = stop_reason() if stop_reason else None
+				if reason:
+					break
+				idle = time.perf_counter() - idle_since
+				if idle >= timeout:
+					reason = "timeout"
+					break
+				try:
+					message = call.get(timeout=min(timeout - idle, _POLL_INTERVAL))
+				except queue.Empty:
+					continue
+				kind = message.get("type")
+				if kind == "closed":
+					raise RemoteHelperError("원격 도우미 연결이 끊어졌습니다")
+				if kind == "exit":
+					if message.get("error"):
+						stderr_chunks.append(message["error"].encode())
+					exit_code = message.get("exit_code")
+					break
+				idle_since = time.perf_counter()
+				if first_byte is None:
+					first_byte = idle_since - started
+				data = base64.b64decode(message.get("data", ""))
+				(stdout_chunks if kind == "stdout" else stderr_chunks).append(data)
+			if reason and self.alive:
+				signal_name = (kill_signal or "TERM").upper().removeprefix("SIG")
+				self._send({"id": request_id, "op": "signal", "signal": signal_name, "grace": _KILL_GRACE})
+		finally:
+			with self._calls_lock:
+				self._calls.pop(request_id, None)
+		return b"".join(stdout_chunks), b"".join(stderr_chunks), exit_code, reason, first_byte
+
+	def close(self):
+		"""채널을 닫음 (원격 도우미는 stdin EOF를 받으면 실행 중인 명령을 종료하고 끝남)"""
+		self.closed = True
+		if self.channel is not None:
+			try:
+				self.channel.shutdown_write()
+			except Exception:
+				pass
+			try:
+				self.channel.close()
+			except Exception:
+				pass
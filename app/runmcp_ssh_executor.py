@@ -9,9 +9,12 @@ import os
 import subprocess
 import shlex
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable, Awaitable, Set, Tuple
 from pathlib import Path
 import json
+import hashlib
+import codecs
+import math
 import sys
 import uuid
 import asyncio
@@ -20,25 +23,61 @@ import time
 from datetime import datetime, timedelta
 import paramiko
 import socket
+import select
+import signal
+import getpass
 import re
 
 # FastMCP 서버 설정
-from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException
+from contextlib import ExitStack, asynccontextmanager, contextmanager
+from fastapi import FastAPI, Header, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 import uvicorn
 
-# 로깅 설정
-logging.basicConfig(
-	level=logging.INFO,
-	format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-	handlers=[
-		logging.FileHandler('runmcp_ssh.log'),
-		logging.StreamHandler(sys.stdout)
-	]
+from metrics import (
+	REGISTRY, CONTENT_TYPE_LATEST, threadpool_queue_depth,
+	PhaseTimer, LatencyWindow, format_server_timing
 )
+from logging_setup import setup_logging, request_log_context
+from inventory import CachedSnapshot, SERVERS_FILE, etag_response, load_servers_file
+from coalescing import SingleFlight
+from host_breaker import AUTH_FAILURE, CLOSED, HALF_OPEN, OPEN, HostBreaker, HostUnavailable, classify_exception, classify_ssh_stderr
+from host_timeouts import CONNECT, FIRST_BYTE, IDLE_GAP, AdaptiveTimeouts
+from remote_helper import RemoteHelper, RemoteHelperError
+from script_frames import STEP_FAILED, STEP_INCOMPLETE, STEP_NOT_RUN, STEP_OK, build_script, parse_script_output
+
+# 로깅 설정 (큐 기반 비동기 기록, runmcp_ssh.log에 JSON 라인으로 저장)
+setup_logging("runmcp_ssh")
 logger = logging.getLogger(__name__)
 
+# 메트릭 정의
+PHASE_SECONDS = REGISTRY.histogram(
+	"ssh_executor_phase_seconds",
+	"SSH 명령 처리 단계별 소요 시간 (connect, channel_open, exec, first_byte, output_drain, ansi_render, security_check)",
+	("phase",)
+)
+SECURITY_BLOCKS = REGISTRY.counter("ssh_executor_security_blocks_total", "보안 규칙별 차단 횟수", ("rule",))
+TIMEOUTS = REGISTRY.counter("ssh_executor_timeouts_total", "작업별 타임아웃 횟수", ("operation",))
+HOST_ERRORS = REGISTRY.counter("ssh_executor_errors_total", "호스트별 오류 횟수", ("host",))
+LIVE_SESSIONS = REGISTRY.gauge("ssh_executor_sessions", "현재 유지 중인 SSH 세션 수")
+LIVE_SHELLS = REGISTRY.gauge("ssh_executor_shells", "현재 열려 있는 대화형 쉘 수")
+POOLED_TRANSPORTS = REGISTRY.gauge("ssh_executor_transports", "세션이 보유한 활성 SSH 트랜스포트 수")
+THREADPOOL_QUEUE = REGISTRY.gauge("ssh_executor_threadpool_queue_depth", "스레드 풀 대기 작업 수")
+THREADPOOL_QUEUE.set_function(threadpool_queue_depth)
+CIRCUIT_STATE = REGISTRY.gauge("ssh_executor_host_circuit_state", "호스트별 서킷 브레이커 상태 (0: closed, 1: half_open, 2: open)", ("host",))
+CIRCUIT_OPENS = REGISTRY.counter("ssh_executor_host_circuit_opens_total", "호스트별 서킷 브레이커가 열린 횟수", ("host",))
+CIRCUIT_REJECTIONS = REGISTRY.counter(
+	"ssh_executor_host_circuit_rejections_total", "연결을 시도하지 않고 바로 실패시킨 요청 수", ("host", "reason")
+)
+IDEMPOTENT_REPLAYS = REGISTRY.counter(
+	"ssh_executor_idempotent_replays_total", "Idempotency-Key 재요청으로 실행 없이 돌려준 결과 수", ("route", "kind")
+)
+
+# 호스트별 최근 요청 단계별 지연 시간 (백분위수 통계용)
+HOST_LATENCY = LatencyWindow(size=500)
+
 # SSH 키 경로 설정
 SSH_KEY_PATH = Path(__file__).parent.parent / ".ssh" / "h_web2"
 
@@ -148,6 +187,7 @@ def clean_terminal_output(text: str, preserve_colors: bool = True) -> str:
 	if not text:
 		return text
 	
+	render_start = time.perf_counter()
 	if preserve_colors:
 		# ANSI 색상을 HTML로 변환
 		clean_text = convert_ansi_to_html(text)
@@ -164,6 +204,7 @@ def clean_terminal_output(text: str, preserve_colors: bool = True) -> str:
 	# 앞뒤 공백 정리
 	clean_text = clean_text.strip()
 	
+	PHASE_SECONDS.observe(time.perf_counter() - render_start, "ansi_render")
 	return clean_text
 
 def enhance_file_colors(text: str) -> str:
@@ -363,7 +404,9 @@ def validate_command_safety(command: str, session_id: str = "unknown") -> Dict[s
 	명령어 안전성 검증
 	Returns: {"safe": bool, "reason": str, "original_command": str}
 	"""
+	check_start = time.perf_counter()
 	is_dangerous, reason = is_dangerous_command(command)
+	PHASE_SECONDS.observe(time.perf_counter() - check_start, "security_check")
 	
 	result = {
 		"safe": not is_dangerous,
@@ -373,10 +416,432 @@ def validate_command_safety(command: str, session_id: str = "unknown") -> Dict[s
 	
 	# 보안 이벤트 로깅
 	if is_dangerous:
+		SECURITY_BLOCKS.inc(reason)
 		log_security_event(session_id, command, reason, blocked=True)
 	
 	return result
 
+# 세션 변경 알림
+class SessionChanges:
+	"""
+	세션 버전 변경을 기다리는 long-poll 요청 깨우기
+	세션 상태는 스레드 풀에서 바뀌므로 각 대기자의 이벤트 루프로 call_soon_threadsafe 전달
+	"""
+	# 세션 목록 전체를 기다리는 대기자 키
+	ALL = "*"
+
+	def __init__(self):
+		# 세션 목록 버전 (세션 생성/종료/변경 시 증가)
+		self.version = 0
+		self._waiters: Dict[str, List[Any]] = {}
+		self._lock = threading.Lock()
+
+	def changed(self, session_id: Optional[str] = None):
+		with self._lock:
+			self.version += 1
+			waiters = self._waiters.pop(self.ALL, [])
+			if session_id is not None:
+				waiters += self._waiters.pop(session_id, [])
+		for loop, future in waiters:
+			loop.call_soon_threadsafe(self._wake, future)
+
+	@staticmethod
+	def _wake(future: asyncio.Future):
+		if not future.done():
+			future.set_result(None)
+
+	async def wait(self, key: str, is_stale, timeout: float) -> bool:
+		"""is_stale()가 참이거나 key가 바뀔 때까지 대기 (변경되면 True, 시간 초과면 False)"""
+		loop = asyncio.get_running_loop()
+		future = loop.create_future()
+		with self._lock:
+			self._waiters.setdefault(key, []).append((loop, future))
+		try:
+			# 등록 후에 확인해야 확인과 등록 사이의 변경을 놓치지 않음
+			if is_stale():
+				return True
+			try:
+				await asyncio.wait_for(future, timeout)
+				return True
+			except asyncio.TimeoutError:
+				return False
+		finally:
+			with self._lock:
+				waiters = self._waiters.get(key)
+				if waiters and (loop, future) in waiters:
+					waiters.remove((loop, future))
+					if not waiters:
+						del self._waiters[key]
+
+session_changes = SessionChanges()
+# 프로세스 재시작 후 같은 버전 번호로 ETag가 겹치지 않게 붙이는 값
+BOOT_ID = uuid.uuid4().hex[:8]
+
+# 명령 실행 기한/취소
+# 명령 최대 실행 시간 (초, 출력이 계속 나오더라도 이 시간이 지나면 채널을 닫음)
+COMMAND_DEADLINE = float(os.environ.get("COMMAND_DEADLINE", "300"))
+# 기한 초과/취소 시 원격 프로세스에 보낼 시그널 (빈 값이면 채널만 닫음)
+COMMAND_KILL_SIGNAL = os.environ.get("COMMAND_KILL_SIGNAL", "TERM")
+# 출력을 기다리는 동안 취소/기한을 확인하는 주기 (초)
+CANCEL_POLL_INTERVAL = 0.2
+
+class RunningCommand:
+	"""실행 중인 명령 (다른 요청에서 command_id나 session_id로 취소)"""
+	def __init__(
+		self,
+		command: str,
+		host: str,
+		session_id: Optional[str] = None,
+		command_id: Optional[str] = None,
+		deadline: Optional[float] = None,
+		kill_signal: Optional[str] = None
+	):
+		self.command_id = command_id or str(uuid.uuid4())
+		self.command = command
+		self.host = host
+		self.session_id = session_id
+		self.started = time.monotonic()
+		self.started_at = datetime.now()
+		deadline = COMMAND_DEADLINE if deadline is None else deadline
+		self.deadline = self.started + deadline if deadline > 0 else None
+		self.kill_signal = COMMAND_KILL_SIGNAL if kill_signal is None else kill_signal
+		self.cancelled = threading.Event()
+	
+	def stop_reason(self) -> Optional[str]:
+		"""중단해야 하면 "cancelled" 또는 "deadline", 계속 실행하면 None"""
+		if self.cancelled.is_set():
+			return "cancelled"
+		if self.deadline is not None and time.monotonic() >= self.deadline:
+			return "deadline"
+		return None
+	
+	def remaining(self) -> Optional[float]:
+		if self.deadline is None:
+			return None
+		return max(0.0, self.deadline - time.monotonic())
+	
+	def as_dict(self) -> Dict[str, Any]:
+		return {
+			"command_id": self.command_id,
+			"command": self.command,
+			"host": self.host,
+			"session_id": self.session_id,
+			"started_at": self.started_at.isoformat(),
+			"elapsed": round(time.monotonic() - self.started, 3),
+			"remaining": None if self.deadline is None else round(self.remaining(), 3),
+			"cancelled": self.cancelled.is_set()
+		}
+
+class RunningCommands:
+	"""실행 중(세션 채널 대기 포함)인 명령 목록"""
+	def __init__(self):
+		self._commands: Dict[str, RunningCommand] = {}
+		self._lock = threading.Lock()
+	
+	@contextmanager
+	def track(self, running: RunningCommand):
+		"""실행하는 동안 목록에 등록 (이미 등록된 같은 명령이면 바깥 등록을 그대로 사용)"""
+		with self._lock:
+			current = self._commands.get(running.command_id)
+			if current is not None and current is not running:
+				raise ValueError(f"이미 실행 중인 command_id: {running.command_id}")
+			self._commands[running.command_id] = running
+		if current is running:
+			yield running
+			return
+		try:
+			yield running
+		finally:
+			with self._lock:
+				self._commands.pop(running.command_id, None)
+	
+	def get(self, command_id: str) -> Optional[RunningCommand]:
+		return self._commands.get(command_id)
+	
+	def cancel(self, command_id: str) -> bool:
+		running = self._commands.get(command_id)
+		if running is None:
+			return False
+		running.cancelled.set()
+		return True
+	
+	def cancel_session(self, session_id: str) -> int:
+		with self._lock:
+			targets = [running for running in self._commands.values() if running.session_id == session_id]
+		for running in targets:
+			running.cancelled.set()
+		return len(targets)
+	
+	def list(self) -> List[Dict[str, Any]]:
+		with self._lock:
+			return [running.as_dict() for running in self._commands.values()]
+
+running_commands = RunningCommands()
+
+def _stopped_message(reason: str, timeout: float) -> str:
+	if reason == "cancelled":
+		return "명령어 실행이 취소되었습니다"
+	if reason == "deadline":
+		return "명령어 최대 실행 시간을 초과했습니다"
+	return f"명령어 출력 대기 시간 초과: {timeout}초"
+
+def _signal_remote(channel: paramiko.Channel, signal_name: str):
+	"""
+	원격 프로세스에 시그널 요청 (RFC 4254 6.9 "signal", paramiko에 공개 API가 없어 resize_pty와 같은 방식으로 직접 전송)
+	지원하지 않는 서버는 요청을 무시하며, 그 경우에도 채널을 닫으면 프로세스는 출력할 때 SIGPIPE로 종료된다
+	"""
+	try:
+		message = paramiko.Message()
+		message.add_byte(paramiko.common.cMSG_CHANNEL_REQUEST)
+		message.add_int(channel.remote_chanid)
+		message.add_string("signal")
+		message.add_boolean(False)
+		message.add_string(signal_name)
+		channel.transport._send_user_message(message)
+	except Exception as e:
+		logger.warning(f"원격 프로세스 시그널 전송 실패 ({signal_name}): {str(e)}")
+
+# 호스트별 서킷 브레이커 (연결/인증 실패가 반복되는 호스트는 연결 타임아웃을 기다리지 않고 바로 실패)
+_CIRCUIT_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+def _on_circuit_change(key: str, state: str):
+	CIRCUIT_STATE.set(_CIRCUIT_STATE_VALUES[state], key)
+	if state == OPEN:
+		CIRCUIT_OPENS.inc(key)
+		logger.warning(f"호스트 서킷 브레이커 열림: {key}")
+	elif state == CLOSED:
+		logger.info(f"호스트 서킷 브레이커 닫힘: {key}")
+
+host_breaker = HostBreaker.from_env(on_change=_on_circuit_change)
+
+def _host_key(host: str, port: int) -> str:
+	return f"{host}:{port}"
+
+def _user_key(host: str, port: int, username: str) -> str:
+	"""인증 실패를 기록하는 사용자별 브레이커 키"""
+	return f"{host}:{port}:{username}"
+
+def _record_host_failure(host: str, port: int, username: str, kind: str, error: str):
+	"""
+	연결 실패를 서킷 브레이커에 반영
+	인증 실패는 사용자별 키에만 기록하고 (호스트에는 연결됐으므로 호스트 키는 성공 처리),
+	그 밖의 실패는 호스트 키에 기록
+	"""
+	if kind == AUTH_FAILURE:
+		host_breaker.record_success(_host_key(host, port))
+		host_breaker.record_failure(_user_key(host, port, username), kind, error)
+	else:
+		host_breaker.record_failure(_host_key(host, port), kind, error)
+
+def _record_host_success(host: str, port: int, username: str):
+	host_breaker.record_success(_host_key(host, port))
+	host_breaker.record_success(_user_key(host, port, username))
+
+# 호스트별 지연 시간으로 조정하는 연결/쉘 출력 대기 타임아웃
+host_timeouts = AdaptiveTimeouts.from_env()
+# 지연 시간 기록이 부족할 때 쉘 출력 첫 바이트/출력 간격 대기 (초)
+SHELL_READ_WAIT = 2.0
+
+# 세션 하나에서 동시에 열 수 있는 exec 채널 수 (sshd MaxSessions 기본값 10, 대화형 쉘 채널은 별도)
+SESSION_MAX_CHANNELS = max(1, int(os.environ.get("SESSION_MAX_CHANNELS", "4")))
+# /session/{id}/execute-many 요청 하나에 넣을 수 있는 명령 수
+EXECUTE_MANY_MAX = 50
+# /session/{id}/script 요청 하나에 넣을 수 있는 단계 수
+SCRIPT_MAX_STEPS = 100
+
+# 원격 도우미 모드 (세션마다 원격 Python 프로세스 하나로 명령 실행, 요청의 helper로 세션별 지정)
+SESSION_HELPER = os.environ.get("SESSION_HELPER", "0") == "1"
+REMOTE_HELPER_PYTHON = os.environ.get("REMOTE_HELPER_PYTHON", "python3")
+
+def _check_host(host: str, port: int, username: str):
+	"""호스트 또는 그 사용자의 회로가 열려 있으면 503 (Retry-After 포함)"""
+	try:
+		host_breaker.check(_host_key(host, port))
+		host_breaker.check(_user_key(host, port, username))
+	except HostUnavailable as e:
+		CIRCUIT_REJECTIONS.inc(e.host, e.reason)
+		raise HTTPException(status_code=503, detail=e.as_dict(), headers={"Retry-After": str(max(1, int(e.retry_after + 0.999)))})
+
+def _record_ssh_exit(host: str, port: int, username: str, exit_code: Optional[int], stderr: Optional[str]):
+	"""ssh 프로세스 종료 결과를 서킷 브레이커에 반영 (255는 ssh 자체 오류일 수 있음)"""
+	kind = classify_ssh_stderr(stderr) if exit_code == 255 else None
+	if kind:
+		_record_host_failure(host, port, username, kind, stderr.strip()[-300:])
+	else:
+		_record_host_success(host, port, username)
+
+def _blocked_result(command: str, context: str) -> Optional[Dict[str, Any]]:
+	"""단일 실행 명령 보안 검증 (위험하면 차단 결과, 안전하면 None)"""
+	safety_check = validate_command_safety(command, context)
+	if safety_check["safe"]:
+		return None
+	error_msg = f"🚫 보안상 위험한 명령어가 차단되었습니다: {safety_check['reason']}"
+	logger.warning(f"명령어 실행에서 위험한 명령어 차단 ({context}): {command} - {safety_check['reason']}")
+	return {
+		"success": False,
+		"stdout": None,
+		"stderr": error_msg,
+		"exit_code": -1,
+		"error": error_msg,
+		"security_blocked": True,
+		"security_reason": safety_check["reason"]
+	}
+
+# 로컬 실행 (SSH 없이 이 서버에서 직접 실행할 호스트, 기본: 사용 안 함)
+# 요청 사용자가 executor 실행 사용자와 같을 때만 로컬로 실행하고, 다르면 기존처럼 SSH로 접속
+# 항목은 "호스트" (포트 22만) 또는 "호스트:포트" - localhost:2222 같은 다른 포트는 포워딩된 VM/컨테이너일 수 있으므로 적은 포트만 로컬 실행
+def _parse_local_hosts(value: str) -> Set[Tuple[str, int]]:
+	targets = set()
+	for entry in value.split(","):
+		entry = entry.strip().lower()
+		if not entry:
+			continue
+		port = 22
+		if entry.startswith("["):
+			# IPv6: [::1] 또는 [::1]:2222
+			host, _, rest = entry[1:].partition("]")
+			if rest.startswith(":") and rest[1:].isdigit():
+				port = int(rest[1:])
+		else:
+			host, sep, rest = entry.rpartition(":")
+			if sep and rest.isdigit() and ":" not in host:
+				port = int(rest)
+			else:
+				host = entry
+		targets.add((host, port))
+	return targets
+
+LOCAL_EXEC_HOSTS = _parse_local_hosts(os.environ.get("LOCAL_EXEC_HOSTS", ""))
+LOCAL_SHELL = os.environ.get("LOCAL_EXEC_SHELL", "/bin/sh")
+try:
+	LOCAL_USER = getpass.getuser()
+except Exception:
+	LOCAL_USER = str(os.getuid())
+# 중단 시그널 후 프로세스가 끝나지 않으면 SIGKILL을 보내기까지 기다리는 시간 (초)
+KILL_GRACE = 2.0
+
+def is_local_target(host: str, username: str, port: int = 22) -> bool:
+	return (host.lower(), port) in LOCAL_EXEC_HOSTS and username == LOCAL_USER
+
+def _kill_process_group(process: asyncio.subprocess.Process, signal_name: Optional[str]):
+	"""프로세스 그룹 전체에 시그널 전송 (sh -c 아래의 자식 프로세스까지 종료)"""
+	sig = getattr(signal, f"SIG{signal_name.upper().removeprefix('SIG')}", signal.SIGKILL) if signal_name else signal.SIGKILL
+	try:
+		os.killpg(process.pid, sig)
+	except ProcessLookupError:
+		pass
+
+# ssh 프로세스로 실행하는 명령의 원격 감시 스크립트 ($1: 시그널 이름, $2: 명령)
+# pty가 없으면 로컬 ssh 프로세스를 종료해도 원격 명령에 SIGHUP이 가지 않으므로,
+# ssh stdin이 닫히면(중단 시 닫거나 ssh 연결이 끊김) 원격 세션의 프로세스 그룹 전체에 시그널을 보낸다
+# (sshd는 명령마다 새 세션을 만들므로 그룹에는 이 명령의 프로세스만 있음, 명령의 stdin은 /dev/null)
+# 명령은 감싸지 않았을 때처럼 사용자 로그인 쉘($SHELL)로 실행 (bash 문법 등이 그대로 동작)
+_REMOTE_KILL_WRAPPER = r'''exec 3<&0 </dev/null
+(read _ <&3; kill -s "$1" 0) &
+watcher=$!
+exec 3<&-
+"${SHELL:-/bin/sh}" -c "$2"
+rc=$?
+kill "$watcher" 2>/dev/null
+exit "$rc"'''
+
+def _remote_kill_command(command: str, signal_name: str) -> str:
+	"""중단 시 원격 프로세스 그룹에 signal_name을 보내도록 감싼 명령 (알 수 없는 시그널이면 KILL)"""
+	name = signal_name.upper().removeprefix("SIG")
+	if not hasattr(signal, f"SIG{name}"):
+		name = "KILL"
+	return f"sh -c {shlex.quote(_REMOTE_KILL_WRAPPER)} runmcp-exec {name} {shlex.quote(command)}"
+
+async def run_process(
+	argv: List[str],
+	timeout: float,
+	running: RunningCommand,
+	on_output: Optional[Callable[[str, bytes], Awaitable[None]]] = None,
+	remote_kill: bool = False
+) -> Dict[str, Any]:
+	"""
+	비동기 서브프로세스로 명령 실행 후 execute_remote_command와 같은 형식의 결과 반환
+	timeout(전체 실행 시간)/기한 초과나 취소 시 프로세스 그룹을 종료하고 그때까지의 출력과 timed_out/cancelled를 돌려준다
+	on_output을 주면 출력 조각을 받는 대로 ("stdout"|"stderr", 바이트)로 전달 (스트리밍용, 기다리는 동안은 파이프를 읽지 않음)
+	remote_kill이면 (_remote_kill_command로 감싼 ssh 명령) 중단 시 stdin을 닫아 원격에서 시그널을 보내게 하고 KILL_GRACE 후에도 남으면 종료
+	"""
+	process = await asyncio.create_subprocess_exec(
+		*argv,
+		stdin=asyncio.subprocess.PIPE if remote_kill else asyncio.subprocess.DEVNULL,
+		stdout=asyncio.subprocess.PIPE,
+		stderr=asyncio.subprocess.PIPE,
+		start_new_session=True
+	)
+	chunks: Dict[str, List[bytes]] = {"stdout": [], "stderr": []}
+	
+	async def pump(name: str, reader: asyncio.StreamReader):
+		while True:
+			data = await reader.read(32768)
+			if not data:
+				return
+			chunks[name].append(data)
+			if on_output is not None:
+				await on_output(name, data)
+	
+	pumps = asyncio.gather(pump("stdout", process.stdout), pump("stderr", process.stderr))
+	timeout_at = time.monotonic() + timeout
+	reason = None
+	try:
+		while True:
+			try:
+				await asyncio.wait_for(asyncio.shield(pumps), CANCEL_POLL_INTERVAL)
+				break
+			except asyncio.TimeoutError:
+				reason = running.stop_reason() or ("timeout" if time.monotonic() >= timeout_at else None)
+				if reason:
+					break
+		if reason:
+			if remote_kill:
+				process.stdin.close()
+			else:
+				_kill_process_group(process, running.kill_signal)
+			try:
+				await asyncio.wait_for(process.wait(), KILL_GRACE)
+			except asyncio.TimeoutError:
+				_kill_process_group(process, None)
+			# 출력을 물고 있는 손자 프로세스가 있어도 기다리지 않음
+			try:
+				await asyncio.wait_for(asyncio.shield(pumps), KILL_GRACE)
+			except asyncio.TimeoutError:
+				pumps.cancel()
+		exit_code = await process.wait()
+	except asyncio.CancelledError:
+		# 요청이 취소되면(클라이언트 연결 종료 등) 프로세스도 종료
+		_kill_process_group(process, None)
+		pumps.cancel()
+		raise
+	
+	stdout = b"".join(chunks["stdout"]).decode("utf-8", errors="replace")
+	stderr = b"".join(chunks["stderr"]).decode("utf-8", errors="replace")
+	if reason:
+		if reason != "cancelled":
+			TIMEOUTS.inc("local_exec")
+		error_msg = _stopped_message(reason, timeout) if reason != "timeout" else f"명령어 실행 타임아웃: {timeout}초"
+		logger.warning(f"{error_msg}: {' '.join(argv[:1])} ({reason})")
+		return {
+			"success": False,
+			"stdout": stdout,
+			"stderr": stderr,
+			"exit_code": exit_code if exit_code is not None and exit_code >= 0 else -1,
+			"error": error_msg,
+			"security_blocked": False,
+			"timed_out": reason != "cancelled",
+			"cancelled": reason == "cancelled"
+		}
+	return {
+		"success": exit_code == 0,
+		"stdout": stdout,
+		"stderr": stderr,
+		"exit_code": exit_code,
+		"error": None,
+		"security_blocked": False
+	}
+
 # 세션 관리
 class SSHSession:
 	def __init__(self, session_id: str, host: str, port: int, username: str, timeout: int = 30):
@@ -394,9 +859,27 @@ class SSHSession:
 		self.is_connected = False
 		self.shell_mode = False  # 대화형 쉘 모드
 		self.current_prompt = ""  # 현재 프롬프트 상태
+		self._lock = threading.Lock()  # 대화형 쉘 작업 직렬화
+		self._channels = threading.BoundedSemaphore(SESSION_MAX_CHANNELS)  # 동시에 열 수 있는 exec 채널 수
+		self._history_lock = threading.Lock()
+		self.helper: Optional[RemoteHelper] = None  # 원격 도우미 (도우미 모드일 때)
+		self.version = 0  # 히스토리/상태가 바뀔 때마다 증가 (ETag, long-poll에 사용)
+		self._last_idle_wait = 0.0  # 마지막 쉘 출력 읽기에 적용한 출력 간격 대기 (초)
+	
+	def bump_version(self):
+		"""히스토리/상태 변경 기록 후 기다리는 요청 깨우기"""
+		self.version += 1
+		session_changes.changed(self.session_id)
+	
+	@property
+	def etag(self) -> str:
+		return f'"{BOOT_ID}-{self.session_id}-{self.version}"'
 		
 	def connect(self, key_path: Path) -> bool:
 		"""SSH 연결 생성"""
+		connect_start = time.perf_counter()
+		key = _host_key(self.host, self.port)
+		connect_timeout = host_timeouts.connect_timeout(key, self.timeout)
 		try:
 			self.ssh_client = paramiko.SSHClient()
 			self.ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
@@ -409,8 +892,8 @@ class SSHSession:
 					port=self.port,
 					username=self.username,
 					key_filename=str(key_path),
-					timeout=self.timeout,
-					banner_timeout=self.timeout
+					timeout=connect_timeout,
+					banner_timeout=connect_timeout
 				)
 			else:
 				# 키 파일이 없으면 에이전트 사용
@@ -419,23 +902,151 @@ class SSHSession:
 					hostname=self.host,
 					port=self.port,
 					username=self.username,
-					timeout=self.timeout,
-					banner_timeout=self.timeout
+					timeout=connect_timeout,
+					banner_timeout=connect_timeout
 				)
 			
+			connect_elapsed = time.perf_counter() - connect_start
+			PHASE_SECONDS.observe(connect_elapsed, "connect")
+			host_timeouts.record(key, CONNECT, connect_elapsed)
+			_record_host_success(self.host, self.port, self.username)
 			self.is_connected = True
 			self.is_active = True
 			self.update_activity()
+			self.bump_version()
 			logger.info(f"SSH 연결 성공: {self.host}:{self.port}")
 			return True
 			
 		except Exception as e:
-			logger.error(f"SSH 연결 실패: {self.host}:{self.port} - {str(e)}")
+			if isinstance(e, socket.timeout):
+				TIMEOUTS.inc("connect")
+				# 타임아웃에 걸린 연결은 대기 시간을 값으로 기록 (짧게 조정된 타임아웃이 다음에는 늘어남)
+				host_timeouts.record(key, CONNECT, connect_timeout)
+			HOST_ERRORS.inc(self.host)
+			kind = classify_exception(e)
+			if kind:
+				_record_host_failure(self.host, self.port, self.username, kind, str(e))
+			logger.error(f"SSH 연결 실패: {self.host}:{self.port} (타임아웃 {connect_timeout:.1f}초) - {str(e)}")
 			self.cleanup()
 			return False
 	
-	def execute_command(self, command: str, timeout: int = 30) -> Dict[str, Any]:
-		"""세션에서 명령어 실행"""
+	def execute_command(
+		self,
+		command: str,
+		timeout: int = 30,
+		timer: Optional[PhaseTimer] = None,
+		running: Optional[RunningCommand] = None
+	) -> Dict[str, Any]:
+		"""
+		세션에서 명령어 실행 (트랜스포트에 exec 채널을 따로 열어 SESSION_MAX_CHANNELS개까지 동시에 실행)
+		채널 자리를 기다리는 동안에도 취소 가능
+		"""
+		timer = timer or PhaseTimer()
+		running = running or RunningCommand(command, self.host, self.session_id)
+		with running_commands.track(running):
+			lock_start = time.perf_counter()
+			with self._channels:
+				timer.record("queue_wait", time.perf_counter() - lock_start)
+				result = self._execute_command(command, timeout, timer, running)
+		result["command_id"] = running.command_id
+		result["timings"] = timer.as_dict()
+		HOST_LATENCY.add(self.host, result["timings"])
+		self.add_command(command, result)
+		return result
+	
+	def run_script(
+		self,
+		steps: List[str],
+		stop_on_error: bool = True,
+		timeout: int = 30,
+		timer: Optional[PhaseTimer] = None,
+		running: Optional[RunningCommand] = None
+	) -> Dict[str, Any]:
+		"""여러 단계를 exec 채널 하나에서 sh 스크립트로 차례로 실행하고 단계별 결과로 분리"""
+		timer = timer or PhaseTimer()
+		script_text = "\n".join(steps)
+		running = running or RunningCommand(script_text, self.host, self.session_id)
+		with running_commands.track(running):
+			lock_start = time.perf_counter()
+			with self._channels:
+				timer.record("queue_wait", time.perf_counter() - lock_start)
+				result = self._run_script(steps, stop_on_error, timeout, timer, running)
+		result["command_id"] = running.command_id
+		result["timings"] = timer.as_dict()
+		HOST_LATENCY.add(self.host, result["timings"])
+		self.add_command(script_text, result, entry_type="script")
+		return result
+	
+	def _run_script(
+		self,
+		steps: List[str],
+		stop_on_error: bool,
+		timeout: int,
+		timer: PhaseTimer,
+		running: RunningCommand
+	) -> Dict[str, Any]:
+		"""스크립트 실행 (채널 자리 획득 후 호출, 단계 하나라도 위험하면 아무것도 실행하지 않음)"""
+		not_run = [
+			{"index": index, "command": step, "status": STEP_NOT_RUN, "exit_code": None, "stdout": "", "stderr": "", "duration_ms": None}
+			for index, step in enumerate(steps)
+		]
+		if not self.is_connected or not self.ssh_client:
+			return {
+				"success": False,
+				"stdout": None,
+				"stderr": None,
+				"exit_code": -1,
+				"error": "SSH 세션이 연결되지 않았습니다",
+				"steps": not_run
+			}
+		
+		for index, step in enumerate(steps):
+			safety_check = validate_command_safety(step, self.session_id)
+			if not safety_check["safe"]:
+				error_msg = f"🚫 보안상 위험한 명령어가 차단되었습니다: {safety_check['reason']}"
+				logger.warning(f"스크립트 {index}단계 위험한 명령어 차단: {step} - {safety_check['reason']}")
+				return {
+					"success": False,
+					"stdout": None,
+					"stderr": error_msg,
+					"exit_code": -1,
+					"error": error_msg,
+					"security_blocked": True,
+					"security_reason": safety_check["reason"],
+					"blocked_step": index,
+					"steps": not_run
+				}
+		
+		# 단계 출력에 나올 수 없도록 실행마다 새 토큰 사용, 로그인 쉘 종류와 관계없이 sh로 실행
+		token = uuid.uuid4().hex
+		script = build_script(steps, token, stop_on_error)
+		result = self._run_exec_channel(f"sh -c {shlex.quote(script)}", timeout, timer, running)
+		if result["stdout"] is None:
+			result["steps"] = not_run
+			return result
+		
+		step_results, result["stdout"], result["stderr"] = parse_script_output(result["stdout"], result["stderr"], token, steps)
+		stopped = result.get("timed_out") or result.get("cancelled")
+		exit_code = None
+		for step_result in step_results:
+			if step_result["status"] == STEP_INCOMPLETE and not stopped:
+				# 단계 안에서 exit했거나 문법 오류로 스크립트가 끝남
+				step_result["status"] = STEP_FAILED
+				step_result["exit_code"] = result["exit_code"]
+			if step_result["exit_code"] is not None:
+				exit_code = step_result["exit_code"]
+		
+		result["steps"] = step_results
+		result["completed"] = sum(1 for step_result in step_results if step_result["status"] in (STEP_OK, STEP_FAILED))
+		result["exit_code"] = result["exit_code"] if exit_code is None else exit_code
+		result["success"] = all(step_result["status"] == STEP_OK for step_result in step_results)
+		if not result["success"] and not result["error"]:
+			failed = next(step_result for step_result in step_results if step_result["status"] != STEP_OK)
+			result["error"] = f"{failed['index']}단계가 실패했습니다 (exit_code: {failed['exit_code']})"
+		return result
+	
+	def _execute_command(self, command: str, timeout: int, timer: PhaseTimer, running: RunningCommand) -> Dict[str, Any]:
+		"""세션에서 명령어 실행 (채널 자리 획득 후 호출, 히스토리 기록은 호출자가 처리)"""
 		if not self.is_connected or not self.ssh_client:
 			return {
 				"success": False,
@@ -460,21 +1071,123 @@ class SSHSession:
 				"security_blocked": True,
 				"security_reason": safety_check["reason"]
 			}
-			
-			# 히스토리에 차단된 명령어 기록
-			self.add_command(command, result)
 			return result
 		
+		return self._run_exec_channel(command, timeout, timer, running)
+	
+	def start_helper(self, python: Optional[str] = None) -> bool:
+		"""원격 도우미 시작 (실패하면 exec 채널 모드로 계속 사용)"""
+		if not self.is_connected or not self.ssh_client:
+			return False
+		helper = RemoteHelper(self.ssh_client.get_transport(), python or REMOTE_HELPER_PYTHON)
+		try:
+			helper.start(self.timeout)
+		except Exception as e:
+			logger.warning(f"원격 도우미를 시작하지 못해 exec 채널을 사용합니다: {self.session_id} - {str(e)}")
+			return False
+		self.helper = helper
+		self.bump_version()
+		logger.info(f"원격 도우미 시작: {self.session_id} (pid: {helper.pid})")
+		return True
+	
+	def _active_helper(self) -> Optional[RemoteHelper]:
+		"""살아 있는 원격 도우미 (끊겼으면 버리고 None)"""
+		helper = self.helper
+		if helper is None or helper.alive:
+			return helper
+		self._drop_helper()
+		return None
+	
+	def _drop_helper(self):
+		helper, self.helper = self.helper, None
+		if helper is not None:
+			helper.close()
+			logger.warning(f"원격 도우미 연결이 끊어져 exec 채널을 사용합니다: {self.session_id}")
+			self.bump_version()
+	
+	def _run_exec_channel(self, command: str, timeout: int, timer: PhaseTimer, running: RunningCommand) -> Dict[str, Any]:
+		"""보안 검증을 마친 명령을 exec 채널 하나로 실행 (원격 도우미가 있으면 도우미로 실행)"""
+		# 채널 자리를 기다리는 동안 취소/기한 초과된 명령은 실행하지 않음
+		reason = running.stop_reason()
+		if reason:
+			return {
+				"success": False,
+				"stdout": "",
+				"stderr": "",
+				"exit_code": -1,
+				"error": _stopped_message(reason, timeout),
+				"security_blocked": False,
+				"timed_out": reason == "deadline",
+				"cancelled": reason == "cancelled"
+			}
+		
 		try:
 			self.update_activity()
 			
-			# 명령어 실행
-			stdin, stdout, stderr = self.ssh_client.exec_command(command, timeout=timeout)
+			helper = self._active_helper()
+			if helper is not None:
+				# 도우미 모드: 채널을 새로 열지 않고 원격 도우미에 요청 프레임 전송 (중단 시 도우미가 시그널 전달)
+				with timer.phase("read"):
+					stdout_bytes, stderr_bytes, exit_code, reason, first_byte = helper.run(
+						command, timeout, running.stop_reason, running.kill_signal
+					)
+				if first_byte is not None:
+					PHASE_SECONDS.observe(first_byte, "first_byte")
+				if exit_code is None:
+					exit_code = -1
+				errors = 'replace' if reason else 'strict'
+				stdout_data = stdout_bytes.decode('utf-8', errors=errors)
+				stderr_data = stderr_bytes.decode('utf-8', errors=errors)
+			else:
+				# 채널 열기
+				channel_start = time.perf_counter()
+				channel = self.ssh_client.get_transport().open_session(timeout=timeout)
+				channel_elapsed = time.perf_counter() - channel_start
+				PHASE_SECONDS.observe(channel_elapsed, "channel_open")
+				timer.record("exec", channel_elapsed)
+				
+				try:
+					channel.settimeout(timeout)
+					
+					# 명령어 실행
+					exec_start = time.perf_counter()
+					channel.exec_command(command)
+					exec_elapsed = time.perf_counter() - exec_start
+					PHASE_SECONDS.observe(exec_elapsed, "exec")
+					timer.record("exec", exec_elapsed)
+					
+					# 결과 읽기
+					with timer.phase("read"):
+						stdout_bytes, stderr_bytes, reason = self._collect_channel_output(channel, timeout, running)
+					if reason:
+						# 중단된 명령은 원격 프로세스에 시그널을 보내고 받은 데이터까지만 반환 (채널은 finally에서 닫음)
+						if running.kill_signal:
+							_signal_remote(channel, running.kill_signal)
+						exit_code = channel.exit_status if channel.exit_status_ready() else -1
+						stdout_data = stdout_bytes.decode('utf-8', errors='replace')
+						stderr_data = stderr_bytes.decode('utf-8', errors='replace')
+					else:
+						stdout_data = stdout_bytes.decode('utf-8')
+						stderr_data = stderr_bytes.decode('utf-8')
+						exit_code = channel.recv_exit_status()
+				finally:
+					channel.close()
 			
-			# 결과 읽기
-			stdout_data = stdout.read().decode('utf-8')
-			stderr_data = stderr.read().decode('utf-8')
-			exit_code = stdout.channel.recv_exit_status()
+			if reason:
+				if reason != "cancelled":
+					TIMEOUTS.inc("exec" if reason == "timeout" else "deadline")
+				error_msg = _stopped_message(reason, timeout)
+				logger.warning(f"명령어 실행 중단: {command} ({reason}, 출력 {len(stdout_bytes) + len(stderr_bytes)}바이트)")
+				return {
+					"success": False,
+					"stdout": stdout_data,
+					"stderr": stderr_data,
+					"exit_code": exit_code,
+					"error": error_msg,
+					"security_blocked": False,
+					"timed_out": reason != "cancelled",
+					"cancelled": reason == "cancelled"
+				}
 			
 			result = {
 				"success": exit_code == 0,
@@ -485,13 +1198,16 @@ class SSHSession:
 				"security_blocked": False
 			}
 			
-			# 히스토리에 추가
-			self.add_command(command, result)
-			
 			logger.info(f"명령어 실행 완료: {command} (exit_code: {exit_code})")
 			return result
 			
 		except Exception as e:
+			if isinstance(e, socket.timeout):
+				TIMEOUTS.inc("exec")
+			if isinstance(e, RemoteHelperError):
+				# 끊긴 도우미는 버리고 다음 명령부터 exec 채널 사용 (이미 보낸 명령일 수 있으므로 다시 실행하지 않음)
+				self._drop_helper()
+			HOST_ERRORS.inc(self.host)
 			error_msg = f"명령어 실행 오류: {str(e)}"
 			logger.error(error_msg)
 			result = {
@@ -502,24 +1218,86 @@ class SSHSession:
 				"error": error_msg,
 				"security_blocked": False
 			}
-			self.add_command(command, result)
 			return result
 	
+	def _collect_channel_output(
+		self,
+		channel: paramiko.Channel,
+		timeout: int,
+		running: Optional[RunningCommand] = None
+	) -> tuple[bytes, bytes, Optional[str]]:
+		"""
+		exec 채널의 stdout/stderr를 EOF까지 읽기 (첫 바이트/출력 수신 시간 측정)
+		timeout초 동안 출력이 없거나 취소/기한 초과되면 그때까지 받은 출력과 중단 사유를 반환
+		("timeout", "deadline", "cancelled", 끝까지 읽었으면 None)
+		"""
+		stdout_chunks = []
+		stderr_chunks = []
+		wait_start = time.perf_counter()
+		first_byte_at = None
+		idle_since = wait_start
+		reason = None
+		
+		while True:
+			# 출력이 계속 나오는 명령도 멈출 수 있도록 매번 확인
+			reason = running.stop_reason() if running else None
+			if reason:
+				break
+			received = False
+			if channel.recv_ready():
+				stdout_chunks.append(channel.recv(32768))
+				received = True
+			if channel.recv_stderr_ready():
+				stderr_chunks.append(channel.recv_stderr(32768))
+				received = True
+			
+			if received:
+				idle_since = time.perf_counter()
+				if first_byte_at is None:
+					first_byte_at = idle_since
+				continue
+			
+			# 종료 상태는 마지막 출력/EOF보다 먼저 올 수 있으므로 EOF(또는 채널 닫힘)를 받고 버퍼를 모두 비웠을 때만 종료
+			if channel.eof_received or channel.closed:
+				if not channel.recv_ready() and not channel.recv_stderr_ready():
+					break
+				continue
+			
+			idle = time.perf_counter() - idle_since
+			if idle >= timeout:
+				reason = "timeout"
+				break
+			# 데이터가 들어올 때까지 대기 (stdout/stderr 공용 이벤트, 취소 확인을 위해 짧게 나눠서 대기)
+			wait = timeout - idle
+			if running is not None:
+				wait = min(wait, CANCEL_POLL_INTERVAL)
+			select.select([channel], [], [], wait)
+		
+		end = time.perf_counter()
+		if first_byte_at is None:
+			first_byte_at = end
+		PHASE_SECONDS.observe(first_byte_at - wait_start, "first_byte")
+		PHASE_SECONDS.observe(end - first_byte_at, "output_drain")
+		return b"".join(stdout_chunks), b"".join(stderr_chunks), reason
+	
 	def update_activity(self):
 		"""세션 활동 시간 업데이트"""
 		self.last_activity = datetime.now()
 		
-	def add_command(self, command: str, result: Dict[str, Any]):
-		"""명령어 히스토리에 추가 (exec_command용)"""
-		self.command_history.append({
-			'command': command,
-			'timestamp': datetime.now().isoformat(),
-			'result': result,
-			'type': 'exec'
-		})
-		# 히스토리 최대 100개 유지
-		if len(self.command_history) > 100:
-			self.command_history.pop(0)
+	def add_command(self, command: str, result: Dict[str, Any], entry_type: str = 'exec'):
+		"""명령어 히스토리에 추가 (exec_command/스크립트용, 여러 채널에서 동시에 호출)"""
+		with self._history_lock:
+			self.command_history.append({
+				'command': command,
+				'timestamp': datetime.now().isoformat(),
+				'result': result,
+				'type': entry_type,
+				'timings': result.get('timings')
+			})
+			# 히스토리 최대 100개 유지
+			if len(self.command_history) > 100:
+				self.command_history.pop(0)
+			self.bump_version()
 	
 	def is_expired(self, max_idle_time: int = 3600) -> bool:
 		"""세션이 만료되었는지 확인 (기본 1시간)"""
@@ -528,6 +1306,8 @@ class SSHSession:
 	def cleanup(self):
 		"""세션 정리"""
 		try:
+			if self.helper:
+				self.helper.close()
 			if self.shell_channel:
 				self.shell_channel.close()
 			if self.ssh_client:
@@ -535,14 +1315,21 @@ class SSHSession:
 		except Exception as e:
 			logger.error(f"SSH 클라이언트 정리 오류: {str(e)}")
 		finally:
+			self.helper = None
 			self.shell_channel = None
 			self.ssh_client = None
 			self.is_connected = False
 			self.is_active = False
 			self.shell_mode = False
+			self.bump_version()
 
 	
 	def start_interactive_shell(self) -> Dict[str, Any]:
+		"""대화형 쉘 시작"""
+		with self._lock:
+			return self._start_interactive_shell()
+	
+	def _start_interactive_shell(self) -> Dict[str, Any]:
 		if not self.is_connected or not self.ssh_client:
 			return {
 				"success": False,
@@ -562,22 +1349,23 @@ class SSHSession:
 			
 			# 대화형 쉘 시작 - 타임아웃 추가
 			start_time = time.time()
-			logger.info(f"invoke_shell 호출 시작...")
+			logger.debug(f"invoke_shell 호출 시작...")
 			
 			try:
 				# invoke_shell은 블로킹될 수 있으므로 별도 처리
-				self.shell_channel = self.ssh_client.invoke_shell(
-					term='xterm-256color',
-					width=120,
-					height=40
-				)
+				with PHASE_SECONDS.time("channel_open"):
+					self.shell_channel = self.ssh_client.invoke_shell(
+						term='xterm-256color',
+						width=120,
+						height=40
+					)
 			except paramiko.ssh_exception.ChannelException as e:
 				raise Exception(f"SSH 채널 생성 실패: {str(e)}")
 			except Exception as e:
 				raise Exception(f"invoke_shell 호출 실패: {str(e)}")
 			
 			invoke_time = time.time() - start_time
-			logger.info(f"invoke_shell 완료: {invoke_time:.2f}초 소요")
+			logger.debug(f"invoke_shell 완료: {invoke_time:.2f}초 소요")
 			
 			if invoke_time > 10:  # 10초 이상 걸리면 문제
 				logger.warning(f"쉘 시작이 오래 걸렸습니다: {invoke_time:.2f}초")
@@ -589,21 +1377,21 @@ class SSHSession:
 			if self.shell_channel.closed:
 				raise Exception("생성된 쉘 채널이 이미 닫힘")
 				
-			logger.info(f"쉘 채널 생성 완료, 채널 ID: {self.shell_channel.get_id()}")
+			logger.debug(f"쉘 채널 생성 완료, 채널 ID: {self.shell_channel.get_id()}")
 			
 			# 논블로킹 모드로 설정
 			self.shell_channel.settimeout(0.1)
-			logger.info(f"쉘 채널 생성 완료, 초기 출력 읽기 시작")
+			logger.debug(f"쉘 채널 생성 완료, 초기 출력 읽기 시작")
 			
-			# 초기 프롬프트 읽기 - 타임아웃 단축
-			time.sleep(0.3)  # 0.5초에서 0.3초로 단축
-			initial_output = self._read_shell_output(max_wait=1.5)  # 2초에서 1.5초로 단축
+			# 초기 프롬프트 읽기 (첫 바이트를 기다리므로 고정 대기 없이 바로 읽음)
+			initial_output = self._read_shell_output()
 			
-			logger.info(f"초기 출력 읽기 완료, 길이: {len(initial_output) if initial_output else 0}")
+			logger.debug(f"초기 출력 읽기 완료, 길이: {len(initial_output) if initial_output else 0}")
 			
 			self.shell_mode = True
 			self.current_prompt = self._extract_prompt(initial_output)
 			self.update_activity()
+			self.bump_version()
 			
 			logger.info(f"대화형 쉘 시작 완료: {self.session_id}, 프롬프트: {self.current_prompt}")
 			
@@ -643,15 +1431,26 @@ class SSHSession:
 			self.shell_channel = None
 			self.shell_mode = False
 	
-	def send_shell_command(self, command: str) -> Dict[str, Any]:
+	def send_shell_command(self, command: str, timer: Optional[PhaseTimer] = None) -> Dict[str, Any]:
 		"""대화형 쉘에서 명령어 실행"""
-		if not self.shell_mode or not self.shell_channel:
-			return {
-				"success": False,
-				"output": "",
-				"error": "대화형 쉘이 시작되지 않았습니다"
-			}
-		
+		timer = timer or PhaseTimer()
+		lock_start = time.perf_counter()
+		with self._lock:
+			timer.record("queue_wait", time.perf_counter() - lock_start)
+			if not self.shell_mode or not self.shell_channel:
+				return {
+					"success": False,
+					"output": "",
+					"error": "대화형 쉘이 시작되지 않았습니다"
+				}
+			result = self._send_shell_command(command, timer)
+		result["timings"] = timer.as_dict()
+		HOST_LATENCY.add(self.host, result["timings"])
+		self.add_shell_command(command, result)
+		return result
+	
+	def _send_shell_command(self, command: str, timer: PhaseTimer) -> Dict[str, Any]:
+		"""대화형 쉘에서 명령어 실행 (잠금 획득 후 호출, 히스토리 기록은 호출자가 처리)"""
 		# 보안 검증: 위험한 명령어 차단
 		safety_check = validate_command_safety(command, self.session_id)
 		if not safety_check["safe"]:
@@ -666,30 +1465,32 @@ class SSHSession:
 				"security_blocked": True,
 				"security_reason": safety_check["reason"]
 			}
-			
-			# 히스토리에 차단된 명령어 기록
-			self.add_shell_command(command, result)
 			return result
 		
 		try:
 			self.update_activity()
 			
+			# 이전 읽기가 끝난 뒤 도착한 출력이 남아 있으면 출력 간격 대기가 짧았던 것 (그 대기 시간을 값으로 기록)
+			if self._last_idle_wait and self.shell_channel.recv_ready():
+				host_timeouts.record(_host_key(self.host, self.port), IDLE_GAP, self._last_idle_wait)
+			
 			# 명령어 전송
-			self.shell_channel.send(command + '\n')
+			with timer.phase("exec"):
+				self.shell_channel.send(command + '\n')
 			
-			# 출력 읽기 (약간의 대기 시간 후)
-			time.sleep(0.3)
-			raw_output = self._read_shell_output()
+			# 출력 읽기 (첫 바이트를 기다리므로 고정 대기 없이 바로 읽음)
+			with timer.phase("read"):
+				raw_output = self._read_shell_output(clean=False)
 			
 			# 출력을 정리 (ANSI 색상을 HTML로 변환)
-			clean_output = clean_terminal_output(raw_output, preserve_colors=True)
+			with timer.phase("render"):
+				clean_output = clean_terminal_output(raw_output, preserve_colors=True)
 			
-			# 프롬프트 추출 (원본 출력에서)
-			new_prompt = self._extract_prompt(raw_output)
+			# 프롬프트 추출 (정리된 출력에서)
+			new_prompt = self._extract_prompt(clean_output)
 			if new_prompt:
 				self.current_prompt = new_prompt
 			
-			# 히스토리에 추가
 			result = {
 				"success": True,
 				"output": clean_output,
@@ -698,8 +1499,6 @@ class SSHSession:
 				"has_colors": "<span" in clean_output  # HTML 색상 포함 여부
 			}
 			
-			self.add_shell_command(command, result)
-			
 			logger.info(f"쉘 명령어 실행: {command}")
 			return result
 			
@@ -713,19 +1512,37 @@ class SSHSession:
 				"security_blocked": False,
 				"has_colors": False
 			}
-			self.add_shell_command(command, result)
 			return result
 	
-	def _read_shell_output(self, max_wait: float = 2.0) -> str:
-		"""쉘 출력 읽기 - 개선된 버전"""
+	def _read_shell_output(self, max_wait: float = SHELL_READ_WAIT, clean: bool = True) -> str:
+		"""
+		쉘 출력 읽기 (clean=False이면 원본 출력 반환)
+		프롬프트가 보이면 바로 끝내고, 아니면 첫 바이트 대기/출력 조각 사이 대기(호스트 지연 시간으로 조정) 동안 출력이 없을 때 끝냄
+		전체 읽기 시간은 max_wait와 두 대기 시간의 합 중 큰 값으로 제한
+		"""
+		key = _host_key(self.host, self.port)
+		first_byte_wait, idle_wait = host_timeouts.shell_waits(key, max_wait)
+		self._last_idle_wait = idle_wait
 		output = ""
 		start_time = time.time()
-		no_data_count = 0
-		max_no_data = int(max_wait * 10)  # 0.1초씩 기다리므로 총 대기 횟수
+		read_deadline = start_time + max(max_wait, first_byte_wait + idle_wait)
+		first_byte_at = None
+		last_data_at = None
+		max_gap = 0.0
 		
-		logger.debug(f"쉘 출력 읽기 시작, 최대 대기: {max_wait}초")
+		logger.debug(f"쉘 출력 읽기 시작, 첫 바이트 대기: {first_byte_wait:.2f}초, 출력 간격 대기: {idle_wait:.2f}초")
 		
-		while time.time() - start_time < max_wait and no_data_count < max_no_data:
+		while True:
+			now = time.time()
+			if now >= read_deadline:
+				break
+			if last_data_at is None:
+				if now - start_time >= first_byte_wait:
+					# 첫 바이트를 받지 못했으면 대기 시간을 값으로 기록 (계속 넘기는 호스트는 대기가 늘어남)
+					host_timeouts.record(key, FIRST_BYTE, first_byte_wait)
+					break
+			elif now - last_data_at >= idle_wait:
+				break
 			try:
 				if not self.shell_channel:
 					logger.error("쉘 채널이 없습니다")
@@ -734,17 +1551,23 @@ class SSHSession:
 				if self.shell_channel.recv_ready():
 					chunk = self.shell_channel.recv(4096).decode('utf-8', errors='ignore')
 					if chunk:
+						received_at = time.time()
+						if first_byte_at is None:
+							first_byte_at = received_at
+							PHASE_SECONDS.observe(first_byte_at - start_time, "first_byte")
+							host_timeouts.record(key, FIRST_BYTE, first_byte_at - start_time)
+						else:
+							max_gap = max(max_gap, received_at - last_data_at)
+						last_data_at = received_at
 						output += chunk
-						no_data_count = 0  # 데이터를 받았으므로 리셋
 						logger.debug(f"데이터 수신: {len(chunk)}바이트")
 						# 연속된 데이터가 있을 수 있으므로 잠깐 더 기다림
 						if len(chunk) == 4096:  # 버퍼가 가득찬 경우 더 있을 수 있음
 							continue
-					else:
-						no_data_count += 1
 				else:
-					no_data_count += 1
-					time.sleep(0.1)
+					# 데이터가 들어오면 바로 깨어나도록 채널을 기다림
+					select.select([self.shell_channel], [], [], 0.1)
+					continue
 					
 				# ANSI 이스케이프 시퀀스를 제거한 상태에서 프롬프트 확인 (색상은 보존)
 				clean_output = strip_ansi_escape_sequences(output)
@@ -764,14 +1587,21 @@ class SSHSession:
 							
 			except socket.timeout:
 				# 타임아웃은 정상적인 상황
-				no_data_count += 1
+				pass
 			except Exception as e:
 				logger.error(f"쉘 출력 읽기 중 오류: {str(e)}")
 				break
 		
 		elapsed = time.time() - start_time
+		if first_byte_at is not None:
+			PHASE_SECONDS.observe(time.time() - first_byte_at, "output_drain")
+			# 읽기마다 가장 긴 출력 조각 사이 간격 하나만 기록 (큰 출력의 연속 조각이 통계를 채우지 않게)
+			host_timeouts.record(key, IDLE_GAP, max_gap)
 		logger.debug(f"쉘 출력 읽기 완료: {len(output)}바이트, {elapsed:.2f}초 소요")
 		
+		if not clean:
+			return output
+		
 		# 출력을 정리해서 반환 (색상 보존)
 		return clean_terminal_output(output, preserve_colors=True)
 	
@@ -796,8 +1626,24 @@ class SSHSession:
 		
 		return self.current_prompt
 	
+	def interrupt_shell(self) -> bool:
+		"""대화형 쉘의 실행 중인 명령에 Ctrl+C 전송 (쉘이 열려 있지 않으면 False)"""
+		channel = self.shell_channel
+		if not self.shell_mode or channel is None or channel.closed:
+			return False
+		try:
+			channel.send("\x03")
+			return True
+		except Exception as e:
+			logger.warning(f"쉘 인터럽트 전송 실패: {self.session_id} - {str(e)}")
+			return False
+	
 	def stop_interactive_shell(self) -> bool:
 		"""대화형 쉘 종료"""
+		with self._lock:
+			return self._stop_interactive_shell()
+	
+	def _stop_interactive_shell(self) -> bool:
 		try:
 			if self.shell_channel:
 				self.shell_channel.close()
@@ -805,6 +1651,7 @@ class SSHSession:
 			
 			self.shell_mode = False
 			self.current_prompt = ""
+			self.bump_version()
 			logger.info(f"대화형 쉘 종료: {self.session_id}")
 			return True
 			
@@ -814,15 +1661,18 @@ class SSHSession:
 	
 	def add_shell_command(self, command: str, result: Dict[str, Any]):
 		"""쉘 명령어 히스토리에 추가"""
-		self.command_history.append({
-			'command': command,
-			'timestamp': datetime.now().isoformat(),
-			'result': result,
-			'type': 'shell'
-		})
-		# 히스토리 최대 100개 유지
-		if len(self.command_history) > 100:
-			self.command_history.pop(0)
+		with self._history_lock:
+			self.command_history.append({
+				'command': command,
+				'timestamp': datetime.now().isoformat(),
+				'result': result,
+				'type': 'shell',
+				'timings': result.get('timings')
+			})
+			# 히스토리 최대 100개 유지
+			if len(self.command_history) > 100:
+				self.command_history.pop(0)
+			self.bump_version()
 
 # 요청 모델 정의
 class SSHCommandRequest(BaseModel):
@@ -833,6 +1683,18 @@ class SSHCommandRequest(BaseModel):
 	command: str = Field(..., description="실행할 쉘 명령어")
 	timeout: int = Field(30, description="명령어 실행 타임아웃 (초)")
 	use_master_key: bool = Field(True, description="마스터키 사용 여부")
+	command_id: Optional[str] = Field(None, description="취소할 때 사용할 명령 ID (없으면 자동 생성)")
+	deadline: Optional[float] = Field(None, description="최대 실행 시간 (초, 0이면 제한 없음, 기본 COMMAND_DEADLINE)")
+	kill_signal: Optional[str] = Field(None, description="중단 시 원격 프로세스에 보낼 시그널 (기본 COMMAND_KILL_SIGNAL, 빈 값이면 보내지 않음)")
+
+class CommandTimings(BaseModel):
+	"""명령어 처리 단계별 소요 시간 (밀리초)"""
+	queue_wait: Optional[float] = None
+	connect: Optional[float] = None
+	exec: Optional[float] = None
+	read: Optional[float] = None
+	render: Optional[float] = None
+	total: Optional[float] = None
 
 class SSHCommandResponse(BaseModel):
 	"""SSH 명령어 실행 응답 모델"""
@@ -843,6 +1705,11 @@ class SSHCommandResponse(BaseModel):
 	error: Optional[str] = None
 	host: str
 	command: str
+	timings: Optional[CommandTimings] = None
+	command_id: Optional[str] = None
+	timed_out: bool = False
+	cancelled: bool = False
+	circuit_open: bool = False
 
 class SSHSessionRequest(BaseModel):
 	"""SSH 세션 생성 요청 모델"""
@@ -851,6 +1718,7 @@ class SSHSessionRequest(BaseModel):
 	username: str = Field("root", description="SSH 사용자명")
 	timeout: int = Field(30, description="세션 타임아웃 (초)")
 	use_master_key: bool = Field(True, description="마스터키 사용 여부")
+	helper: Optional[bool] = Field(None, description="원격 도우미 모드 사용 여부 (원격에 python3 필요, 기본 SESSION_HELPER)")
 
 class SSHSessionResponse(BaseModel):
 	"""SSH 세션 생성 응답 모델"""
@@ -863,7 +1731,10 @@ class SSHSessionResponse(BaseModel):
 class SSHCommandInSessionRequest(BaseModel):
 	"""세션 내 명령어 실행 요청 모델"""
 	command: str = Field(..., description="실행할 명령어")
-	timeout: int = Field(30, description="명령어 실행 타임아웃 (초)")
+	timeout: int = Field(30, description="출력 대기 타임아웃 (초, 이 시간 동안 출력이 없으면 중단)")
+	command_id: Optional[str] = Field(None, description="취소할 때 사용할 명령 ID (없으면 자동 생성)")
+	deadline: Optional[float] = Field(None, description="최대 실행 시간 (초, 0이면 제한 없음, 기본 COMMAND_DEADLINE)")
+	kill_signal: Optional[str] = Field(None, description="중단 시 원격 프로세스에 보낼 시그널 (기본 COMMAND_KILL_SIGNAL, 빈 값이면 보내지 않음)")
 
 class SSHCommandInSessionResponse(BaseModel):
 	"""세션 내 명령어 실행 응답 모델"""
@@ -874,6 +1745,51 @@ class SSHCommandInSessionResponse(BaseModel):
 	exit_code: Optional[int] = None
 	error: Optional[str] = None
 	command: str
+	timings: Optional[CommandTimings] = None
+	command_id: Optional[str] = None
+	timed_out: bool = False
+	cancelled: bool = False
+
+class SSHCommandsInSessionRequest(BaseModel):
+	"""세션 내 여러 명령어 동시 실행 요청 모델"""
+	commands: List[SSHCommandInSessionRequest] = Field(
+		..., min_length=1, max_length=EXECUTE_MANY_MAX, description="서로 독립적인 명령어 목록 (결과는 같은 순서로 반환)"
+	)
+
+class ScriptRequest(BaseModel):
+	"""세션 내 여러 단계 스크립트 실행 요청 모델"""
+	steps: List[str] = Field(..., min_length=1, max_length=SCRIPT_MAX_STEPS, description="차례로 실행할 명령어 (cd, 변수 설정은 다음 단계에 적용)")
+	stop_on_error: bool = Field(True, description="단계가 0이 아닌 종료 코드로 끝나면 나머지 단계를 실행하지 않음")
+	timeout: int = Field(30, description="출력 대기 타임아웃 (초, 이 시간 동안 출력이 없으면 중단)")
+	command_id: Optional[str] = Field(None, description="취소할 때 사용할 명령 ID (없으면 자동 생성)")
+	deadline: Optional[float] = Field(None, description="전체 최대 실행 시간 (초, 0이면 제한 없음, 기본 COMMAND_DEADLINE)")
+	kill_signal: Optional[str] = Field(None, description="중단 시 원격 프로세스에 보낼 시그널 (기본 COMMAND_KILL_SIGNAL, 빈 값이면 보내지 않음)")
+
+class ScriptStepResult(BaseModel):
+	"""스크립트 단계별 결과 (status: ok, failed, incomplete, not_run)"""
+	index: int
+	command: str
+	status: str
+	exit_code: Optional[int] = None
+	stdout: str = ""
+	stderr: str = ""
+	duration_ms: Optional[float] = None
+
+class ScriptResponse(BaseModel):
+	"""세션 내 스크립트 실행 응답 모델 (stdout/stderr는 단계 밖 출력)"""
+	session_id: str
+	success: bool
+	steps: List[ScriptStepResult] = []
+	completed: int = 0
+	total: int
+	stdout: Optional[str] = None
+	stderr: Optional[str] = None
+	exit_code: Optional[int] = None
+	error: Optional[str] = None
+	timings: Optional[CommandTimings] = None
+	command_id: Optional[str] = None
+	timed_out: bool = False
+	cancelled: bool = False
 
 class SSHSessionInfoResponse(BaseModel):
 	"""SSH 세션 정보 응답 모델"""
@@ -886,6 +1802,8 @@ class SSHSessionInfoResponse(BaseModel):
 	is_connected: bool
 	command_count: int
 	command_history: List[Dict[str, Any]] = []
+	version: int = 0
+	helper: bool = False
 
 class ShellStartRequest(BaseModel):
 	"""대화형 쉘 시작 요청 모델"""
@@ -903,6 +1821,7 @@ class ShellCommandResponse(BaseModel):
 	prompt: Optional[str] = None
 	error: Optional[str] = None
 	command: str
+	timings: Optional[CommandTimings] = None
 
 class SSHKeySetupRequest(BaseModel):
 	"""SSH 키 설정 요청 모델"""
@@ -958,8 +1877,16 @@ class SSHExecutor:
 		cleanup_thread = threading.Thread(target=cleanup_sessions, daemon=True)
 		cleanup_thread.start()
 	
-	def create_session(self, host: str, port: int, username: str, timeout: int = 30, use_master_key: bool = True) -> str:
-		"""SSH 세션 생성"""
+	def create_session(
+		self,
+		host: str,
+		port: int,
+		username: str,
+		timeout: int = 30,
+		use_master_key: bool = True,
+		helper: bool = False
+	) -> str:
+		"""SSH 세션 생성 (helper이면 원격 도우미도 시작, 실패하면 exec 채널 모드)"""
 		session_id = str(uuid.uuid4())
 		
 		try:
@@ -968,7 +1895,10 @@ class SSHExecutor:
 			# SSH 연결 생성
 			key_path = self.key_path if use_master_key else None
 			if session.connect(key_path):
+				if helper:
+					session.start_helper()
 				self.sessions[session_id] = session
+				session_changes.changed()
 				logger.info(f"SSH 세션 생성 성공: {session_id} - {host}")
 				return session_id
 			else:
@@ -984,11 +1914,19 @@ class SSHExecutor:
 			session = self.sessions[session_id]
 			session.cleanup()
 			del self.sessions[session_id]
+			session_changes.changed(session_id)
 			logger.info(f"SSH 세션 종료: {session_id}")
 			return True
 		return False
 	
-	def execute_in_session(self, session_id: str, command: str, timeout: int = 30) -> Dict[str, Any]:
+	def execute_in_session(
+		self,
+		session_id: str,
+		command: str,
+		timeout: int = 30,
+		timer: Optional[PhaseTimer] = None,
+		running: Optional[RunningCommand] = None
+	) -> Dict[str, Any]:
 		"""세션 내에서 명령어 실행"""
 		if session_id not in self.sessions:
 			return {
@@ -1000,7 +1938,7 @@ class SSHExecutor:
 			}
 		
 		session = self.sessions[session_id]
-		result = session.execute_command(command, timeout)
+		result = session.execute_command(command, timeout, timer, running)
 		
 		# 보안상 차단된 경우 403 Forbidden 반환
 		if result.get("security_blocked", False):
@@ -1032,7 +1970,9 @@ class SSHExecutor:
 			"is_active": session.is_active,
 			"is_connected": session.is_connected,
 			"command_count": len(session.command_history),
-			"command_history": session.command_history
+			"command_history": session.command_history,
+			"version": session.version,
+			"helper": session.helper is not None
 		}
 	
 	def list_sessions(self) -> List[Dict[str, Any]]:
@@ -1047,7 +1987,9 @@ class SSHExecutor:
 				"last_activity": session.last_activity.isoformat(),
 				"is_active": session.is_active,
 				"is_connected": session.is_connected,
-				"command_count": len(session.command_history)
+				"command_count": len(session.command_history),
+				"version": session.version,
+				"helper": session.helper is not None
 			})
 		return sessions_info
 
@@ -1058,82 +2000,123 @@ class SSHExecutor:
 		port: int = 22,
 		username: str = "root",
 		timeout: int = 30,
-		use_master_key: bool = True
+		use_master_key: bool = True,
+		timer: Optional[PhaseTimer] = None,
+		running: Optional[RunningCommand] = None
 	) -> Dict[str, Any]:
 		"""
 		원격 서버에서 명령어 실행 (단일 실행용)
 		"""
+		timer = timer or PhaseTimer()
+		running = running or RunningCommand(command, host)
+		with running_commands.track(running):
+			result = self._execute_remote_command(host, command, port, username, timeout, use_master_key, timer, running)
+		result["command_id"] = running.command_id
+		result["timings"] = timer.as_dict()
+		HOST_LATENCY.add(host, result["timings"])
+		return result
+	
+	def _execute_remote_command(
+		self,
+		host: str,
+		command: str,
+		port: int,
+		username: str,
+		timeout: int,
+		use_master_key: bool,
+		timer: PhaseTimer,
+		running: RunningCommand
+	) -> Dict[str, Any]:
+		"""
+		ssh 프로세스로 명령어 실행 (연결/실행/출력 수신이 한 프로세스에서 처리됨)
+		timeout은 전체 실행 시간이며, 초과하거나 취소되면 ssh stdin을 닫아 원격 프로세스에 kill_signal을 보내고
+		(빈 값이면 보내지 않음) KILL_GRACE 후에도 끝나지 않으면 ssh 프로세스를 종료하고 그때까지의 출력을 반환
+		"""
 		# 보안 검증: 위험한 명령어 차단
-		safety_check = validate_command_safety(command, f"remote_{host}")
-		if not safety_check["safe"]:
-			error_msg = f"🚫 보안상 위험한 명령어가 차단되었습니다: {safety_check['reason']}"
-			logger.warning(f"원격 명령어 실행에서 위험한 명령어 차단: {command} - {safety_check['reason']}")
-			
-			return {
-				"success": False,
-				"stdout": None,
-				"stderr": error_msg,
-				"exit_code": -1,
-				"error": error_msg,
-				"security_blocked": True,
-				"security_reason": safety_check["reason"]
-			}
+		blocked = _blocked_result(command, f"remote_{host}")
+		if blocked:
+			return blocked
 		
+		stdin_write = None
 		try:
-			# SSH 명령어 구성
-			ssh_cmd = ["ssh"]
-			
-			# SSH 옵션 추가
-			ssh_options = [
-				"-o", "StrictHostKeyChecking=no",
-				"-o", "UserKnownHostsFile=/dev/null",
-				"-o", f"ConnectTimeout={timeout}",
-				"-p", str(port),
-			]
-			
-			# 마스터키 사용 시
-			if use_master_key and self.key_path.exists():
-				ssh_options.extend(["-i", str(self.key_path)])
-			
-			ssh_cmd.extend(ssh_options)
+			ssh_cmd = self._ssh_command(host, command, port, username, timeout, use_master_key, running.kill_signal)
+			logger.info(f"SSH 명령어 실행: {host} - {command}")
 			
-			# 사용자@호스트 추가
-			ssh_cmd.append(f"{username}@{host}")
+			# 원격 감시 스크립트가 읽을 stdin (communicate는 stdin=PIPE를 바로 닫으므로 파이프를 직접 만들어 중단할 때 닫음)
+			stdin_read = subprocess.DEVNULL
+			if running.kill_signal:
+				stdin_read, stdin_write = os.pipe()
 			
-			# 실행할 명령어 추가
-			ssh_cmd.append(command)
+			# 명령어 실행 (ssh 프로세스가 연결과 실행을 함께 처리)
+			reason = None
+			timeout_at = time.monotonic() + timeout
+			with PHASE_SECONDS.time("exec"), timer.phase("exec"):
+				try:
+					process = subprocess.Popen(
+						ssh_cmd,
+						stdin=stdin_read,
+						stdout=subprocess.PIPE,
+						stderr=subprocess.PIPE,
+						text=True,
+						errors="replace"
+					)
+				finally:
+					if stdin_write is not None:
+						os.close(stdin_read)
+				while True:
+					try:
+						# 시간 초과 후 다시 호출해도 이미 읽은 출력은 유지됨
+						stdout, stderr = process.communicate(timeout=CANCEL_POLL_INTERVAL)
+						break
+					except subprocess.TimeoutExpired:
+						reason = running.stop_reason() or ("timeout" if time.monotonic() >= timeout_at else None)
+						if reason:
+							break
+				if reason:
+					if stdin_write is not None:
+						os.close(stdin_write)
+						stdin_write = None
+						try:
+							stdout, stderr = process.communicate(timeout=KILL_GRACE)
+						except subprocess.TimeoutExpired:
+							process.kill()
+							stdout, stderr = process.communicate()
+					else:
+						process.kill()
+						stdout, stderr = process.communicate()
 			
-			logger.info(f"SSH 명령어 실행: {host} - {command}")
+			if reason:
+				if reason != "cancelled":
+					TIMEOUTS.inc("remote_exec")
+					HOST_ERRORS.inc(host)
+				error_msg = _stopped_message(reason, timeout) if reason != "timeout" else f"명령어 실행 타임아웃: {timeout}초"
+				logger.error(f"{error_msg}: {host} - {command}")
+				return {
+					"success": False,
+					"stdout": stdout,
+					"stderr": stderr,
+					"exit_code": -1,
+					"error": error_msg,
+					"security_blocked": False,
+					"timed_out": reason != "cancelled",
+					"cancelled": reason == "cancelled"
+				}
 			
-			# 명령어 실행
-			result = subprocess.run(
-				ssh_cmd,
-				capture_output=True,
-				text=True,
-				timeout=timeout
-			)
+			# ssh 자체 오류 (연결/인증 실패)
+			if process.returncode == 255:
+				HOST_ERRORS.inc(host)
+			_record_ssh_exit(host, port, username, process.returncode, stderr)
 			
 			return {
-				"success": result.returncode == 0,
-				"stdout": result.stdout,
-				"stderr": result.stderr,
-				"exit_code": result.returncode,
+				"success": process.returncode == 0,
+				"stdout": stdout,
+				"stderr": stderr,
+				"exit_code": process.returncode,
 				"error": None,
 				"security_blocked": False
 			}
-			
-		except subprocess.TimeoutExpired:
-			error_msg = f"명령어 실행 타임아웃: {timeout}초"
-			logger.error(error_msg)
-			return {
-				"success": False,
-				"stdout": None,
-				"stderr": None,
-				"exit_code": -1,
-				"error": error_msg,
-				"security_blocked": False
-			}
 		except Exception as e:
+			HOST_ERRORS.inc(host)
 			error_msg = f"SSH 실행 오류: {str(e)}"
 			logger.error(error_msg)
 			return {
@@ -1144,6 +2127,85 @@ class SSHExecutor:
 				"error": error_msg,
 				"security_blocked": False
 			}
+		finally:
+			if stdin_write is not None:
+				os.close(stdin_write)
+
+	def _ssh_command(
+		self,
+		host: str,
+		command: str,
+		port: int,
+		username: str,
+		timeout: int,
+		use_master_key: bool,
+		kill_signal: Optional[str] = None
+	) -> List[str]:
+		"""ssh 프로세스 실행 인자 구성 (kill_signal을 주면 중단 시 원격 프로세스에 시그널을 보내도록 명령을 감쌈)"""
+		ssh_cmd = ["ssh"]
+		
+		# SSH 옵션 추가
+		ssh_options = [
+			"-o", "StrictHostKeyChecking=no",
+			"-o", "UserKnownHostsFile=/dev/null",
+			"-o", f"ConnectTimeout={math.ceil(host_timeouts.connect_timeout(_host_key(host, port), timeout))}",
+			"-p", str(port),
+		]
+		
+		# 마스터키 사용 시
+		if use_master_key and self.key_path.exists():
+			ssh_options.extend(["-i", str(self.key_path)])
+		
+		ssh_cmd.extend(ssh_options)
+		
+		# 사용자@호스트 추가
+		ssh_cmd.append(f"{username}@{host}")
+		
+		# 실행할 명령어 추가
+		ssh_cmd.append(_remote_kill_command(command, kill_signal) if kill_signal else command)
+		return ssh_cmd
+	
+	def command_argv(
+		self,
+		host: str,
+		command: str,
+		port: int,
+		username: str,
+		timeout: int,
+		use_master_key: bool,
+		kill_signal: Optional[str] = None
+	) -> List[str]:
+		"""로컬 실행 대상이면 sh, 아니면 ssh 프로세스 실행 인자"""
+		if is_local_target(host, username, port):
+			return [LOCAL_SHELL, "-c", command]
+		return self._ssh_command(host, command, port, username, timeout, use_master_key, kill_signal)
+	
+	async def execute_local_command(
+		self,
+		host: str,
+		command: str,
+		timeout: int = 30,
+		timer: Optional[PhaseTimer] = None,
+		running: Optional[RunningCommand] = None
+	) -> Dict[str, Any]:
+		"""
+		로컬 실행 대상 호스트의 명령을 SSH 없이 이 서버에서 실행 (execute_remote_command와 같은 검사/응답 형식)
+		이벤트 루프에서 비동기 서브프로세스로 실행하므로 스레드 풀을 쓰지 않는다
+		"""
+		timer = timer or PhaseTimer()
+		running = running or RunningCommand(command, host)
+		blocked = _blocked_result(command, f"local_{host}")
+		if blocked:
+			result = blocked
+		else:
+			logger.info(f"로컬 명령어 실행: {host} - {command}")
+			with running_commands.track(running):
+				with PHASE_SECONDS.time("exec"), timer.phase("exec"):
+					result = await run_process([LOCAL_SHELL, "-c", command], timeout, running)
+		result["command_id"] = running.command_id
+		result["timings"] = timer.as_dict()
+		HOST_LATENCY.add(host, result["timings"])
+		return result
 
 class InteractiveShell:
 	def __init__(self, ssh_session):
@@ -1165,6 +2227,99 @@ class InteractiveShell:
 # FastMCP 앱 초기화
 ssh_executor = None
 
+def _count_sessions(predicate=None) -> int:
+	"""조건에 맞는 세션 수 (메트릭 수집용)"""
+	if not ssh_executor:
+		return 0
+	sessions = list(ssh_executor.sessions.values())
+	if predicate is None:
+		return len(sessions)
+	return sum(1 for session in sessions if predicate(session))
+
+def _has_active_transport(session: SSHSession) -> bool:
+	transport = session.ssh_client.get_transport() if session.ssh_client else None
+	return bool(transport and transport.is_active())
+
+async def _run_blocking(queue_timer: Optional[PhaseTimer], func, /, *args, **kwargs):
+	"""블로킹 SSH 작업을 스레드 풀에서 실행 (스레드 풀 대기 시간은 queue_wait로 기록)"""
+	submitted = time.perf_counter()
+	
+	def call():
+		if queue_timer is not None:
+			queue_timer.record("queue_wait", time.perf_counter() - submitted)
+		return func(*args, **kwargs)
+	
+	return await run_in_threadpool(call)
+
+# 명령 실행 요청의 Idempotency-Key별 결과 (진행 중인 실행은 함께 기다리고, 끝난 결과는 TTL 동안 보관)
+IDEMPOTENCY_TTL = float(os.environ.get("IDEMPOTENCY_TTL", "600"))
+IDEMPOTENCY_MAX_KEYS = int(os.environ.get("IDEMPOTENCY_MAX_KEYS", "10000"))
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+idempotent_results = SingleFlight(ttl=IDEMPOTENCY_TTL, max_entries=IDEMPOTENCY_MAX_KEYS)
+
+async def _run_idempotent(key: Optional[str], route: str, scope: str, payload: Dict[str, Any], response: Response, function):
+	"""
+	Idempotency-Key가 있으면 같은 키의 재요청에 다시 실행하지 않고 진행 중이거나 저장된 결과 반환
+	(웹 서버 타임아웃 후 재시도로 원격 명령이 두 번 실행되는 것 방지, 같은 키에 다른 요청 본문이면 422)
+	"""
+	if not key:
+		return await function()
+	if len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+		raise HTTPException(status_code=400, detail="Idempotency-Key가 너무 깁니다")
+	fingerprint = hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+	
+	async def run():
+		return fingerprint, await function()
+	
+	(stored_fingerprint, result), shared = await idempotent_results.do((scope, key), run)
+	if stored_fingerprint != fingerprint:
+		raise HTTPException(status_code=422, detail="같은 Idempotency-Key로 다른 요청이 이미 실행되었습니다")
+	if shared:
+		IDEMPOTENT_REPLAYS.inc(route, shared)
+		response.headers["Idempotent-Replayed"] = "true"
+	return result
+
+def _running_command(request, host: str, session_id: Optional[str] = None, command: Optional[str] = None) -> RunningCommand:
+	"""요청의 command_id/deadline/kill_signal로 실행 중 명령 생성 (같은 command_id가 실행 중이면 409)"""
+	if request.command_id and running_commands.get(request.command_id):
+		raise HTTPException(status_code=409, detail=f"이미 실행 중인 command_id입니다: {request.command_id}")
+	return RunningCommand(
+		command or request.command, host, session_id,
+		command_id=request.command_id, deadline=request.deadline, kill_signal=request.kill_signal
+	)
+
+async def _execute_single(request: "SSHCommandRequest", timer: PhaseTimer) -> Dict[str, Any]:
+	"""단일 명령 실행 (로컬 실행 대상 호스트면 SSH 없이 이벤트 루프에서, 아니면 스레드 풀에서 ssh 프로세스로)"""
+	running = _running_command(request, request.host)
+	if is_local_target(request.host, request.username, request.port):
+		return await ssh_executor.execute_local_command(request.host, request.command, request.timeout, timer, running)
+	_check_host(request.host, request.port, request.username)
+	return await _run_blocking(
+		timer,
+		ssh_executor.execute_remote_command,
+		host=request.host,
+		command=request.command,
+		port=request.port,
+		username=request.username,
+		timeout=request.timeout,
+		use_master_key=request.use_master_key,
+		timer=timer,
+		running=running
+	)
+
+def _session_host(session_id: str) -> str:
+	session = ssh_executor.sessions.get(session_id) if ssh_executor else None
+	return session.host if session else ""
+
+def _set_server_timing(response: Response, timings: Optional[Dict[str, float]]):
+	"""응답에 Server-Timing 헤더 설정"""
+	if timings:
+		response.headers["Server-Timing"] = format_server_timing(timings)
+
+LIVE_SESSIONS.set_function(_count_sessions)
+LIVE_SHELLS.set_function(lambda: _count_sessions(lambda session: session.shell_mode))
+POOLED_TRANSPORTS.set_function(lambda: _count_sessions(_has_active_transport))
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
 	"""앱 수명 주기 관리"""
@@ -1184,6 +2339,7 @@ app_ssh = FastAPI(
 	version="2.1.0",
 	lifespan=lifespan
 )
+app_ssh.middleware("http")(request_log_context)
 
 # 라우트 정의
 @app_ssh.get("/")
@@ -1197,8 +2353,13 @@ async def root():
 		"active_sessions": len(ssh_executor.sessions) if ssh_executor else 0
 	}
 
+@app_ssh.get("/metrics")
+async def metrics():
+	"""Prometheus 메트릭 노출"""
+	return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE_LATEST)
+
 @app_ssh.post("/execute", response_model=SSHCommandResponse)
-async def execute_command(request: SSHCommandRequest):
+async def execute_command(request: SSHCommandRequest, response: Response, idempotency_key: Optional[str] = Header(None)):
 	"""
 	원격 서버에서 명령어 실행 (단일 실행)
 	
@@ -1216,15 +2377,13 @@ async def execute_command(request: SSHCommandRequest):
 	if not ssh_executor:
 		raise HTTPException(status_code=500, detail="SSH Executor가 초기화되지 않았습니다")
 	
-	# 명령어 실행
-	result = ssh_executor.execute_remote_command(
-		host=request.host,
-		command=request.command,
-		port=request.port,
-		username=request.username,
-		timeout=request.timeout,
-		use_master_key=request.use_master_key
+	# 명령어 실행 (같은 Idempotency-Key 재요청이면 이전 결과 사용)
+	timer = PhaseTimer()
+	result = await _run_idempotent(
+		idempotency_key, "execute", "execute", request.model_dump(), response,
+		lambda: _execute_single(request, timer)
 	)
+	_set_server_timing(response, result.get("timings"))
 	
 	# 보안상 차단된 경우 403 Forbidden 반환
 	if result.get("security_blocked", False):
@@ -1239,14 +2398,18 @@ async def execute_command(request: SSHCommandRequest):
 		)
 	
 	# 응답 생성
-	response = SSHCommandResponse(
+	command_response = SSHCommandResponse(
 		success=result["success"],
 		stdout=result["stdout"],
 		stderr=result["stderr"],
 		exit_code=result["exit_code"],
 		error=result["error"],
 		host=request.host,
-		command=request.command
+		command=request.command,
+		timings=result.get("timings"),
+		command_id=result.get("command_id"),
+		timed_out=result.get("timed_out", False),
+		cancelled=result.get("cancelled", False)
 	)
 	
 	# 로그 기록
@@ -1255,7 +2418,116 @@ async def execute_command(request: SSHCommandRequest):
 	else:
 		logger.error(f"명령어 실행 실패: {request.host} - {request.command}")
 	
-	return response
+	return command_response
+
+# 스트리밍 실행에서 아직 보내지 못한 출력 조각 최대 수 (넘으면 프로세스 출력 읽기를 멈춤)
+STREAM_QUEUE_SIZE = 64
+
+def _ndjson(event: Dict[str, Any]) -> bytes:
+	return (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
+
+@app_ssh.post("/execute/stream")
+async def execute_command_stream(request: SSHCommandRequest, http_request: Request):
+	"""
+	명령어 출력을 나오는 대로 NDJSON으로 전송 (요청 형식은 /execute와 같음)
+	한 줄에 이벤트 하나: {"type": "start"} → {"type": "stdout"|"stderr", "data": ...} 반복 → {"type": "exit", ...}
+	로컬 실행 대상 호스트는 SSH 없이 실행하고, 그 외에는 ssh 프로세스 출력을 같은 방식으로 전달
+	클라이언트가 연결을 끊으면 명령도 취소된다
+	"""
+	if not ssh_executor:
+		raise HTTPException(status_code=500, detail="SSH Executor가 초기화되지 않았습니다")
+	
+	blocked = _blocked_result(request.command, f"stream_{request.host}")
+	if blocked:
+		raise HTTPException(
+			status_code=403,
+			detail={
+				"message": "보안상 위험한 명령어가 차단되었습니다",
+				"reason": blocked["security_reason"],
+				"command": request.command,
+				"blocked": True
+			}
+		)
+	
+	local = is_local_target(request.host, request.username, request.port)
+	if not local:
+		_check_host(request.host, request.port, request.username)
+	running = _running_command(request, request.host)
+	argv = ssh_executor.command_argv(
+		request.host, request.command, request.port, request.username, request.timeout, request.use_master_key,
+		running.kill_signal
+	)
+	queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+	# 클라이언트가 끝까지 읽지 않고 연결을 끊으면 True (이후 출력은 버림)
+	abandoned = False
+	
+	async def output(name: str, data: bytes):
+		if not abandoned:
+			await queue.put((name, data))
+	
+	async def produce():
+		timer = PhaseTimer()
+		try:
+			with running_commands.track(running):
+				with PHASE_SECONDS.time("exec"), timer.phase("exec"):
+					result = await run_process(argv, request.timeout, running, output, remote_kill=not local and bool(running.kill_signal))
+			if not local and not result.get("timed_out") and not result.get("cancelled"):
+				_record_ssh_exit(request.host, request.port, request.username, result["exit_code"], result["stderr"])
+		except Exception as e:
+			logger.error(f"스트리밍 명령어 실행 오류: {request.host} - {str(e)}")
+			result = {"success": False, "exit_code": -1, "error": f"명령어 실행 오류: {str(e)}"}
+		result["timings"] = timer.as_dict()
+		HOST_LATENCY.add(request.host, result["timings"])
+		if not abandoned:
+			await queue.put(("exit", result))
+	
+	async def events():
+		nonlocal abandoned
+		decoders = {name: codecs.getincrementaldecoder("utf-8")(errors="replace") for name in ("stdout", "stderr")}
+		task = asyncio.ensure_future(produce())
+		try:
+			yield _ndjson({"type": "start", "command_id": running.command_id, "host": request.host, "local": local})
+			checked_at = time.monotonic()
+			while True:
+				try:
+					name, data = await asyncio.wait_for(queue.get(), CANCEL_POLL_INTERVAL)
+				except asyncio.TimeoutError:
+					name, data = None, None
+				# 서버에 따라 끊긴 연결로 보내도 오류가 나지 않으므로 주기적으로 직접 확인
+				if time.monotonic() - checked_at >= CANCEL_POLL_INTERVAL:
+					checked_at = time.monotonic()
+					if await http_request.is_disconnected():
+						logger.info(f"스트리밍 클라이언트 연결 종료로 명령 취소: {running.command_id}")
+						return
+				if name is None:
+					continue
+				if name == "exit":
+					break
+				text = decoders[name].decode(data)
+				if text:
+					yield _ndjson({"type": name, "data": text})
+			for name, decoder in decoders.items():
+				text = decoder.decode(b"", final=True)
+				if text:
+					yield _ndjson({"type": name, "data": text})
+			yield _ndjson({
+				"type": "exit",
+				"command_id": running.command_id,
+				"success": data["success"],
+				"exit_code": data["exit_code"],
+				"error": data.get("error"),
+				"timed_out": data.get("timed_out", False),
+				"cancelled": data.get("cancelled", False),
+				"timings": data.get("timings")
+			})
+		finally:
+			if not task.done():
+				# 끝까지 읽지 않고 연결이 끊긴 경우: 명령을 취소하고 남은 출력은 버림
+				# (출력 전달을 기다리던 읽기는 run_process가 KILL_GRACE 후 정리)
+				abandoned = True
+				running.cancelled.set()
+	
+	return StreamingResponse(events(), media_type="application/x-ndjson")
 
 @app_ssh.post("/session/create", response_model=SSHSessionResponse)
 async def create_session(request: SSHSessionRequest):
@@ -1275,21 +2547,26 @@ async def create_session(request: SSHSessionRequest):
 	if not ssh_executor:
 		raise HTTPException(status_code=500, detail="SSH Executor가 초기화되지 않았습니다")
 	
+	_check_host(request.host, request.port, request.username)
 	try:
-		session_id = ssh_executor.create_session(
+		session_id = await _run_blocking(
+			None,
+			ssh_executor.create_session,
 			host=request.host,
 			port=request.port,
 			username=request.username,
 			timeout=request.timeout,
-			use_master_key=request.use_master_key
+			use_master_key=request.use_master_key,
+			helper=SESSION_HELPER if request.helper is None else request.helper
 		)
 		
+		session = ssh_executor.sessions.get(session_id)
 		return SSHSessionResponse(
 			session_id=session_id,
 			host=request.host,
 			username=request.username,
 			success=True,
-			message="세션이 성공적으로 생성되었습니다"
+			message="세션이 성공적으로 생성되었습니다" + (" (원격 도우미 모드)" if session and session.helper else "")
 		)
 	except Exception as e:
 		return SSHSessionResponse(
@@ -1301,7 +2578,12 @@ async def create_session(request: SSHSessionRequest):
 		)
 
 @app_ssh.post("/session/{session_id}/execute", response_model=SSHCommandInSessionResponse)
-async def execute_in_session(session_id: str, request: SSHCommandInSessionRequest):
+async def execute_in_session(
+	session_id: str,
+	request: SSHCommandInSessionRequest,
+	response: Response,
+	idempotency_key: Optional[str] = Header(None)
+):
 	"""
 	세션 내에서 명령어 실행
 	
@@ -1316,11 +2598,20 @@ async def execute_in_session(session_id: str, request: SSHCommandInSessionReques
 	if not ssh_executor:
 		raise HTTPException(status_code=500, detail="SSH Executor가 초기화되지 않았습니다")
 	
-	result = ssh_executor.execute_in_session(
-		session_id=session_id,
-		command=request.command,
-		timeout=request.timeout
+	timer = PhaseTimer()
+	result = await _run_idempotent(
+		idempotency_key, "execute_in_session", f"session/{session_id}/execute", request.model_dump(), response,
+		lambda: _run_blocking(
+			timer,
+			ssh_executor.execute_in_session,
+			session_id=session_id,
+			command=request.command,
+			timeout=request.timeout,
+			timer=timer,
+			running=_running_command(request, _session_host(session_id), session_id)
+		)
 	)
+	_set_server_timing(response, result.get("timings"))
 	
 	# 보안상 차단된 경우 403 Forbidden 반환
 	if result.get("security_blocked", False):
@@ -1342,9 +2633,192 @@ async def execute_in_session(session_id: str, request: SSHCommandInSessionReques
 		stderr=result["stderr"],
 		exit_code=result["exit_code"],
 		error=result["error"],
-		command=request.command
+		command=request.command,
+		timings=result.get("timings"),
+		command_id=result.get("command_id"),
+		timed_out=result.get("timed_out", False),
+		cancelled=result.get("cancelled", False)
+	)
+
+@app_ssh.post("/session/{session_id}/execute-many")
+async def execute_many_in_session(
+	session_id: str,
+	request: SSHCommandsInSessionRequest,
+	response: Response,
+	idempotency_key: Optional[str] = Header(None)
+):
+	"""
+	세션에서 서로 독립적인 명령어 여러 개를 각각 exec 채널로 동시에 실행 (SESSION_MAX_CHANNELS개씩)
+	결과는 요청 순서대로 반환하며, 보안상 차단된 명령은 해당 항목만 실패로 반환
+	대기 중인 명령도 /commands에 보이고 /session/{id}/cancel로 함께 취소된다
+	
+	예제:
+	```json
+	{
+		"commands": [
+			{"command": "uptime"},
+			{"command": "df -h", "timeout": 10}
+		]
+	}
+	```
+	"""
+	if not ssh_executor:
+		raise HTTPException(status_code=500, detail="SSH Executor가 초기화되지 않았습니다")
+	
+	session = ssh_executor.sessions.get(session_id)
+	if session is None:
+		raise HTTPException(status_code=404, detail="세션을 찾을 수 없습니다")
+	
+	command_ids = [item.command_id for item in request.commands if item.command_id]
+	if len(set(command_ids)) != len(command_ids):
+		raise HTTPException(status_code=400, detail="command_id가 중복되었습니다")
+	
+	timer = PhaseTimer()
+	
+	async def run_all() -> List[Dict[str, Any]]:
+		runnings = [_running_command(item, session.host, session_id) for item in request.commands]
+		# 채널 자리를 기다리는 명령이 스레드 풀을 차지하지 않도록 세션 채널 수만큼만 스레드로 보냄
+		slots = asyncio.Semaphore(SESSION_MAX_CHANNELS)
+		
+		async def run_one(item: SSHCommandInSessionRequest, running: RunningCommand) -> Dict[str, Any]:
+			async with slots:
+				item_timer = PhaseTimer()
+				return await _run_blocking(item_timer, session.execute_command, item.command, item.timeout, item_timer, running)
+		
+		with ExitStack() as stack:
+			for running in runnings:
+				stack.enter_context(running_commands.track(running))
+			return await asyncio.gather(*(run_one(item, running) for item, running in zip(request.commands, runnings)))
+	
+	results = await _run_idempotent(
+		idempotency_key, "execute_many_in_session", f"session/{session_id}/execute-many", request.model_dump(), response, run_all
+	)
+	_set_server_timing(response, timer.as_dict())
+	
+	return {
+		"session_id": session_id,
+		"results": [
+			SSHCommandInSessionResponse(
+				session_id=session_id,
+				success=result["success"],
+				stdout=result["stdout"],
+				stderr=result["stderr"],
+				exit_code=result["exit_code"],
+				error=result["error"],
+				command=item.command,
+				timings=result.get("timings"),
+				command_id=result.get("command_id"),
+				timed_out=result.get("timed_out", False),
+				cancelled=result.get("cancelled", False)
+			)
+			for item, result in zip(request.commands, results)
+		],
+		"total": len(results)
+	}
+
+@app_ssh.post("/session/{session_id}/script", response_model=ScriptResponse)
+async def run_session_script(
+	session_id: str,
+	request: ScriptRequest,
+	response: Response,
+	idempotency_key: Optional[str] = Header(None)
+):
+	"""
+	세션에서 여러 단계를 exec 채널 하나로 차례로 실행하고 단계별 stdout/stderr/종료 코드/실행 시간 반환
+	실행 전에 모든 단계를 보안 검사하며, 하나라도 위험하면 아무것도 실행하지 않고 403
+	
+	예제:
+	```json
+	{
+		"steps": ["cd /var/log", "ls -la", "tail -n 20 syslog"],
+		"stop_on_error": true
+	}
+	```
+	"""
+	if not ssh_executor:
+		raise HTTPException(status_code=500, detail="SSH Executor가 초기화되지 않았습니다")
+	
+	session = ssh_executor.sessions.get(session_id)
+	if session is None:
+		raise HTTPException(status_code=404, detail="세션을 찾을 수 없습니다")
+	if any(not step.strip() for step in request.steps):
+		raise HTTPException(status_code=400, detail="빈 단계가 있습니다")
+	
+	timer = PhaseTimer()
+	result = await _run_idempotent(
+		idempotency_key, "run_session_script", f"session/{session_id}/script", request.model_dump(), response,
+		lambda: _run_blocking(
+			timer,
+			session.run_script,
+			request.steps,
+			request.stop_on_error,
+			request.timeout,
+			timer,
+			_running_command(request, session.host, session_id, command="\n".join(request.steps))
+		)
+	)
+	_set_server_timing(response, result.get("timings"))
+	
+	if result.get("security_blocked", False):
+		raise HTTPException(
+			status_code=403,
+			detail={
+				"message": "보안상 위험한 명령어가 차단되었습니다",
+				"reason": result.get("security_reason", "알 수 없는 보안 위험"),
+				"command": request.steps[result["blocked_step"]],
+				"step": result["blocked_step"],
+				"session_id": session_id,
+				"blocked": True
+			}
+		)
+	
+	return ScriptResponse(
+		session_id=session_id,
+		success=result["success"],
+		steps=result["steps"],
+		completed=result.get("completed", 0),
+		total=len(request.steps),
+		stdout=result["stdout"],
+		stderr=result["stderr"],
+		exit_code=result["exit_code"],
+		error=result["error"],
+		timings=result.get("timings"),
+		command_id=result.get("command_id"),
+		timed_out=result.get("timed_out", False),
+		cancelled=result.get("cancelled", False)
 	)
 
+@app_ssh.get("/commands")
+async def list_running_commands():
+	"""실행 중(세션 채널 대기 포함)인 명령 목록"""
+	return {"commands": running_commands.list()}
+
+@app_ssh.post("/commands/{command_id}/cancel")
+async def cancel_command(command_id: str):
+	"""
+	실행 중인 명령 취소
+	실행 중인 요청은 채널을 닫고(원격 프로세스에는 kill_signal 전송) 그때까지의 출력과 cancelled=true로 응답한다
+	"""
+	if not running_commands.cancel(command_id):
+		raise HTTPException(status_code=404, detail="실행 중인 명령을 찾을 수 없습니다")
+	logger.info(f"명령 취소 요청: {command_id}")
+	return {"command_id": command_id, "cancelled": True}
+
+@app_ssh.post("/session/{session_id}/cancel")
+async def cancel_session_commands(session_id: str):
+	"""세션에서 실행 중이거나 대기 중인 명령을 모두 취소 (대화형 쉘이면 Ctrl+C 전송)"""
+	if not ssh_executor:
+		raise HTTPException(status_code=500, detail="SSH Executor가 초기화되지 않았습니다")
+	
+	session = ssh_executor.sessions.get(session_id)
+	if session is None:
+		raise HTTPException(status_code=404, detail="세션을 찾을 수 없습니다")
+	
+	cancelled = running_commands.cancel_session(session_id)
+	interrupted = await run_in_threadpool(session.interrupt_shell)
+	logger.info(f"세션 명령 취소: {session_id} ({cancelled}개, 쉘 인터럽트: {interrupted})")
+	return {"session_id": session_id, "cancelled": cancelled, "shell_interrupted": interrupted}
+
 @app_ssh.delete("/session_delete/{session_id}")
 async def close_session(session_id: str):
 	"""SSH 세션 종료"""
@@ -1357,24 +2831,68 @@ async def close_session(session_id: str):
 	else:
 		raise HTTPException(status_code=404, detail="세션을 찾을 수 없습니다")
 
+# long-poll 최대 대기 시간 (초)
+MAX_POLL_WAIT = 60.0
+
+def _not_modified(etag: str) -> Response:
+	return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+	if not if_none_match:
+		return False
+	return etag in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+
 @app_ssh.get("/session/{session_id}", response_model=SSHSessionInfoResponse)
-async def get_session_info(session_id: str):
-	"""세션 정보 조회"""
+async def get_session_info(session_id: str, response: Response, wait: float = 0, if_none_match: Optional[str] = Header(None)):
+	"""
+	세션 정보 조회
+	If-None-Match가 현재 ETag와 같으면 304, wait(초)를 주면 세션이 바뀔 때까지 기다렸다가 응답 (long-poll)
+	"""
 	if not ssh_executor:
 		raise HTTPException(status_code=500, detail="SSH Executor가 초기화되지 않았습니다")
 	
+	session = ssh_executor.sessions.get(session_id)
+	if session is None:
+		raise HTTPException(status_code=404, detail="세션을 찾을 수 없습니다")
+	
+	if _etag_matches(if_none_match, session.etag):
+		if wait <= 0:
+			return _not_modified(session.etag)
+		changed = await session_changes.wait(
+			session_id, lambda: not _etag_matches(if_none_match, session.etag), min(wait, MAX_POLL_WAIT)
+		)
+		if not changed:
+			return _not_modified(session.etag)
+	
 	session_info = ssh_executor.get_session_info(session_id)
-	if session_info:
-		return SSHSessionInfoResponse(**session_info)
-	else:
+	if not session_info:
 		raise HTTPException(status_code=404, detail="세션을 찾을 수 없습니다")
+	response.headers["ETag"] = f'"{BOOT_ID}-{session_id}-{session_info["version"]}"'
+	response.headers["Cache-Control"] = "no-cache"
+	return SSHSessionInfoResponse(**session_info)
 
 @app_ssh.get("/sessions")
-async def list_sessions():
-	"""활성 세션 목록 조회"""
+async def list_sessions(response: Response, wait: float = 0, if_none_match: Optional[str] = Header(None)):
+	"""활성 세션 목록 조회 (ETag/If-None-Match, wait long-poll은 /session/{id}와 같음)"""
 	if not ssh_executor:
 		raise HTTPException(status_code=500, detail="SSH Executor가 초기화되지 않았습니다")
 	
+	def current_etag() -> str:
+		return f'"{BOOT_ID}-sessions-{session_changes.version}"'
+	
+	etag = current_etag()
+	if _etag_matches(if_none_match, etag):
+		if wait <= 0:
+			return _not_modified(etag)
+		changed = await session_changes.wait(
+			SessionChanges.ALL, lambda: current_etag() != etag, min(wait, MAX_POLL_WAIT)
+		)
+		if not changed:
+			return _not_modified(etag)
+	
+	# 목록을 만드는 동안 바뀐 변경은 다음 요청에서 받도록 목록보다 먼저 버전을 읽음
+	response.headers["ETag"] = current_etag()
+	response.headers["Cache-Control"] = "no-cache"
 	return {"sessions": ssh_executor.list_sessions()}
 
 @app_ssh.post("/execute-batch")
@@ -1387,14 +2905,14 @@ async def execute_batch_commands(requests: List[SSHCommandRequest]):
 	
 	results = []
 	for req in requests:
-		result = ssh_executor.execute_remote_command(
-			host=req.host,
-			command=req.command,
-			port=req.port,
-			username=req.username,
-			timeout=req.timeout,
-			use_master_key=req.use_master_key
-		)
+		timer = PhaseTimer()
+		try:
+			result = await _execute_single(req, timer)
+		except HTTPException as e:
+			if e.status_code != 503:
+				raise
+			# 회로가 열린 호스트는 해당 항목만 바로 실패 처리
+			result = {"success": False, "stdout": None, "stderr": None, "exit_code": -1, "error": e.detail["message"], "circuit_open": True}
 		
 		results.append(SSHCommandResponse(
 			success=result["success"],
@@ -1403,29 +2921,58 @@ async def execute_batch_commands(requests: List[SSHCommandRequest]):
 			exit_code=result["exit_code"],
 			error=result["error"],
 			host=req.host,
-			command=req.command
+			command=req.command,
+			timings=result.get("timings"),
+			command_id=result.get("command_id"),
+			timed_out=result.get("timed_out", False),
+			cancelled=result.get("cancelled", False),
+			circuit_open=result.get("circuit_open", False)
 		))
 	
 	return {"results": results, "total": len(results)}
 
+@app_ssh.get("/stats/hosts")
+async def get_host_stats():
+	"""
+	호스트별 단계별 지연 시간 백분위수 (밀리초, 최근 500건 기준)
+	adaptive_timeouts: host:port별 연결/쉘 출력 지연 시간과 현재 적용되는 타임아웃 (연결은 timeout 30초 요청 기준)
+	"""
+	return {
+		"hosts": HOST_LATENCY.summary(),
+		"window_size": HOST_LATENCY.size,
+		"adaptive_timeouts": host_timeouts.summary(shell_default=SHELL_READ_WAIT),
+		"adaptive_enabled": host_timeouts.enabled
+	}
+
+# 서버 목록을 만들 때 반영한 서킷 브레이커 상태 버전
+_server_list_breaker_version = -1
+
+def _build_server_list() -> Dict[str, Any]:
+	global _server_list_breaker_version
+	_server_list_breaker_version = host_breaker.version
+	data = load_servers_file()
+	if data is None:
+		# 파일이 없으면 기본 서버 목록 반환
+		data = {"servers": [{"name": "localhost", "host": "localhost", "port": 22, "description": "로컬 서버"}]}
+	# 서버별 서킷 브레이커 상태 (목록에 없는 호스트 상태는 circuits에 포함)
+	servers = [
+		{**server, "circuit": host_breaker.state(_host_key(server.get("host", ""), server.get("port", 22)))}
+		for server in data.get("servers", [])
+	]
+	return {**data, "servers": servers, "circuits": host_breaker.states()}
+
+# servers.json은 mtime/크기가 바뀌거나 서킷 브레이커 상태가 바뀔 때만 다시 생성
+server_list_cache = CachedSnapshot(_build_server_list, ttl=0, watch=[SERVERS_FILE])
+
 @app_ssh.get("/servers")
-async def list_servers():
+async def list_servers(request: Request):
 	"""
-	설정된 서버 목록 반환
+	설정된 서버 목록 반환 (변경이 없으면 304)
 	"""
 	try:
-		# servers.json 파일에서 서버 목록 읽기
-		servers_file = Path(__file__).parent.parent / "servers.json"
-		if servers_file.exists():
-			with open(servers_file, 'r', encoding='utf-8') as f:
-				data = json.load(f)
-				return {"servers": data.get("servers", []), "default_settings": data.get("default_settings", {})}
-		else:
-			# 파일이 없으면 기본 서버 목록 반환
-			servers = [
-				{"name": "localhost", "host": "localhost", "port": 22, "description": "로컬 서버"},
-			]
-			return {"servers": servers}
+		if _server_list_breaker_version != host_breaker.version:
+			server_list_cache.invalidate()
+		return etag_response(request, server_list_cache.get())
 	except Exception as e:
 		logger.error(f"서버 목록 로드 오류: {str(e)}")
 		return {"servers": [], "error": str(e)}
@@ -1441,12 +2988,17 @@ async def start_interactive_shell(session_id: str):
 	
 	session = ssh_executor.sessions[session_id]
 	
-	result = session.start_interactive_shell()
+	result = await _run_blocking(None, session.start_interactive_shell)
 	
 	return result
 
 @app_ssh.post("/session/{session_id}/shell/command", response_model=ShellCommandResponse)
-async def send_shell_command(session_id: str, request: ShellCommandRequest):
+async def send_shell_command(
+	session_id: str,
+	request: ShellCommandRequest,
+	response: Response,
+	idempotency_key: Optional[str] = Header(None)
+):
 	"""대화형 쉘에서 명령어 실행"""
 	if not ssh_executor:
 		raise HTTPException(status_code=500, detail="SSH Executor가 초기화되지 않았습니다")
@@ -1455,7 +3007,12 @@ async def send_shell_command(session_id: str, request: ShellCommandRequest):
 		raise HTTPException(status_code=404, detail="세션을 찾을 수 없습니다")
 	
 	session = ssh_executor.sessions[session_id]
-	result = session.send_shell_command(request.command)
+	timer = PhaseTimer()
+	result = await _run_idempotent(
+		idempotency_key, "shell_command", f"session/{session_id}/shell/command", request.model_dump(), response,
+		lambda: _run_blocking(timer, session.send_shell_command, request.command, timer)
+	)
+	_set_server_timing(response, result.get("timings"))
 	
 	# 보안상 차단된 경우 403 Forbidden 반환
 	if result.get("security_blocked", False):
@@ -1476,7 +3033,8 @@ async def send_shell_command(session_id: str, request: ShellCommandRequest):
 		output=result.get("output"),
 		prompt=result.get("prompt"),
 		error=result.get("error"),
-		command=request.command
+		command=request.command,
+		timings=result.get("timings")
 	)
 
 @app_ssh.post("/session/{session_id}/shell/stop")
@@ -1489,7 +3047,7 @@ async def stop_interactive_shell(session_id: str):
 		raise HTTPException(status_code=404, detail="세션을 찾을 수 없습니다")
 	
 	session = ssh_executor.sessions[session_id]
-	success = session.stop_interactive_shell()
+	success = await _run_blocking(None, session.stop_interactive_shell)
 	
 	return {"success": success, "message": "대화형 쉘이 종료되었습니다" if success else "대화형 쉘 종료 실패"}
 
@@ -0,0 +1,116 @@
+"""
+여러 단계 스크립트 구성과 단계별 결과 분리
+단계들을 sh 스크립트 하나로 묶어 exec 채널 하나에서 실행하고,
+단계 앞뒤에 실행마다 새로 만든 토큰이 들어간 구분 줄을 stdout/stderr에 출력해
+받은 출력을 단계별 stdout, stderr, 종료 코드, 실행 시간으로 나눈다
+
+구분 줄 (앞뒤 줄바꿈은 구분자에 포함, 단계 출력에는 포함되지 않음):
+	stdout: "\n<토큰> begin <단계> <시각>\n" ... "\n<토큰> end <단계> <종료 코드> <시각>\n"
+	stderr: "\n<토큰> begin <단계>\n" ... "\n<토큰> end <단계>\n"
+시각은 원격 `date +%s%N` 값 (나노초를 지원하지 않는 date는 초 단위로 계산)
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# 단계 상태
+STEP_OK = "ok"
+STEP_FAILED = "failed"
+# 시작했지만 끝 구분자가 없는 단계 (타임아웃/취소, 단계 안에서 exit)
+STEP_INCOMPLETE = "incomplete"
+STEP_NOT_RUN = "not_run"
+
+_RC_VARIABLE = "__runmcp_rc"
+
+def build_script(steps: List[str], token: str, stop_on_error: bool = True) -> str:
+	"""
+	단계들을 하나의 sh 스크립트로 구성
+	단계는 현재 쉘에서 차례로 실행되므로 cd, 변수 설정은 다음 단계에도 적용된다
+	"""
+	lines = []
+	for index, step in enumerate(steps):
+		lines.append(f"printf '\\n%s %s\\n' '{token} begin {index}' \"$(date +%s%N 2>/dev/null)\"")
+		lines.append(f"printf '\\n%s\\n' '{token} begin {index}' >&2")
+		lines.append("{")
+		lines.append(step)
+		lines.append("}")
+		lines.append(f"{_RC_VARIABLE}=$?")
+		lines.append(f"printf '\\n%s %s %s\\n' '{token} end {index}' \"${_RC_VARIABLE}\" \"$(date +%s%N 2>/dev/null)\"")
+		lines.append(f"printf '\\n%s\\n' '{token} end {index}' >&2")
+		if stop_on_error:
+			lines.append(f"[ \"${_RC_VARIABLE}\" -eq 0 ] || exit \"${_RC_VARIABLE}\"")
+	return "\n".join(lines) + "\n"
+
+def _split_stream(text: str, token: str) -> Tuple[Dict[int, Dict[str, Any]], str]:
+	"""한 스트림을 단계별 출력과 구분자 밖 출력으로 분리"""
+	pattern = re.compile(r"\n" + re.escape(token) + r" (begin|end) (\d+)([^\n]*)\n")
+	frames: Dict[int, Dict[str, Any]] = {}
+	unframed = []
+	position = 0
+	current = None
+	for match in pattern.finditer(text):
+		kind, index, fields = match.group(1), int(match.group(2)), match.group(3).split()
+		if kind == "begin":
+			unframed.append(text[position:match.start()])
+			current = {"begin": fields, "end": None, "start": match.end()}
+			frames[index] = current
+		elif current is not None and frames.get(index) is current:
+			current["output"] = text[current["start"]:match.start()]
+			current["end"] = fields
+			current = None
+		position = match.end()
+	if current is not None:
+		current["output"] = text[current["start"]:]
+	else:
+		unframed.append(text[position:])
+	return frames, "".join(unframed)
+
+def _timestamp(value: str) -> Optional[float]:
+	"""`date +%s%N` 출력을 초로 변환 (%N을 지원하지 않으면 "1700000000N"처럼 출력됨)"""
+	if value.endswith("N"):
+		value = value[:-1]
+	if not value.isdigit():
+		return None
+	if len(value) > 10:
+		return int(value) / 1e9
+	return float(value)
+
+def _duration_ms(begin: List[str], end: List[str]) -> Optional[float]:
+	started = _timestamp(begin[0]) if begin else None
+	finished = _timestamp(end[1]) if len(end) > 1 else None
+	if started is None or finished is None:
+		return None
+	return round(max(0.0, finished - started) * 1000.0, 2)
+
+def parse_script_output(stdout: str, stderr: str, token: str, steps: List[str]) -> Tuple[List[Dict[str, Any]], str, str]:
+	"""
+	스크립트 출력을 단계별 결과로 분리
+	반환: (단계별 결과, 구분자 밖 stdout, 구분자 밖 stderr - sh 문법 오류 등)
+	"""
+	stdout_frames, extra_stdout = _split_stream(stdout or "", token)
+	stderr_frames, extra_stderr = _split_stream(stderr or "", token)
+	results = []
+	for index, command in enumerate(steps):
+		frame = stdout_frames.get(index)
+		error_frame = stderr_frames.get(index)
+		result = {
+			"index": index,
+			"command": command,
+			"status": STEP_NOT_RUN,
+			"exit_code": None,
+			"stdout": "",
+			"stderr": error_frame["output"] if error_frame else "",
+			"duration_ms": None
+		}
+		if frame is not None:
+			result["stdout"] = frame["output"]
+			end = frame["end"]
+			if end is None:
+				result["status"] = STEP_INCOMPLETE
+			else:
+				exit_code = int(end[0]) if end and end[0].isdigit() else None
+				result["exit_code"] = exit_code
+				result["status"] = STEP_OK if exit_code == 0 else STEP_FAILED
+				result["duration_ms"] = _duration_ms(frame["begin"], end)
+		results.append(result)
+	return results, extra_stdout, extra_stderr
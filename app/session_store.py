@@ -0,0 +1,304 @@
+"""
+웹 로그인 세션 저장소
+memory: 프로세스 내부 저장 (워커 1개용), sqlite: 같은 서버의 여러 uvicorn 워커가 파일 하나를 공유
+
+환경 변수:
+	SESSION_STORE            memory | sqlite (기본: memory)
+	SESSION_DB_PATH          sqlite 파일 경로 (기본: sessions.db)
+	SESSION_TIMEOUT_HOURS    마지막 접근 후 만료 시간 (기본: 24)
+	SESSION_MAX              memory 저장소 최대 세션 수, 넘으면 가장 오래 쓰지 않은 세션부터 제거 (기본: 10000)
+	SESSION_FLUSH_INTERVAL   sqlite 저장소의 last_accessed 지연 기록 주기 초 (기본: 5)
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 세션 데이터와 별도로 관리하는 시간 필드
+TIME_FIELDS = ("created_at", "last_accessed")
+
+class SessionStore(ABC):
+	"""세션 저장소 인터페이스 (세션 데이터의 created_at/last_accessed는 datetime)"""
+	# 호출이 파일/네트워크 I/O로 막힐 수 있으면 True (이벤트 루프에서는 스레드 풀로 호출)
+	blocking_io = False
+
+	def __init__(self, session_timeout: timedelta = timedelta(hours=24)):
+		self.session_timeout = session_timeout
+
+	@abstractmethod
+	def create_session(self, user_data: Dict) -> str:
+		...
+
+	@abstractmethod
+	def get_session(self, session_id: str) -> Optional[Dict]:
+		"""세션 데이터 조회 (만료됐으면 삭제 후 None, 조회 시 last_accessed 갱신)"""
+
+	@abstractmethod
+	def update_session(self, session_id: str, data: Dict) -> bool:
+		...
+
+	@abstractmethod
+	def delete_session(self, session_id: str) -> bool:
+		...
+
+	@abstractmethod
+	def cleanup_expired_sessions(self) -> int:
+		"""만료된 세션 삭제 후 삭제한 수 반환"""
+
+	@abstractmethod
+	def list_sessions(self) -> List[Tuple[str, Dict]]:
+		...
+
+	@abstractmethod
+	def count(self) -> int:
+		...
+
+	def close(self):
+		pass
+
+class MemorySessionStore(SessionStore):
+	"""
+	프로세스 내부 세션 저장소
+	모든 세션의 만료 시간이 같으므로 마지막 접근 순서로 정렬된 OrderedDict가 만료 큐 역할을 한다
+	(앞쪽부터 만료된 세션만 꺼내면 되므로 전체 스캔 없이 O(만료된 수))
+	"""
+	def __init__(self, session_timeout: timedelta = timedelta(hours=24), max_sessions: int = 10000):
+		super().__init__(session_timeout)
+		self.max_sessions = max_sessions
+		self.sessions: "OrderedDict[str, Dict]" = OrderedDict()
+		self._lock = threading.Lock()
+
+	def _expire(self, now: datetime) -> int:
+		expired = 0
+		while self.sessions:
+			session_id, data = next(iter(self.sessions.items()))
+			if now - data['last_accessed'] <= self.session_timeout:
+				break
+			del self.sessions[session_id]
+			expired += 1
+		return expired
+
+	def create_session(self, user_data: Dict) -> str:
+		session_id = str(uuid.uuid4())
+		now = datetime.now()
+		with self._lock:
+			self._expire(now)
+			# 최대 수를 넘으면 가장 오래 접근하지 않은 세션 제거
+			while len(self.sessions) >= self.max_sessions:
+				evicted_id, _ = self.sessions.popitem(last=False)
+				logger.warning(f"세션 저장소가 가득 차서 세션 제거: {evicted_id[:8]}...")
+			self.sessions[session_id] = {**user_data, 'created_at': now, 'last_accessed': now}
+		return session_id
+
+	def get_session(self, session_id: str) -> Optional[Dict]:
+		if not session_id:
+			return None
+		now = datetime.now()
+		with self._lock:
+			self._expire(now)
+			session_data = self.sessions.get(session_id)
+			if session_data is None:
+				return None
+			session_data['last_accessed'] = now
+			self.sessions.move_to_end(session_id)
+			return session_data
+
+	def update_session(self, session_id: str, data: Dict) -> bool:
+		with self._lock:
+			session_data = self.sessions.get(session_id)
+			if session_data is None:
+				return False
+			session_data.update(data)
+			session_data['last_accessed'] = datetime.now()
+			self.sessions.move_to_end(session_id)
+			return True
+
+	def delete_session(self, session_id: str) -> bool:
+		with self._lock:
+			return self.sessions.pop(session_id, None) is not None
+
+	def cleanup_expired_sessions(self) -> int:
+		with self._lock:
+			return self._expire(datetime.now())
+
+	def list_sessions(self) -> List[Tuple[str, Dict]]:
+		with self._lock:
+			return list(self.sessions.items())
+
+	def count(self) -> int:
+		return len(self.sessions)
+
+class SqliteSessionStore(SessionStore):
+	"""
+	SQLite 파일 세션 저장소 (WAL 모드, 여러 워커 프로세스가 공유)
+	조회할 때마다 쓰지 않도록 last_accessed 갱신은 모아 두었다가 백그라운드 스레드가 주기적으로 기록한다
+	"""
+	# 잠금 대기(busy timeout)가 있는 파일 I/O
+	blocking_io = True
+
+	def __init__(self, path: str, session_timeout: timedelta = timedelta(hours=24), flush_interval: float = 5.0):
+		super().__init__(session_timeout)
+		self.path = path
+		self.flush_interval = flush_interval
+		# 스레드별 연결 (sqlite 연결은 스레드 간 공유하지 않음)
+		self._local = threading.local()
+		# 아직 기록하지 않은 last_accessed (session_id -> epoch 초)
+		self._pending: Dict[str, float] = {}
+		self._pending_lock = threading.Lock()
+		self._stop = threading.Event()
+		with self._conn() as conn:
+			conn.execute("""
+				CREATE TABLE IF NOT EXISTS sessions (
+					id TEXT PRIMARY KEY,
+					data TEXT NOT NULL,
+					created_at REAL NOT NULL,
+					last_accessed REAL NOT NULL
+				)
+			""")
+			conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_last_accessed ON sessions (last_accessed)")
+		self._flusher = threading.Thread(target=self._flush_loop, name="session-flush", daemon=True)
+		self._flusher.start()
+
+	def _conn(self) -> sqlite3.Connection:
+		conn = getattr(self._local, "conn", None)
+		if conn is None:
+			conn = sqlite3.connect(self.path, timeout=5.0)
+			conn.execute("PRAGMA journal_mode=WAL")
+			conn.execute("PRAGMA synchronous=NORMAL")
+			self._local.conn = conn
+		return conn
+
+	def _cutoff(self) -> float:
+		return time.time() - self.session_timeout.total_seconds()
+
+	@staticmethod
+	def _to_session(row) -> Dict:
+		data, created_at, last_accessed = row
+		return {
+			**json.loads(data),
+			'created_at': datetime.fromtimestamp(created_at),
+			'last_accessed': datetime.fromtimestamp(last_accessed)
+		}
+
+	@staticmethod
+	def _dump(data: Dict) -> str:
+		return json.dumps({k: v for k, v in data.items() if k not in TIME_FIELDS}, ensure_ascii=False, default=str)
+
+	def create_session(self, user_data: Dict) -> str:
+		session_id = str(uuid.uuid4())
+		now = time.time()
+		with self._conn() as conn:
+			conn.execute(
+				"INSERT INTO sessions (id, data, created_at, last_accessed) VALUES (?, ?, ?, ?)",
+				(session_id, self._dump(user_data), now, now)
+			)
+		return session_id
+
+	def get_session(self, session_id: str) -> Optional[Dict]:
+		if not session_id:
+			return None
+		row = self._conn().execute(
+			"SELECT data, created_at, last_accessed FROM sessions WHERE id = ?", (session_id,)
+		).fetchone()
+		if row is None:
+			return None
+		now = time.time()
+		with self._pending_lock:
+			last_accessed = max(row[2], self._pending.get(session_id, 0.0))
+		if last_accessed < self._cutoff():
+			self.delete_session(session_id)
+			return None
+		with self._pending_lock:
+			self._pending[session_id] = now
+		return self._to_session((row[0], row[1], now))
+
+	def update_session(self, session_id: str, data: Dict) -> bool:
+		with self._conn() as conn:
+			row = conn.execute("SELECT data FROM sessions WHERE id = ?", (session_id,)).fetchone()
+			if row is None:
+				return False
+			merged = {**json.loads(row[0]), **data}
+			conn.execute(
+				"UPDATE sessions SET data = ?, last_accessed = ? WHERE id = ?",
+				(self._dump(merged), time.time(), session_id)
+			)
+		return True
+
+	def delete_session(self, session_id: str) -> bool:
+		with self._pending_lock:
+			self._pending.pop(session_id, None)
+		with self._conn() as conn:
+			return conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,)).rowcount > 0
+
+	def cleanup_expired_sessions(self) -> int:
+		# 최근 접근 기록을 먼저 반영해야 사용 중인 세션을 지우지 않음
+		self.flush()
+		with self._conn() as conn:
+			return conn.execute("DELETE FROM sessions WHERE last_accessed < ?", (self._cutoff(),)).rowcount
+
+	def list_sessions(self) -> List[Tuple[str, Dict]]:
+		self.flush()
+		rows = self._conn().execute(
+			"SELECT id, data, created_at, last_accessed FROM sessions WHERE last_accessed >= ? ORDER BY last_accessed",
+			(self._cutoff(),)
+		).fetchall()
+		return [(row[0], self._to_session(row[1:])) for row in rows]
+
+	def count(self) -> int:
+		return self._conn().execute("SELECT COUNT(*) FROM sessions WHERE last_accessed >= ?", (self._cutoff(),)).fetchone()[0]
+
+	def flush(self):
+		"""모아 둔 last_accessed 갱신을 한 트랜잭션으로 기록 (더 최근 값은 덮어쓰지 않음)"""
+		with self._pending_lock:
+			pending, self._pending = self._pending, {}
+		if not pending:
+			return
+		try:
+			with self._conn() as conn:
+				conn.executemany(
+					"UPDATE sessions SET last_accessed = MAX(last_accessed, ?) WHERE id = ?",
+					[(ts, session_id) for session_id, ts in pending.items()]
+				)
+		except sqlite3.Error as e:
+			logger.error(f"세션 접근 시간 기록 오류: {str(e)}")
+
+	def _flush_loop(self):
+		last_cleanup = time.monotonic()
+		while not self._stop.wait(self.flush_interval):
+			self.flush()
+			# 만료 세션 정리는 1분에 한 번 (워커마다 실행돼도 같은 DELETE라 안전)
+			if time.monotonic() - last_cleanup >= 60:
+				last_cleanup = time.monotonic()
+				try:
+					expired = self.cleanup_expired_sessions()
+					if expired:
+						logger.info(f"만료된 세션 {expired}개 정리")
+				except sqlite3.Error as e:
+					logger.error(f"세션 정리 오류: {str(e)}")
+
+	def close(self):
+		self._stop.set()
+		self._flusher.join(timeout=self.flush_interval + 1)
+		self.flush()
+
+def create_session_store() -> SessionStore:
+	"""환경 변수 설정에 따라 세션 저장소 생성"""
+	kind = os.environ.get("SESSION_STORE", "memory")
+	timeout = timedelta(hours=float(os.environ.get("SESSION_TIMEOUT_HOURS", "24")))
+	if kind == "sqlite":
+		path = os.environ.get("SESSION_DB_PATH", "sessions.db")
+		logger.info(f"SQLite 세션 저장소 사용: {path}")
+		return SqliteSessionStore(path, timeout, float(os.environ.get("SESSION_FLUSH_INTERVAL", "5")))
+	if kind != "memory":
+		raise ValueError(f"알 수 없는 SESSION_STORE: {kind}")
+	return MemorySessionStore(timeout, int(os.environ.get("SESSION_MAX", "10000")))
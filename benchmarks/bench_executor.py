@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+SSH Executor 엔드투엔드 벤치마크
+가짜 sshd(fake_sshd.py)를 띄우고 /execute, /execute-batch, 세션 실행, 대화형 쉘을
+여러 동시성 수준으로 호출한 뒤 처리량, p50/p99 지연, RSS를 JSON으로 출력한다
+
+사용 예:
+    python benchmarks/bench_executor.py --concurrency 1,4,16 --requests 100 --output bench.json
+    python benchmarks/bench_executor.py --scenarios session --latency 0.05 --net-delay 0.01
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+import paramiko
+
+from fake_sshd import FakeSSHConfig, FakeSSHServer
+
+APP_DIR = Path(__file__).resolve().parent.parent / "app"
+
+SCENARIOS = ("execute", "batch", "session", "shell")
+
+def current_rss_mb() -> float:
+    """현재 프로세스 RSS (MB)"""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    # /proc이 없는 환경에서는 최대 RSS로 대체 (macOS는 바이트 단위)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+def percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[index]
+
+def create_client_key(directory: Path) -> Path:
+    """벤치마크 전용 임시 SSH 키 생성"""
+    key_path = directory / "bench_key"
+    paramiko.RSAKey.generate(2048).write_private_key_file(str(key_path))
+    os.chmod(key_path, 0o600)
+    return key_path
+
+@asynccontextmanager
+async def executor_client(base_url: Optional[str], key_path: Path, timeout: float):
+    """executor API 클라이언트 (base_url이 없으면 같은 프로세스에서 executor를 띄움)"""
+    if base_url:
+        # 이미 실행 중인 executor를 대상으로 측정 (executor가 같은 호스트에 있어야 가짜 sshd에 접속 가능)
+        async with httpx.AsyncClient(base_url=base_url, timeout=timeout) as client:
+            yield client
+        return
+
+    sys.path.insert(0, str(APP_DIR))
+    # import 시 설정되는 로그 파일이 저장소의 runmcp_ssh.log에 쌓이지 않도록 벤치마크 임시 디렉터리에 기록
+    os.environ.setdefault("LOG_DIR", str(key_path.parent))
+    import runmcp_ssh_executor as executor_module
+    executor_module.SSH_KEY_PATH = key_path
+    app = executor_module.app_ssh
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://executor", timeout=timeout) as client:
+            yield client
+
+async def run_load(
+    name: str,
+    concurrency: int,
+    total: int,
+    make_request: Callable[[int, int], Awaitable[bool]]
+) -> Dict[str, Any]:
+    """동시성 수준별 부하 실행 (worker 번호를 넘겨 세션을 고정할 수 있게 함)"""
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+    rss_before = current_rss_mb()
+
+    async def worker(worker_id: int):
+        nonlocal errors
+        for index in counter:
+            start = time.perf_counter()
+            try:
+                ok = await make_request(worker_id, index)
+            except Exception:
+                ok = False
+            latencies.append((time.perf_counter() - start) * 1000.0)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    duration = time.perf_counter() - started
+    ordered = sorted(latencies)
+
+    return {
+        "scenario": name,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "duration_s": round(duration, 4),
+        "throughput_rps": round(len(latencies) / duration, 2) if duration > 0 else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(ordered, 0.50), 2),
+            "p99": round(percentile(ordered, 0.99), 2),
+            "mean": round(sum(ordered) / len(ordered), 2) if ordered else 0.0,
+            "max": round(ordered[-1], 2) if ordered else 0.0
+        },
+        "rss_mb": {
+            "before": round(rss_before, 1),
+            "after": round(current_rss_mb(), 1)
+        }
+    }
+
+class ExecutorBench:
+    """executor API를 대상으로 시나리오별 부하를 생성"""
+    def __init__(self, client: httpx.AsyncClient, ssh_port: int, batch_size: int):
+        self.client = client
+        self.target = {"host": "127.0.0.1", "port": ssh_port, "username": "bench"}
+        self.batch_size = batch_size
+
+    async def _create_sessions(self, count: int, shell: bool) -> List[str]:
+        session_ids = []
+        for _ in range(count):
+            response = await self.client.post("/session/create", json=self.target)
+            data = response.json()
+            if not data.get("success"):
+                raise RuntimeError(f"세션 생성 실패: {data.get('message')}")
+            session_ids.append(data["session_id"])
+            if shell:
+                started = await self.client.post(f"/session/{data['session_id']}/shell/start")
+                if not started.json().get("success"):
+                    raise RuntimeError(f"쉘 시작 실패: {started.json().get('error')}")
+        return session_ids
+
+    async def _close_sessions(self, session_ids: List[str]):
+        for session_id in session_ids:
+            await self.client.delete(f"/session_delete/{session_id}")
+
+    async def run(self, scenario: str, concurrency: int, total: int) -> Dict[str, Any]:
+        if scenario == "execute":
+            async def request(worker_id: int, index: int) -> bool:
+                response = await self.client.post("/execute", json={**self.target, "command": f"bench {index}"})
+                return response.status_code == 200 and response.json().get("success", False)
+            return await run_load(scenario, concurrency, total, request)
+
+        if scenario == "batch":
+            async def request(worker_id: int, index: int) -> bool:
+                items = [{**self.target, "command": f"bench {index}-{i}"} for i in range(self.batch_size)]
+                response = await self.client.post("/execute-batch", json=items)
+                return response.status_code == 200 and all(r.get("success") for r in response.json().get("results", []))
+            result = await run_load(scenario, concurrency, total, request)
+            result["batch_size"] = self.batch_size
+            return result
+
+        shell = scenario == "shell"
+        session_ids = await self._create_sessions(concurrency, shell)
+        try:
+            if shell:
+                async def request(worker_id: int, index: int) -> bool:
+                    response = await self.client.post(
+                        f"/session/{session_ids[worker_id]}/shell/command",
+                        json={"command": f"bench {index}"}
+                    )
+                    return response.status_code == 200 and response.json().get("success", False)
+            else:
+                async def request(worker_id: int, index: int) -> bool:
+                    response = await self.client.post(
+                        f"/session/{session_ids[worker_id]}/execute",
+                        json={"command": f"bench {index}"}
+                    )
+                    return response.status_code == 200 and response.json().get("success", False)
+            return await run_load(scenario, concurrency, total, request)
+        finally:
+            await self._close_sessions(session_ids)
+
+async def run_benchmark(args) -> Dict[str, Any]:
+    config = FakeSSHConfig(
+        command_latency=args.latency,
+        output_size=args.output_size,
+        output_rate=args.output_rate,
+        network_delay=args.net_delay,
+        bandwidth=args.bandwidth
+    )
+    server = FakeSSHServer(config)
+    ssh_port = server.start()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        key_path = create_client_key(Path(tmp))
+        try:
+            async with executor_client(args.base_url, key_path, args.timeout) as client:
+                bench = ExecutorBench(client, ssh_port, args.batch_size)
+                for scenario in args.scenarios:
+                    for concurrency in args.concurrency:
+                        result = await bench.run(scenario, concurrency, args.requests)
+                        results.append(result)
+                        print(
+                            f"{scenario:8} c={concurrency:<4} {result['throughput_rps']:>8} req/s "
+                            f"p50={result['latency_ms']['p50']}ms p99={result['latency_ms']['p99']}ms "
+                            f"errors={result['errors']}",
+                            file=sys.stderr
+                        )
+        finally:
+            server.stop()
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "mode": "remote" if args.base_url else "in-process",
+        "fake_sshd": config.to_dict(),
+        "requests_per_level": args.requests,
+        "results": results,
+        "peak_rss_mb": round(peak_rss_mb(), 1)
+    }
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="SSH Executor 엔드투엔드 벤치마크")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"실행할 시나리오 ({','.join(SCENARIOS)})")
+    parser.add_argument("--concurrency", default="1,4,16", help="동시성 수준 목록 (쉼표 구분)")
+    parser.add_argument("--requests", type=int, default=50, help="동시성 수준별 요청 수")
+    parser.add_argument("--batch-size", type=int, default=4, help="/execute-batch 요청당 명령어 수")
+    parser.add_argument("--latency", type=float, default=0.0, help="가짜 sshd 명령어 지연 (초)")
+    parser.add_argument("--output-size", type=int, default=1024, help="명령어당 출력 크기 (바이트)")
+    parser.add_argument("--output-rate", type=float, default=0.0, help="출력 속도 (바이트/초, 0=무제한)")
+    parser.add_argument("--net-delay", type=float, default=0.0, help="단방향 네트워크 지연 (초)")
+    parser.add_argument("--bandwidth", type=float, default=0.0, help="대역폭 제한 (바이트/초, 0=무제한)")
+    parser.add_argument("--timeout", type=float, default=300.0, help="HTTP 요청 타임아웃 (초)")
+    parser.add_argument("--base-url", default=None, help="실행 중인 executor URL (없으면 프로세스 내 실행)")
+    parser.add_argument("--output", default=None, help="결과 JSON 파일 경로 (없으면 stdout)")
+    args = parser.parse_args(argv)
+
+    args.scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = [s for s in args.scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"알 수 없는 시나리오: {', '.join(unknown)}")
+    args.concurrency = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    return args
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    report = asyncio.run(run_benchmark(args))
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+벤치마크용 가짜 SSH 서버 (paramiko ServerInterface 기반)
+실제 호스트 없이 명령어 지연, 출력 크기/속도, 네트워크 지연/대역폭을 흉내낸다
+"""
+
+import queue
+import socket
+import threading
+import time
+from typing import Optional
+
+import paramiko
+
+# 쉘 모드에서 사용할 프롬프트 (executor의 프롬프트 감지 규칙에 맞춤)
+SHELL_PROMPT = b"bench@fake-sshd:~$ "
+
+# exec 요청 후 채널을 닫기까지의 최소 간격 (초)
+# paramiko는 check_channel_exec_request 반환 후에 성공 응답을 보내므로,
+# 그보다 먼저 채널을 닫으면 클라이언트가 'Channel closed'로 실패한다
+MIN_CLOSE_DELAY = 0.01
+
+class FakeSSHConfig:
+    """가짜 SSH 서버 동작 설정"""
+    def __init__(
+        self,
+        command_latency: float = 0.0,
+        output_size: int = 1024,
+        output_rate: float = 0.0,
+        network_delay: float = 0.0,
+        bandwidth: float = 0.0,
+        exit_code: int = 0
+    ):
+        self.command_latency = command_latency  # 명령어 시작부터 첫 출력까지 (초)
+        self.output_size = output_size          # 명령어당 출력 바이트 수
+        self.output_rate = output_rate          # 출력 속도 (바이트/초, 0이면 제한 없음)
+        self.network_delay = network_delay      # 단방향 네트워크 지연 (초)
+        self.bandwidth = bandwidth              # 서버→클라이언트 대역폭 (바이트/초, 0이면 제한 없음)
+        self.exit_code = exit_code
+
+    def to_dict(self):
+        return dict(vars(self))
+
+class ShapedSocket:
+    """지연과 대역폭 제한을 주입하는 소켓 래퍼 (양방향 지연, 송신 방향 대역폭)"""
+    CHUNK = 16384
+
+    def __init__(self, sock: socket.socket, delay: float = 0.0, bandwidth: float = 0.0):
+        self._sock = sock
+        self._delay = delay
+        self._bandwidth = bandwidth
+        self._timeout: Optional[float] = None
+        self._outgoing: "queue.Queue" = queue.Queue()
+        self._incoming: "queue.Queue" = queue.Queue()
+        self._pending = b""
+        self._eof = False
+        self._sock.settimeout(None)
+        threading.Thread(target=self._send_pump, daemon=True).start()
+        threading.Thread(target=self._recv_pump, daemon=True).start()
+
+    def _send_pump(self):
+        try:
+            while True:
+                item = self._outgoing.get()
+                if item is None:
+                    return
+                deliver_at, data = item
+                wait = deliver_at - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                if not self._bandwidth:
+                    self._sock.sendall(data)
+                    continue
+                for offset in range(0, len(data), self.CHUNK):
+                    chunk = data[offset:offset + self.CHUNK]
+                    self._sock.sendall(chunk)
+                    time.sleep(len(chunk) / self._bandwidth)
+        except OSError:
+            return
+
+    def _recv_pump(self):
+        while True:
+            try:
+                data = self._sock.recv(65536)
+            except OSError:
+                data = b""
+            self._incoming.put((time.monotonic() + self._delay, data))
+            if not data:
+                return
+
+    def send(self, data) -> int:
+        self._outgoing.put((time.monotonic() + self._delay, bytes(data)))
+        return len(data)
+
+    def sendall(self, data):
+        self.send(data)
+
+    def recv(self, size: int) -> bytes:
+        if not self._pending:
+            if self._eof:
+                return b""
+            try:
+                deliver_at, data = self._incoming.get(timeout=self._timeout)
+            except queue.Empty:
+                raise socket.timeout()
+            wait = deliver_at - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            if not data:
+                self._eof = True
+                return b""
+            self._pending = data
+        data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+    def settimeout(self, timeout: Optional[float]):
+        self._timeout = timeout
+
+    def gettimeout(self) -> Optional[float]:
+        return self._timeout
+
+    def close(self):
+        self._outgoing.put(None)
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+
+    def __getattr__(self, name):
+        return getattr(self._sock, name)
+
+def _stream_output(channel: paramiko.Channel, config: FakeSSHConfig, size: Optional[int] = None):
+    """설정된 크기/속도로 출력 전송"""
+    remaining = config.output_size if size is None else size
+    line = b"x" * 79 + b"\n"
+    chunk_size = 4096
+    while remaining > 0:
+        count = min(chunk_size, remaining)
+        chunk = (line * (count // len(line) + 1))[:count]
+        channel.sendall(chunk)
+        remaining -= count
+        if config.output_rate:
+            time.sleep(count / config.output_rate)
+
+class _FakeServerInterface(paramiko.ServerInterface):
+    """모든 인증을 허용하고 exec/shell 요청을 흉내내는 서버 인터페이스"""
+    def __init__(self, config: FakeSSHConfig, stats: dict):
+        self.config = config
+        self.stats = stats
+
+    def get_allowed_auths(self, username):
+        return "publickey,password"
+
+    def check_auth_publickey(self, username, key):
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_auth_password(self, username, password):
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_channel_request(self, kind, chanid):
+        if kind == "session":
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_pty_request(self, channel, term, width, height, pixelwidth, pixelheight, modes):
+        return True
+
+    def check_channel_exec_request(self, channel, command):
+        self.stats["exec"] += 1
+        threading.Thread(target=self._run_exec, args=(channel, command), daemon=True).start()
+        return True
+
+    def check_channel_shell_request(self, channel):
+        self.stats["shell"] += 1
+        threading.Thread(target=self._run_shell, args=(channel,), daemon=True).start()
+        return True
+
+    def _run_exec(self, channel: paramiko.Channel, command: bytes):
+        requested_at = time.monotonic()
+        try:
+            if self.config.command_latency:
+                time.sleep(self.config.command_latency)
+            _stream_output(channel, self.config)
+            # OpenSSH와 같은 순서로 EOF, 종료 코드, 채널 닫기 전송
+            channel.shutdown_write()
+            channel.send_exit_status(self.config.exit_code)
+        except Exception:
+            pass
+        finally:
+            # EOF와 종료 코드는 이미 전송했으므로 닫기만 늦춰도 측정 지연에는 영향이 없다
+            remaining = MIN_CLOSE_DELAY - (time.monotonic() - requested_at)
+            if remaining > 0:
+                time.sleep(remaining)
+            channel.close()
+
+    def _run_shell(self, channel: paramiko.Channel):
+        try:
+            channel.sendall(SHELL_PROMPT)
+            buffer = b""
+            # su/sudo su로 들어간 중첩 쉘 깊이 (재생한 트래픽의 exit가 바깥 쉘까지 닫지 않도록)
+            depth = 0
+            while True:
+                data = channel.recv(4096)
+                if not data:
+                    break
+                buffer += data
+                while b"\n" in buffer:
+                    line, buffer = buffer.split(b"\n", 1)
+                    words = line.split()
+                    if words == [b"exit"]:
+                        if depth == 0:
+                            return
+                        depth -= 1
+                    elif words[:1] == [b"su"] or words[:2] == [b"sudo", b"su"]:
+                        depth += 1
+                    if self.config.command_latency:
+                        time.sleep(self.config.command_latency)
+                    channel.sendall(line + b"\r\n")
+                    _stream_output(channel, self.config)
+                    channel.sendall(SHELL_PROMPT)
+        except Exception:
+            pass
+        finally:
+            channel.close()
+
+class FakeSSHServer:
+    """로컬 포트에서 동작하는 가짜 sshd"""
+    def __init__(self, config: Optional[FakeSSHConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or FakeSSHConfig()
+        self.host = host
+        self.port = port
+        self.host_key = paramiko.RSAKey.generate(2048)
+        self.stats = {"connections": 0, "exec": 0, "shell": 0}
+        self._listener: Optional[socket.socket] = None
+        self._transports = []
+        self._running = False
+
+    def start(self) -> int:
+        """서버 시작 후 실제 포트 번호 반환"""
+        self._listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._listener.bind((self.host, self.port))
+        self._listener.listen(256)
+        self.port = self._listener.getsockname()[1]
+        self._running = True
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        return self.port
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                client, _ = self._listener.accept()
+            except OSError:
+                return
+            self.stats["connections"] += 1
+            # 작은 SSH 패킷이 Nagle 알고리즘에 묶여 지연되지 않도록 설정
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock = client
+            if self.config.network_delay or self.config.bandwidth:
+                sock = ShapedSocket(client, self.config.network_delay, self.config.bandwidth)
+            try:
+                transport = paramiko.Transport(sock)
+                transport.add_server_key(self.host_key)
+                transport.start_server(server=_FakeServerInterface(self.config, self.stats))
+                self._transports.append(transport)
+            except Exception:
+                client.close()
+
+    def stop(self):
+        self._running = False
+        if self._listener:
+            self._listener.close()
+        for transport in self._transports:
+            try:
+                transport.close()
+            except Exception:
+                pass
+        self._transports = []
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="벤치마크용 가짜 SSH 서버")
+    parser.add_argument("--port", type=int, default=2222)
+    parser.add_argument("--latency", type=float, default=0.0, help="명령어 지연 (초)")
+    parser.add_argument("--output-size", type=int, default=1024, help="명령어당 출력 크기 (바이트)")
+    parser.add_argument("--output-rate", type=float, default=0.0, help="출력 속도 (바이트/초)")
+    parser.add_argument("--net-delay", type=float, default=0.0, help="단방향 네트워크 지연 (초)")
+    parser.add_argument("--bandwidth", type=float, default=0.0, help="대역폭 제한 (바이트/초)")
+    args = parser.parse_args()
+
+    server = FakeSSHServer(FakeSSHConfig(
+        command_latency=args.latency,
+        output_size=args.output_size,
+        output_rate=args.output_rate,
+        network_delay=args.net_delay,
+        bandwidth=args.bandwidth
+    ), port=args.port)
+    port = server.start()
+    print(f"가짜 SSH 서버 실행 중: 127.0.0.1:{port} (종료: Ctrl+C)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
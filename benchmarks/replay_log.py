@@ -0,0 +1,548 @@
+#!/usr/bin/env python3
+"""
+runmcp_ssh.log 기반 실제 트래픽 재생기
+로그에서 명령어 구성, 세션 수명, 도착 간격을 뽑아 워크로드 모델(JSON)을 만들고,
+그 모델을 1~100배속과 여러 가상 사용자로 executor(가짜 sshd 또는 실제 호스트)에 재생한다
+
+사용 예:
+    python benchmarks/replay_log.py model runmcp_ssh.log --output workload.json
+    python benchmarks/replay_log.py replay workload.json --speed 20 --users 50 --max-idle 30
+    python benchmarks/replay_log.py replay runmcp_ssh.log --speed 100 --users 10 --base-url http://localhost:8001
+"""
+
+import argparse
+import asyncio
+import bisect
+import json
+import random
+import re
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import httpx
+
+from bench_executor import create_client_key, current_rss_mb, executor_client, peak_rss_mb, percentile
+from fake_sshd import FakeSSHConfig, FakeSSHServer
+
+MODEL_VERSION = 1
+
+LOG_LINE = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) - (\S+) - (\w+) - (.*)$")
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S,%f"
+
+# executor 로그 메시지 → 이벤트 종류
+PATTERNS = [
+    ("execute", re.compile(r"^SSH 명령어 실행: (\S+) - (.*)$")),
+    ("session_open", re.compile(r"^SSH 세션 생성 성공: (\S+) - (\S+)$")),
+    ("session_close", re.compile(r"^SSH 세션 종료: (\S+)$")),
+    ("exec", re.compile(r"^명령어 실행 완료: (.*) \(exit_code: -?\d+\)$")),
+    ("shell_start", re.compile(r"^대화형 쉘 시작 완료: ([0-9a-f-]+)")),
+    ("shell_stop", re.compile(r"^대화형 쉘 종료: (\S+)$")),
+    ("shell", re.compile(r"^쉘 명령어 실행: (.*)$")),
+    ("restart", re.compile(r"^SSH Executor .*서버 (시작|종료)$")),
+]
+
+REDACTED = "<redacted>"
+
+# 비밀번호가 인자로 들어가는 명령어 (sudo -S, echo "..." | sudo)
+SECRET_ARGUMENT = re.compile(r"(\b(?:su|sudo)\b[^|;&]*\s-S\s+)(\S+)")
+SECRET_ECHO = re.compile(r"""^echo\s+(["']?)[^|]*\1\s*\|\s*(sudo|su)\b""")
+# 다음 쉘 입력이 비밀번호 프롬프트 응답인 명령어
+PASSWORD_PROMPT = re.compile(r"^\s*(sudo\s+su\b|su\b|sudo\s+-[a-zA-Z]*[is]\b|sudo\s+passwd\b|passwd\b)")
+
+# ---------------------------------------------------------------------------
+# 로그 파싱 → 워크로드 모델
+# ---------------------------------------------------------------------------
+
+def parse_log_line(line: str) -> Optional[Tuple[datetime, str]]:
+    """텍스트 형식 또는 JSON 라인 형식(logging_setup) 로그 한 줄에서 (시각, 메시지) 추출"""
+    line = line.rstrip("\n")
+    if line.startswith("{"):
+        try:
+            entry = json.loads(line)
+            return datetime.fromisoformat(entry["ts"]), entry["msg"]
+        except (ValueError, KeyError, TypeError):
+            return None
+    match = LOG_LINE.match(line)
+    if not match:
+        return None
+    timestamp, _logger, _level, message = match.groups()
+    return datetime.strptime(timestamp, TIME_FORMAT), message
+
+def read_log_events(paths: Iterable[str]) -> Iterator[Tuple[datetime, str, Tuple[str, ...]]]:
+    """로그 파일에서 (시각, 이벤트 종류, 캡처 그룹)을 시간순으로 반환"""
+    events = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                parsed = parse_log_line(line)
+                if parsed is None:
+                    continue
+                when, message = parsed
+                for kind, pattern in PATTERNS:
+                    found = pattern.match(message)
+                    if found:
+                        events.append((when, kind, found.groups()))
+                        break
+    # 여러 파일(회전된 로그)을 합쳐도 시간순이 되도록 정렬 (같은 시각은 원래 순서 유지)
+    events.sort(key=lambda e: e[0])
+    return iter(events)
+
+def redact_command(command: str) -> str:
+    """명령어에 포함된 비밀번호 제거"""
+    if SECRET_ECHO.match(command):
+        return REDACTED + " | " + command.split("|", 1)[1].strip()
+    return SECRET_ARGUMENT.sub(lambda m: m.group(1) + REDACTED, command)
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+    if not ordered:
+        return {"count": 0}
+    return {
+        "count": len(ordered),
+        "p50": round(percentile(ordered, 0.50), 3),
+        "p90": round(percentile(ordered, 0.90), 3),
+        "p99": round(percentile(ordered, 0.99), 3),
+        "max": round(ordered[-1], 3)
+    }
+
+def build_model(paths: List[str], redact: bool = True) -> Dict[str, Any]:
+    """로그를 세션/단발 명령어 타임라인으로 변환
+
+    세션 내 명령어와 쉘 명령어 로그에는 세션 ID가 없으므로 가장 최근에 열린 세션에 귀속시킨다
+    (쉘 명령어는 쉘이 시작된 세션 우선). executor 재시작 로그가 나오면 열린 세션은 모두 종료 처리한다
+    """
+    origin: Optional[datetime] = None
+    last_offset = 0.0
+    sessions: List[Dict[str, Any]] = []
+    open_sessions: Dict[str, Dict[str, Any]] = {}  # 생성 순서 유지
+    oneshot: List[Dict[str, Any]] = []
+    orphans = 0
+    awaiting_password: Dict[str, bool] = {}
+
+    def close(session: Dict[str, Any], offset: float, reason: str):
+        session["end"] = round(offset, 3)
+        session["end_reason"] = reason
+        open_sessions.pop(session["id"], None)
+
+    def latest(shell_only: bool) -> Optional[Dict[str, Any]]:
+        for session in reversed(list(open_sessions.values())):
+            if not shell_only or session.get("shell_active"):
+                return session
+        return None
+
+    for when, kind, groups in read_log_events(paths):
+        if origin is None:
+            origin = when
+        offset = (when - origin).total_seconds()
+        last_offset = offset
+
+        if kind == "execute":
+            host, command = groups
+            oneshot.append({"t": round(offset, 3), "host": host, "command": redact_command(command) if redact else command})
+        elif kind == "session_open":
+            session_id, host = groups
+            session = {"id": session_id, "host": host, "start": round(offset, 3), "end": None, "end_reason": None, "events": []}
+            sessions.append(session)
+            open_sessions[session_id] = session
+        elif kind == "session_close":
+            session = open_sessions.get(groups[0])
+            if session:
+                close(session, offset, "closed")
+        elif kind == "restart":
+            for session in list(open_sessions.values()):
+                close(session, offset, "restart")
+        elif kind in ("shell_start", "shell_stop"):
+            session = open_sessions.get(groups[0])
+            if session:
+                session["shell_active"] = kind == "shell_start"
+                session["events"].append({"t": round(offset, 3), "type": kind})
+        else:
+            session = latest(shell_only=kind == "shell") or latest(shell_only=False)
+            if session is None:
+                orphans += 1
+                continue
+            command = groups[0]
+            if redact:
+                if kind == "shell" and awaiting_password.pop(session["id"], False):
+                    command = REDACTED
+                else:
+                    command = redact_command(command)
+                    if kind == "shell" and PASSWORD_PROMPT.match(command):
+                        awaiting_password[session["id"]] = True
+            session["events"].append({"t": round(offset, 3), "type": kind, "command": command})
+
+    for session in list(open_sessions.values()):
+        # 로그 끝까지 닫히지 않은 세션은 마지막 이벤트 시점에 닫힌 것으로 본다
+        end = max([session["start"]] + [e["t"] for e in session["events"]])
+        close(session, end, "log_end")
+    for session in sessions:
+        session.pop("shell_active", None)
+
+    model = {
+        "version": MODEL_VERSION,
+        "source": [str(p) for p in paths],
+        "origin": origin.isoformat() if origin else None,
+        "span_s": round(last_offset, 3),
+        "redacted": redact,
+        "sessions": sessions,
+        "commands": oneshot,
+    }
+    model["stats"] = model_stats(model, orphans)
+    return model
+
+def _base_command(command: str) -> str:
+    """명령어 구성 집계용 대표 이름 (첫 단어, sudo는 다음 단어까지)"""
+    words = command.split()
+    if not words:
+        return ""
+    if words[0] == "sudo" and len(words) > 1:
+        return " ".join(words[:2])
+    return words[0]
+
+def request_times(model: Dict[str, Any]) -> List[float]:
+    """executor로 가는 모든 요청 시각 (세션 생성/종료 포함)"""
+    times = [c["t"] for c in model["commands"]]
+    for session in model["sessions"]:
+        times.append(session["start"])
+        times.append(session["end"])
+        times.extend(e["t"] for e in session["events"])
+    return sorted(times)
+
+def model_stats(model: Dict[str, Any], orphans: int = 0) -> Dict[str, Any]:
+    """워크로드 모델 요약 (명령어 구성, 세션 수명, 도착 간격, 최대 동시 세션)"""
+    mix: Dict[str, Counter] = defaultdict(Counter)
+    for command in model["commands"]:
+        mix["execute"][_base_command(command["command"])] += 1
+    per_session = []
+    for session in model["sessions"]:
+        commands = [e for e in session["events"] if "command" in e]
+        per_session.append(len(commands))
+        for event in commands:
+            mix[event["type"]][_base_command(event["command"])] += 1
+
+    times = request_times(model)
+    gaps = [b - a for a, b in zip(times, times[1:])]
+
+    edges = sorted([(s["start"], 1) for s in model["sessions"]] + [(s["end"], -1) for s in model["sessions"]], key=lambda e: (e[0], e[1]))
+    live = peak = 0
+    for _, delta in edges:
+        live += delta
+        peak = max(peak, live)
+
+    return {
+        "requests": len(times),
+        "oneshot_commands": len(model["commands"]),
+        "sessions": len(model["sessions"]),
+        "shell_sessions": sum(1 for s in model["sessions"] if any(e["type"] == "shell_start" for e in s["events"])),
+        "unattributed_commands": orphans,
+        "peak_concurrent_sessions": peak,
+        "command_mix": {kind: dict(counter.most_common(20)) for kind, counter in sorted(mix.items())},
+        "session_lifetime_s": _summary([s["end"] - s["start"] for s in model["sessions"]]),
+        "commands_per_session": _summary(per_session),
+        "inter_arrival_s": _summary(gaps),
+    }
+
+def load_model(paths: List[str], redact: bool = True) -> Dict[str, Any]:
+    """워크로드 모델 JSON을 읽거나 로그 파일에서 바로 생성"""
+    if len(paths) == 1 and paths[0].endswith(".json"):
+        with open(paths[0], "r", encoding="utf-8") as f:
+            model = json.load(f)
+        if model.get("version") != MODEL_VERSION:
+            raise ValueError(f"지원하지 않는 모델 버전: {model.get('version')}")
+        return model
+    return build_model(paths, redact=redact)
+
+# ---------------------------------------------------------------------------
+# 재생
+# ---------------------------------------------------------------------------
+
+class IdleCompressor:
+    """긴 유휴 구간을 max_idle 초로 줄여 몇 달치 로그도 현실적인 시간 안에 재생"""
+    def __init__(self, times: List[float], max_idle: Optional[float]):
+        self._breaks: List[float] = []
+        self._shift: List[float] = []
+        if not max_idle:
+            return
+        shift = 0.0
+        for a, b in zip(times, times[1:]):
+            if b - a > max_idle:
+                shift += (b - a) - max_idle
+                self._breaks.append(b)
+                self._shift.append(shift)
+
+    def __call__(self, t: float) -> float:
+        index = bisect.bisect_right(self._breaks, t)
+        return t - (self._shift[index - 1] if index else 0.0)
+
+class ReplayStats:
+    """작업 종류별 지연/오류와 스케줄 지연(부하 생성기가 따라가지 못한 정도) 집계"""
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+        self.lag: List[float] = []
+        self.completions: List[float] = []
+        self.live_sessions = 0
+        self.peak_sessions = 0
+
+    def record(self, op: str, latency_ms: float, ok: bool, lag_s: float):
+        self.latencies[op].append(latency_ms)
+        self.lag.append(lag_s * 1000.0)
+        self.completions.append(time.monotonic())
+        if not ok:
+            self.errors[op] += 1
+
+    def report(self, duration: float) -> Dict[str, Any]:
+        per_second = Counter(int(t) for t in self.completions)
+        ops = {}
+        for op, values in sorted(self.latencies.items()):
+            ordered = sorted(values)
+            ops[op] = {
+                "requests": len(ordered),
+                "errors": self.errors[op],
+                "latency_ms": {
+                    "p50": round(percentile(ordered, 0.50), 2),
+                    "p99": round(percentile(ordered, 0.99), 2),
+                    "max": round(ordered[-1], 2)
+                }
+            }
+        lag = sorted(self.lag)
+        total = sum(len(v) for v in self.latencies.values())
+        return {
+            "duration_s": round(duration, 3),
+            "requests": total,
+            "errors": sum(self.errors.values()),
+            "throughput_rps": round(total / duration, 2) if duration > 0 else 0.0,
+            "peak_rps_1s": max(per_second.values()) if per_second else 0,
+            "peak_concurrent_sessions": self.peak_sessions,
+            "schedule_lag_ms": {
+                "p50": round(percentile(lag, 0.50), 2),
+                "p99": round(percentile(lag, 0.99), 2),
+                "max": round(lag[-1], 2) if lag else 0.0
+            },
+            "operations": ops
+        }
+
+class Replayer:
+    """워크로드 모델을 가상 사용자 수만큼 겹쳐서 재생"""
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        model: Dict[str, Any],
+        speed: float,
+        host_map: Dict[str, Tuple[str, int]],
+        default_target: Optional[Tuple[str, int]],
+        username: str,
+        max_idle: Optional[float]
+    ):
+        self.client = client
+        self.model = model
+        self.speed = speed
+        self.host_map = host_map
+        self.default_target = default_target
+        self.username = username
+        self.compress = IdleCompressor(request_times(model), max_idle)
+        self.stats = ReplayStats()
+        self._started = 0.0
+
+    def target(self, host: str) -> Dict[str, Any]:
+        mapped = self.host_map.get(host) or self.default_target or (host, 22)
+        return {"host": mapped[0], "port": mapped[1], "username": self.username}
+
+    def scaled(self, t: float, offset: float) -> float:
+        return offset + self.compress(t) / self.speed
+
+    async def _wait_until(self, at: float) -> float:
+        """예정 시각까지 대기 후 예정 시각 대비 지연(초) 반환"""
+        delay = self._started + at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return max(0.0, time.monotonic() - (self._started + at))
+
+    async def _call(self, op: str, lag: float, method: str, url: str, **kwargs) -> Optional[Dict[str, Any]]:
+        start = time.perf_counter()
+        data = None
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            if response.status_code == 200:
+                data = response.json()
+        except (httpx.HTTPError, ValueError):
+            data = None
+        ok = data is not None and data.get("success", True) is not False
+        self.stats.record(op, (time.perf_counter() - start) * 1000.0, ok, lag)
+        return data
+
+    async def _run_oneshot(self, command: Dict[str, Any], offset: float):
+        lag = await self._wait_until(self.scaled(command["t"], offset))
+        await self._call("execute", lag, "POST", "/execute", json={**self.target(command["host"]), "command": command["command"]})
+
+    async def _run_session(self, session: Dict[str, Any], offset: float):
+        lag = await self._wait_until(self.scaled(session["start"], offset))
+        created = await self._call("session_create", lag, "POST", "/session/create", json=self.target(session["host"]))
+        if not created or not created.get("session_id"):
+            return
+        session_id = created["session_id"]
+        self.stats.live_sessions += 1
+        self.stats.peak_sessions = max(self.stats.peak_sessions, self.stats.live_sessions)
+        shell_active = False
+        try:
+            for event in session["events"]:
+                lag = await self._wait_until(self.scaled(event["t"], offset))
+                kind = event["type"]
+                if kind == "exec":
+                    await self._call("session_exec", lag, "POST", f"/session/{session_id}/execute", json={"command": event["command"]})
+                elif kind == "shell_start" or (kind == "shell" and not shell_active):
+                    started = await self._call("shell_start", lag, "POST", f"/session/{session_id}/shell/start")
+                    shell_active = bool(started and started.get("success"))
+                    if kind == "shell" and shell_active:
+                        await self._call("shell_command", 0.0, "POST", f"/session/{session_id}/shell/command", json={"command": event["command"]})
+                elif kind == "shell":
+                    await self._call("shell_command", lag, "POST", f"/session/{session_id}/shell/command", json={"command": event["command"]})
+                elif kind == "shell_stop" and shell_active:
+                    await self._call("shell_stop", lag, "POST", f"/session/{session_id}/shell/stop")
+                    shell_active = False
+            lag = await self._wait_until(self.scaled(session["end"], offset))
+        finally:
+            await self._call("session_close", lag, "DELETE", f"/session_delete/{session_id}")
+            self.stats.live_sessions -= 1
+
+    async def run(self, users: int, stagger: float, seed: int, max_duration: Optional[float]) -> Dict[str, Any]:
+        """가상 사용자마다 [0, stagger) 범위의 임의 시작 오프셋으로 전체 트래픽을 재생"""
+        rng = random.Random(seed)
+        offsets = [rng.uniform(0.0, stagger) if stagger else 0.0 for _ in range(users)]
+        self._started = time.monotonic()
+        tasks = []
+        for offset in offsets:
+            tasks.extend(asyncio.create_task(self._run_oneshot(c, offset)) for c in self.model["commands"])
+            tasks.extend(asyncio.create_task(self._run_session(s, offset)) for s in self.model["sessions"])
+
+        done, pending = await asyncio.wait(tasks, timeout=max_duration)
+        for task in pending:
+            task.cancel()
+        if pending:
+            # 취소된 세션 작업도 finally에서 세션 종료 요청을 보내도록 기다린다
+            await asyncio.gather(*pending, return_exceptions=True)
+        duration = time.monotonic() - self._started
+
+        report = self.stats.report(duration)
+        report["truncated"] = bool(pending)
+        failures = [t.exception() for t in done if not t.cancelled() and t.exception()]
+        if failures:
+            report["task_failures"] = len(failures)
+            report["first_failure"] = repr(failures[0])
+        return report
+
+def parse_host_map(entries: List[str]) -> Dict[str, Tuple[str, int]]:
+    """'원래호스트=새호스트[:포트]' 목록 파싱"""
+    result = {}
+    for entry in entries:
+        source, _, target = entry.partition("=")
+        if not source or not target:
+            raise ValueError(f"잘못된 --host-map 값: {entry}")
+        host, _, port = target.partition(":")
+        result[source] = (host, int(port) if port else 22)
+    return result
+
+async def run_replay(args) -> Dict[str, Any]:
+    model = load_model(args.inputs, redact=not args.no_redact)
+    host_map = parse_host_map(args.host_map)
+
+    server = None
+    default_target = None
+    config = None
+    if args.backend == "fake":
+        config = FakeSSHConfig(
+            command_latency=args.latency,
+            output_size=args.output_size,
+            output_rate=args.output_rate,
+            network_delay=args.net_delay,
+            bandwidth=args.bandwidth
+        )
+        server = FakeSSHServer(config)
+        default_target = ("127.0.0.1", server.start())
+        host_map = {}
+    elif not host_map:
+        print("경고: 로그에 기록된 실제 호스트로 명령어를 재생합니다", file=sys.stderr)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        key_path = create_client_key(Path(tmp))
+        try:
+            async with executor_client(args.base_url, key_path, args.timeout) as client:
+                replayer = Replayer(client, model, args.speed, host_map, default_target, args.username, args.max_idle)
+                rss_before = current_rss_mb()
+                result = await replayer.run(args.users, args.stagger, args.seed, args.max_duration)
+                result["rss_mb"] = {"before": round(rss_before, 1), "after": round(current_rss_mb(), 1)}
+        finally:
+            if server:
+                server.stop()
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "mode": "remote" if args.base_url else "in-process",
+        "backend": args.backend,
+        "fake_sshd": config.to_dict() if config else None,
+        "speed": args.speed,
+        "users": args.users,
+        "max_idle_s": args.max_idle,
+        "workload": model["stats"],
+        "result": result,
+        "peak_rss_mb": round(peak_rss_mb(), 1)
+    }
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="runmcp_ssh.log 기반 트래픽 재생기")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    model = sub.add_parser("model", help="로그에서 워크로드 모델 생성")
+    model.add_argument("inputs", nargs="+", help="runmcp_ssh.log 파일 (회전된 파일 여러 개 가능)")
+    model.add_argument("--no-redact", action="store_true", help="명령어의 비밀번호를 지우지 않음")
+    model.add_argument("--output", default=None, help="모델 JSON 파일 경로 (없으면 stdout)")
+
+    replay = sub.add_parser("replay", help="워크로드 모델 재생")
+    replay.add_argument("inputs", nargs="+", help="모델 JSON 또는 로그 파일")
+    replay.add_argument("--speed", type=float, default=1.0, help="재생 배속 (1~100)")
+    replay.add_argument("--users", type=int, default=1, help="동시에 트래픽 전체를 재생할 가상 사용자 수")
+    replay.add_argument("--stagger", type=float, default=0.0, help="가상 사용자 시작 오프셋 범위 (재생 시간 기준 초)")
+    replay.add_argument("--max-idle", type=float, default=60.0, help="이보다 긴 유휴 구간은 이 길이로 압축 (원본 기준 초, 0=압축 안 함)")
+    replay.add_argument("--max-duration", type=float, default=None, help="최대 재생 시간 (초, 초과 시 중단)")
+    replay.add_argument("--seed", type=int, default=0)
+    replay.add_argument("--backend", choices=("fake", "hosts"), default="fake", help="fake=가짜 sshd, hosts=로그의 호스트(또는 --host-map)")
+    replay.add_argument("--host-map", action="append", default=[], help="호스트 치환 '원래호스트=새호스트[:포트]' (hosts 백엔드)")
+    replay.add_argument("--username", default="bench", help="세션/명령어 요청에 사용할 사용자명")
+    replay.add_argument("--no-redact", action="store_true", help="로그 입력 시 비밀번호를 지우지 않음")
+    replay.add_argument("--latency", type=float, default=0.0, help="가짜 sshd 명령어 지연 (초)")
+    replay.add_argument("--output-size", type=int, default=1024, help="명령어당 출력 크기 (바이트)")
+    replay.add_argument("--output-rate", type=float, default=0.0, help="출력 속도 (바이트/초, 0=무제한)")
+    replay.add_argument("--net-delay", type=float, default=0.0, help="단방향 네트워크 지연 (초)")
+    replay.add_argument("--bandwidth", type=float, default=0.0, help="대역폭 제한 (바이트/초, 0=무제한)")
+    replay.add_argument("--timeout", type=float, default=300.0, help="HTTP 요청 타임아웃 (초)")
+    replay.add_argument("--base-url", default=None, help="실행 중인 executor URL (없으면 프로세스 내 실행)")
+    replay.add_argument("--output", default=None, help="결과 JSON 파일 경로 (없으면 stdout)")
+
+    args = parser.parse_args(argv)
+    if args.command == "replay":
+        if args.speed <= 0:
+            parser.error("--speed는 0보다 커야 합니다")
+        if args.users < 1:
+            parser.error("--users는 1 이상이어야 합니다")
+    return args
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    if args.command == "model":
+        report = build_model(args.inputs, redact=not args.no_redact)
+    else:
+        report = asyncio.run(run_replay(args))
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
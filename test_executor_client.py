@@ -0,0 +1,59 @@
+"""
+ExecutorClient 노드 부하 카운트 테스트
+연결 실패로 다른 노드에 다시 보낸 뒤에도 노드별 진행 중 요청 수가 원래대로 돌아오는지 확인
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent / "app"))
+
+from executor_client import ExecutorClient
+
+def test_failover_restores_inflight():
+    """bad 노드 연결 실패 -> good 노드로 재전송 후 두 노드의 inflight가 요청 전 값과 같아야 함"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "bad.local":
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, json={"ok": True})
+
+    async def run():
+        client = ExecutorClient(base_url=["http://bad.local", "http://good.local"], health_interval=0)
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        bad, good = client.nodes
+        # 부하가 적은 bad 노드가 먼저 선택되도록 good 노드에 진행 중 요청이 있는 것처럼 설정
+        good.inflight = 5
+        try:
+            response = await client.request("POST", "/execute", "execute", json={})
+        finally:
+            await client._client.aclose()
+        return response, bad, good
+
+    response, bad, good = asyncio.run(run())
+    assert response.status_code == 200
+    assert not bad.healthy
+    assert bad.inflight == 0
+    assert good.inflight == 5
+
+def test_open_circuit_503_not_retried():
+    """Retry-After가 있는 503(호스트 회로 열림)은 GET이어도 재시도하지 않고 바로 돌려줘야 함"""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        return httpx.Response(503, headers={"Retry-After": "5"}, json={"detail": {"reason": "open"}})
+
+    async def run():
+        client = ExecutorClient(base_url="http://executor.local", health_interval=0)
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            return await client.request("GET", "/servers", "servers")
+        finally:
+            await client._client.aclose()
+
+    response = asyncio.run(run())
+    assert response.status_code == 503
+    assert calls == ["/servers"]
@@ -0,0 +1,63 @@
+"""
+ssh 실행 명령 감시 스크립트 테스트
+sshd처럼 로그인 쉘로 감싼 명령을 실행해 쉘 문법이 그대로 동작하고, stdin이 닫히면 시그널로 중단되는지 확인
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+# import 시 설정되는 로그 파일을 저장소 밖에 기록
+os.environ.setdefault("LOG_DIR", tempfile.gettempdir())
+os.environ.setdefault("LOG_CONSOLE", "0")
+sys.path.insert(0, str(Path(__file__).parent / "app"))
+
+from runmcp_ssh_executor import _remote_kill_command
+
+BASH = shutil.which("bash")
+
+def run_like_sshd(command: str, stop_after: float = None):
+    """sshd처럼 로그인 쉘($SHELL -c)로 새 세션에서 실행 (stdin은 중단할 때 닫는 파이프)"""
+    stdin_read, stdin_write = os.pipe()
+    process = subprocess.Popen(
+        [BASH, "-c", command],
+        stdin=stdin_read,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        env={**os.environ, "SHELL": BASH},
+        start_new_session=True
+    )
+    os.close(stdin_read)
+    try:
+        if stop_after is not None:
+            time.sleep(stop_after)
+            os.close(stdin_write)
+            stdin_write = None
+        stdout, stderr = process.communicate(timeout=10)
+    finally:
+        if stdin_write is not None:
+            os.close(stdin_write)
+    return process.returncode, stdout.decode(), stderr.decode()
+
+@pytest.mark.skipif(BASH is None, reason="bash 필요")
+def test_wrapped_command_keeps_login_shell_syntax():
+    """bash 전용 문법(중괄호 확장, [[ ]])이 감싸지 않은 명령과 같이 동작해야 함"""
+    exit_code, stdout, stderr = run_like_sshd(_remote_kill_command("echo {1..3}; [[ 1 == 1 ]] && echo bashism; exit 3", "TERM"))
+    assert stdout == "1 2 3\nbashism\n"
+    assert stderr == ""
+    assert exit_code == 3
+
+@pytest.mark.skipif(BASH is None, reason="bash 필요")
+def test_wrapped_command_signalled_when_stdin_closes():
+    """stdin이 닫히면 명령에 지정한 시그널이 가야 함"""
+    command = "trap 'echo got TERM; exit 9' TERM; echo start; sleep 30 & wait"
+    started = time.monotonic()
+    _, stdout, _ = run_like_sshd(_remote_kill_command(command, "TERM"), stop_after=0.5)
+    assert stdout == "start\ngot TERM\n"
+    assert time.monotonic() - started < 5